@@ -1,10 +1,17 @@
 """Tests for action processing functionality."""
 
+import io
+import json
+import pathlib
 from unittest.mock import Mock, patch
 
 from transmission_rpc import Torrent
 
-from transmission_cleaner.actions import process_torrents
+from transmission_cleaner.actions import process_orphaned_file_stream, process_orphaned_files, process_torrents
+from transmission_cleaner.deleter import LocalDeleter
+from transmission_cleaner.journal import Journal
+from transmission_cleaner.reporters import create_reporter
+from transmission_cleaner.review import PlanError
 
 
 class TestProcessTorrents:
@@ -142,3 +149,212 @@ class TestProcessTorrents:
         # Should remove without data due to cross-seed protection
         client.remove_torrent.assert_called_with(1, delete_data=False)
         assert result == 0  # Cross-seeded torrent was protected
+
+    @patch("builtins.print")
+    def test_local_delete_removes_without_data_and_deletes_files(self, mock_print, tmp_path):
+        """With a local deleter, torrents are removed in one batch and files are deleted locally."""
+        client = Mock()
+        (tmp_path / "pack").mkdir()
+        (tmp_path / "pack" / "a.bin").write_bytes(b"x" * 10)
+        (tmp_path / "b.bin").write_bytes(b"x" * 5)
+        t1 = self.create_mock_torrent("pack", 1)
+        t2 = self.create_mock_torrent("b", 2)
+        for torrent, names in [(t1, ["pack/a.bin"]), (t2, ["b.bin"])]:
+            torrent.download_dir = str(tmp_path)
+            files = []
+            for name in names:
+                file = Mock()
+                file.name = name
+                files.append(file)
+            torrent.get_files.return_value = files
+
+        result = process_torrents(client, [t1, t2], "delete", deleter=LocalDeleter())
+
+        client.remove_torrent.assert_called_once_with([1, 2], delete_data=False)
+        assert result == 15
+        assert not (tmp_path / "pack").exists()
+        assert not (tmp_path / "b.bin").exists()
+
+    @patch("builtins.print")
+    def test_local_delete_keeps_torrent_without_file_list(self, mock_print, tmp_path):
+        """A torrent with data but no fetched file list is neither removed nor journaled."""
+        client = Mock()
+        torrent = self.create_mock_torrent("pack", 1)
+        torrent.download_dir = str(tmp_path)
+        torrent.get_files.return_value = []
+        journal = Journal.create(str(tmp_path / "journal.ndjson"), "check")
+
+        result = process_torrents(client, [torrent], "delete", deleter=LocalDeleter(), journal=journal)
+
+        client.remove_torrent.assert_not_called()
+        assert result == 0
+        assert journal.pending() == []
+        mock_print.assert_any_call("[ERROR]  pack: No file list to delete the data from, keeping torrent")
+
+    @patch("builtins.print")
+    def test_local_delete_keeps_cross_seeded_data(self, mock_print, tmp_path):
+        """Cross-seeded torrents are removed but their data is not deleted locally."""
+        client = Mock()
+        (tmp_path / "a.bin").write_bytes(b"x")
+        torrent = self.create_mock_torrent("a", 1)
+        torrent.download_dir = str(tmp_path)
+        file = Mock()
+        file.name = "a.bin"
+        torrent.get_files.return_value = [file]
+
+        result = process_torrents(client, [torrent], "d", {1: [Mock(spec=Torrent)]}, deleter=LocalDeleter())
+
+        client.remove_torrent.assert_called_once_with([1], delete_data=False)
+        assert result == 0
+        assert (tmp_path / "a.bin").exists()
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.actions.edit_plan")
+    def test_review_runs_plan_in_batches(self, mock_edit_plan, mock_print):
+        """Review should run all decisions as one removal call per kind, protecting cross-seeds."""
+        client = Mock()
+        torrents = [self.create_mock_torrent(f"t{i}", i) for i in range(1, 5)]
+        mock_edit_plan.side_effect = lambda plan, plan_file: (
+            plan.replace("keep\t1\t", "d\t1\t").replace("keep\t2\t", "r\t2\t").replace("keep\t3\t", "d\t3\t")
+        )
+
+        result = process_torrents(client, torrents, "review", {3: [Mock(spec=Torrent)]})
+
+        client.remove_torrent.assert_any_call([1], delete_data=True)
+        client.remove_torrent.assert_any_call([2, 3], delete_data=False)
+        assert client.remove_torrent.call_count == 2
+        assert result == 1024**3
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.actions.edit_plan")
+    def test_review_aborts_on_editor_failure(self, mock_edit_plan, mock_print):
+        """A failed editor should act on nothing."""
+        client = Mock()
+        mock_edit_plan.side_effect = PlanError("Editor vim exited with status 1")
+
+        result = process_torrents(client, [self.create_mock_torrent("t1", 1)], "review")
+
+        client.remove_torrent.assert_not_called()
+        assert result == 0
+        mock_print.assert_called_with("[ERROR]  Review aborted, nothing was changed")
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.actions.edit_plan")
+    def test_review_aborts_on_malformed_line(self, mock_edit_plan, mock_print):
+        """A mistyped line should act on nothing, not even the lines before it."""
+        client = Mock()
+        torrents = [self.create_mock_torrent(f"t{i}", i) for i in range(1, 3)]
+        mock_edit_plan.side_effect = lambda plan, plan_file: plan.replace("keep\t1\t", "d\t1\t").replace(
+            "keep\t2\t", "dlete\t2\t"
+        )
+
+        result = process_torrents(client, torrents, "review")
+
+        client.remove_torrent.assert_not_called()
+        assert result == 0
+
+
+class TestProcessOrphanedFiles:
+    """Tests for orphaned file processing actions."""
+
+    @patch("builtins.print")
+    def test_delete_action_uses_deleter(self, mock_print, tmp_path):
+        """Delete action should remove files and count their size."""
+        orphan = tmp_path / "orphan.bin"
+        orphan.write_bytes(b"x" * 100)
+
+        result = process_orphaned_files([orphan, tmp_path / "gone.bin"], "delete", deleter=LocalDeleter(workers=2))
+
+        assert result == 100
+        assert not orphan.exists()
+
+    def test_list_action_uses_known_sizes(self, tmp_path):
+        """List action should report sizes from the scan without stat-ing files."""
+        orphan = tmp_path / "orphan.bin"
+        stream = io.StringIO()
+
+        with patch.object(pathlib.Path, "stat") as mock_stat:
+            process_orphaned_files([orphan], "list", reporter=create_reporter("ndjson", stream), sizes={orphan: 7})
+
+        mock_stat.assert_not_called()
+        assert json.loads(stream.getvalue())["size"] == 7
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.actions.edit_plan")
+    def test_review_deletes_only_marked_files(self, mock_edit_plan, mock_print, tmp_path):
+        """Review should delete the files marked delete and keep the rest."""
+        keep, delete = tmp_path / "keep.bin", tmp_path / "delete.bin"
+        keep.write_bytes(b"x")
+        delete.write_bytes(b"xx")
+        mock_edit_plan.side_effect = lambda plan, plan_file: plan.replace(f"keep\t?\t{delete}", f"d\t?\t{delete}")
+
+        result = process_orphaned_files([keep, delete], "review")
+
+        assert result == 2
+        assert keep.exists()
+        assert not delete.exists()
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.actions.edit_plan")
+    def test_review_aborts_on_malformed_line(self, mock_edit_plan, mock_print, tmp_path):
+        """A mistyped line should delete no file."""
+        orphan = tmp_path / "orphan.bin"
+        orphan.write_bytes(b"x")
+        mock_edit_plan.side_effect = lambda plan, plan_file: plan.replace(f"keep\t?\t{orphan}", f"del\t?\t{orphan}")
+
+        result = process_orphaned_files([orphan], "review")
+
+        assert result == 0
+        assert orphan.exists()
+
+    @patch("builtins.print")
+    def test_list_action_keeps_files(self, mock_print, tmp_path):
+        """List action should not delete anything."""
+        orphan = tmp_path / "orphan.bin"
+        orphan.write_bytes(b"x")
+
+        result = process_orphaned_files([orphan], "list")
+
+        assert result == 0
+        assert orphan.exists()
+
+
+class TestProcessOrphanedFileStream:
+    """Tests for processing streamed orphaned files."""
+
+    def test_list_action_reports_as_streamed(self, tmp_path):
+        """List action reports the streamed sizes and counts the files."""
+        stream = io.StringIO()
+
+        count, freed = process_orphaned_file_stream(
+            iter([(tmp_path / "a.bin", 3), (tmp_path / "b.bin", 4)]), "list", reporter=create_reporter("ndjson", stream)
+        )
+
+        assert (count, freed) == (2, 0)
+        assert [json.loads(line)["size"] for line in stream.getvalue().splitlines()] == [3, 4]
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.actions.ORPHAN_BATCH_SIZE", 2)
+    def test_delete_action_journals_each_batch_before_deleting(self, mock_print, tmp_path):
+        """Files are deleted a batch at a time, each batch planned in the journal first."""
+        orphans = []
+        for name in ["a.bin", "b.bin", "c.bin"]:
+            (tmp_path / name).write_bytes(b"xx")
+            orphans.append((tmp_path / name, 2))
+        journal = Journal.create(str(tmp_path / "journal.ndjson"), "orphans")
+        deleted_batches = []
+        deleter = LocalDeleter()
+        iter_delete = deleter.iter_delete
+
+        def record_batch(paths):
+            deleted_batches.append([path.name for path in paths])
+            # Every file of the batch is planned before any is deleted
+            assert len(journal.pending()) == len(paths)
+            return iter_delete(paths)
+
+        with patch.object(deleter, "iter_delete", side_effect=record_batch):
+            count, freed = process_orphaned_file_stream(iter(orphans), "delete", deleter=deleter, journal=journal)
+
+        assert (count, freed) == (3, 6)
+        assert deleted_batches == [["a.bin", "b.bin"], ["c.bin"]]
+        assert journal.pending() == []
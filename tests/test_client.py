@@ -1,9 +1,20 @@
 """Tests for client configuration functionality."""
 
 import json
-from unittest.mock import mock_open, patch
+from unittest.mock import Mock, mock_open, patch
 
-from transmission_cleaner.client import get_client_config, load_settings_from_file
+import pytest
+from transmission_rpc import Session, Torrent, TransmissionError
+
+from transmission_cleaner.client import (
+    MultiClient,
+    RateLimitedClient,
+    get_client_config,
+    get_incomplete_dirs,
+    iter_torrents,
+    load_instances_file,
+    load_settings_from_file,
+)
 
 
 class TestLoadSettingsFromFile:
@@ -79,3 +90,162 @@ class TestGetClientConfig:
         assert result["password"] is None
         assert result["protocol"] == "http"
         assert result["host"] == "127.0.0.1"
+
+
+class TestLoadInstancesFile:
+    """Tests for loading multi-instance configuration."""
+
+    def test_loads_each_instance(self):
+        """Should build one config per instance, using defaults for missing keys."""
+        instances = json.dumps([{"host": "10.0.0.1", "password": "a"}, {"port": 9092, "password": "b"}])
+
+        with patch("builtins.open", mock_open(read_data=instances)):
+            result = load_instances_file("instances.json")
+
+        assert len(result) == 2
+        assert result[0]["host"] == "10.0.0.1"
+        assert result[0]["port"] == 9091
+        assert result[1]["port"] == 9092
+        assert result[1]["password"] == "b"
+
+
+class TestMultiClient:
+    """Tests for presenting several instances as one client."""
+
+    def create_client(self, *ids):
+        """Helper to create a mock client holding torrents with the given IDs."""
+        client = Mock()
+        client.get_torrents.return_value = [Torrent(fields={"id": i, "name": f"t{i}"}) for i in ids]
+        return client
+
+    def test_torrent_ids_are_unique_across_instances(self):
+        """Torrents with the same local ID on different instances should get different IDs."""
+        multi = MultiClient([self.create_client(1, 2), self.create_client(1)])
+
+        torrents = multi.get_torrents()
+
+        assert sorted(t.id for t in torrents) == [2, 3, 4]
+
+    def test_remove_is_routed_to_owning_instance(self):
+        """Removing a torrent should call the instance it came from, with its local ID."""
+        first, second = self.create_client(1), self.create_client(1)
+        multi = MultiClient([first, second])
+        assert sorted(t.id for t in multi.get_torrents()) == [2, 3]
+
+        multi.remove_torrent([3], delete_data=True)
+
+        first.remove_torrent.assert_not_called()
+        second.remove_torrent.assert_called_once_with([1], delete_data=True, timeout=None)
+
+    def test_get_torrents_by_id_only_queries_owning_instances(self):
+        """Fetching specific IDs should only query instances that own them."""
+        first, second = self.create_client(1), self.create_client(1)
+        multi = MultiClient([first, second])
+
+        multi.get_torrents(ids=[2])
+
+        first.get_torrents.assert_called_once_with(ids=[1], arguments=None, timeout=None)
+        second.get_torrents.assert_not_called()
+
+    def test_hashes_cannot_be_routed(self):
+        """Hashes do not tell which instance owns a torrent, so only IDs are accepted."""
+        multi = MultiClient([self.create_client(1), self.create_client(1)])
+
+        with pytest.raises(TypeError):
+            multi.remove_torrent(["a" * 40])
+
+
+class TestRateLimitedClient:
+    """Tests for adaptive chunking of torrent-get requests."""
+
+    def create_client(self, count):
+        """Helper to create a mock client holding torrents with IDs 1..count."""
+        torrents = {i: Torrent(fields={"id": i, "name": f"t{i}"}) for i in range(1, count + 1)}
+        client = Mock()
+        client.get_torrents.side_effect = lambda ids=None, arguments=None, timeout=None: (
+            list(torrents.values()) if ids is None else [torrents[i] for i in ids]
+        )
+        return client
+
+    @patch("transmission_cleaner.client.time")
+    def test_fetches_all_torrents_in_growing_chunks(self, mock_time):
+        """Fast responses grow the chunk size and every torrent is fetched once, in order."""
+        mock_time.monotonic.return_value = 0.0
+        client = self.create_client(400)
+        limited = RateLimitedClient(client, target_latency=0.5, chunk_size=100)
+
+        torrents = limited.get_torrents(arguments=["name"])
+
+        assert [t.id for t in torrents] == list(range(1, 401))
+        chunk_sizes = [len(c.kwargs["ids"]) for c in client.get_torrents.call_args_list[1:]]
+        assert chunk_sizes == [100, 200, 100]
+        mock_time.sleep.assert_not_called()
+
+    @patch("transmission_cleaner.client.time")
+    def test_slow_responses_shrink_chunks_and_add_spacing(self, mock_time):
+        """A response over the target halves the chunk size and delays the next request."""
+        # Each chunk request takes 2 seconds
+        mock_time.monotonic.side_effect = [0.0, 2.0, 10.0, 12.0, 20.0, 22.0]
+        client = self.create_client(200)
+        limited = RateLimitedClient(client, target_latency=0.5, chunk_size=100)
+
+        limited.get_torrents(ids=list(range(1, 201)))
+
+        chunk_sizes = [len(c.kwargs["ids"]) for c in client.get_torrents.call_args_list]
+        assert chunk_sizes == [100, 50, 50]
+        assert [c.args[0] for c in mock_time.sleep.call_args_list] == [2.0, 4.0]
+
+    def test_other_methods_are_passed_through(self):
+        """Methods other than get_torrents go to the wrapped client."""
+        client = Mock()
+        RateLimitedClient(client).remove_torrent([1], delete_data=False)
+
+        client.remove_torrent.assert_called_once_with([1], delete_data=False, timeout=None)
+
+
+class TestIterTorrents:
+    """Tests for streaming torrents in chunks."""
+
+    def test_fetches_ids_then_chunks(self):
+        """Torrents are fetched a chunk of IDs at a time, with the requested fields."""
+        torrents = {i: Torrent(fields={"id": i}) for i in range(1, 6)}
+        client = Mock()
+        client.get_torrents.side_effect = lambda ids=None, arguments=None: (
+            list(torrents.values()) if ids is None else [torrents[i] for i in ids]
+        )
+
+        result = list(iter_torrents(client, ["id", "files"], chunk_size=2))
+
+        assert [t.id for t in result] == [1, 2, 3, 4, 5]
+        calls = client.get_torrents.call_args_list
+        assert calls[0].kwargs == {"arguments": ["id"]}
+        assert [c.kwargs["ids"] for c in calls[1:]] == [[1, 2], [3, 4], [5]]
+        assert all(c.kwargs["arguments"] == ["id", "files"] for c in calls[1:])
+
+
+class TestGetIncompleteDirs:
+    """Tests for reading the incomplete directories of the daemons."""
+
+    def test_enabled_incomplete_dir(self):
+        """Should return the incomplete directory only when it is enabled."""
+        enabled = Mock()
+        enabled.get_session.return_value = Session(
+            fields={"incomplete-dir-enabled": True, "incomplete-dir": "/data/incomplete"}
+        )
+        disabled = Mock()
+        disabled.get_session.return_value = Session(
+            fields={"incomplete-dir-enabled": False, "incomplete-dir": "/data/other"}
+        )
+
+        assert get_incomplete_dirs(enabled) == ["/data/incomplete"]
+        assert get_incomplete_dirs(disabled) == []
+        assert get_incomplete_dirs(MultiClient([enabled, disabled])) == ["/data/incomplete"]
+
+    @patch("builtins.print")
+    def test_session_error(self, mock_print):
+        """Should warn and return nothing when the session cannot be read."""
+        client = Mock()
+        client.get_session.side_effect = TransmissionError("boom")
+
+        assert get_incomplete_dirs(client) == []
+        mock_print.assert_called_once()
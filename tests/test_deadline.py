@@ -0,0 +1,38 @@
+"""Tests for run time budgets."""
+
+from unittest.mock import patch
+
+from transmission_rpc import Torrent
+
+from transmission_cleaner.deadline import Deadline, largest_first
+
+
+class TestDeadline:
+    """Tests for the monotonic deadline."""
+
+    @patch("transmission_cleaner.deadline.time.monotonic")
+    def test_reached_after_budget(self, mock_monotonic):
+        """The deadline is reached once the budget has elapsed on the monotonic clock."""
+        mock_monotonic.return_value = 100.0
+        deadline = Deadline(60)
+
+        mock_monotonic.return_value = 159.0
+        assert not deadline.reached()
+        assert deadline.remaining() == 1.0
+
+        mock_monotonic.return_value = 160.0
+        assert deadline.reached()
+        assert deadline.remaining() == 0.0
+
+
+class TestLargestFirst:
+    """Tests for ordering by reclaimable space."""
+
+    def test_orders_by_size_then_name(self):
+        """Larger torrents come first, ties broken by name."""
+        torrents = [
+            Torrent(fields={"id": i, "name": name, "totalSize": size})
+            for i, (name, size) in enumerate([("b", 5), ("c", 10), ("a", 5)])
+        ]
+
+        assert [t.name for t in largest_first(torrents)] == ["c", "a", "b"]
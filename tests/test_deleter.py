@@ -0,0 +1,70 @@
+"""Tests for local file deletion."""
+
+from unittest.mock import patch
+
+from transmission_cleaner.deleter import LocalDeleter, Throttle, remove_empty_dirs
+
+
+class TestThrottle:
+    """Tests for deletion pacing."""
+
+    @patch("transmission_cleaner.deleter.time.sleep")
+    @patch("transmission_cleaner.deleter.time.monotonic", return_value=100.0)
+    def test_paces_by_bytes(self, mock_monotonic, mock_sleep):
+        """Consecutive operations should be spaced by size / rate."""
+        throttle = Throttle(bytes_per_sec=100)
+
+        throttle.acquire(50)
+        throttle.acquire(50)
+
+        mock_sleep.assert_called_once_with(0.5)
+
+    @patch("transmission_cleaner.deleter.time.sleep")
+    def test_unlimited_never_sleeps(self, mock_sleep):
+        """Without limits there should be no pacing."""
+        throttle = Throttle()
+
+        throttle.acquire(10**12)
+
+        mock_sleep.assert_not_called()
+
+
+class TestLocalDeleter:
+    """Tests for parallel deletion."""
+
+    def test_deletes_files_and_reports_sizes(self, tmp_path):
+        """Should delete every file and report its size."""
+        paths = []
+        for i in range(5):
+            path = tmp_path / f"f{i}"
+            path.write_bytes(b"x" * (i + 1))
+            paths.append(path)
+
+        results = LocalDeleter(workers=3).delete(paths)
+
+        assert [r.size for r in results] == [1, 2, 3, 4, 5]
+        assert all(r.error is None for r in results)
+        assert not any(p.exists() for p in paths)
+
+    def test_missing_file_reports_error(self, tmp_path):
+        """Missing files should be reported, not raised."""
+        results = LocalDeleter().delete([tmp_path / "missing"])
+
+        assert isinstance(results[0].error, FileNotFoundError)
+        assert results[0].size == 0
+
+
+class TestRemoveEmptyDirs:
+    """Tests for empty directory cleanup."""
+
+    def test_removes_empty_parents_but_not_stop_dir(self, tmp_path):
+        """Should remove emptied directories up to, but excluding, the stop directory."""
+        (tmp_path / "pack" / "disc1").mkdir(parents=True)
+        (tmp_path / "other").mkdir()
+        (tmp_path / "other" / "keep.txt").write_text("x")
+
+        remove_empty_dirs([tmp_path / "pack" / "disc1" / "a.flac", tmp_path / "other" / "gone.txt"], tmp_path)
+
+        assert tmp_path.exists()
+        assert not (tmp_path / "pack").exists()
+        assert (tmp_path / "other" / "keep.txt").exists()
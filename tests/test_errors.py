@@ -1,8 +1,23 @@
 """Tests for error detection and cross-seed checking functionality."""
 
+import json
 from unittest.mock import Mock, patch
 
-from transmission_cleaner.checkers.errors import check_cross_seeding, get_torrents_with_errors, is_cross_seeded
+import pytest
+
+from transmission_cleaner.checkers.errors import (
+    DEFAULT_ERROR_CATEGORIES,
+    OTHER_CATEGORY,
+    CrossSeedIndex,
+    ErrorClassifier,
+    check_cross_seeding,
+    classify_torrents,
+    get_torrents_with_errors,
+    get_tracker_errors,
+    is_cross_seeded,
+    load_error_rules,
+    load_tracker_state,
+)
 
 
 class TestGetTorrentsWithErrors:
@@ -73,6 +88,190 @@ class TestGetTorrentsWithErrors:
         assert result == []
 
 
+class TestErrorClassifier:
+    """Tests for multi-pattern error classification."""
+
+    def test_default_categories(self):
+        """Should sort common errors into the built-in categories."""
+        classifier = ErrorClassifier(DEFAULT_ERROR_CATEGORIES)
+
+        assert classifier.classify("Unregistered torrent") == "unregistered"
+        assert classifier.classify("Could not connect to tracker") == "tracker down"
+        assert classifier.classify("Input/output error") == "I/O error"
+        assert classifier.classify("No data found! Ensure your drives are connected") == "data missing"
+        assert classifier.classify("Something else entirely") is None
+
+    def test_regex_patterns(self):
+        """Patterns prefixed with 're:' should be used as regular expressions."""
+        classifier = ErrorClassifier({"gone": [r"re:torrent (is )?not (found|registered)"]})
+
+        assert classifier.classify("Torrent is not registered with this tracker") == "gone"
+        assert classifier.classify("torrent not found") == "gone"
+
+    def test_substring_patterns_are_literal(self):
+        """Plain patterns should not be interpreted as regular expressions."""
+        classifier = ErrorClassifier({"odd": ["error (code 5)"]})
+
+        assert classifier.classify("Tracker error (code 5)") == "odd"
+        assert classifier.classify("Tracker error code 5") is None
+
+    def test_classify_torrents_tags_unmatched_as_other(self):
+        """Errors matching no category should be tagged as other, torrents without errors skipped."""
+        torrents = []
+        for name, error in [("b", "Unregistered torrent"), ("a", "weird"), ("c", "")]:
+            torrent = Mock()
+            torrent.name = name
+            torrent.error_string = error
+            torrent.error = error
+            torrents.append(torrent)
+
+        result = classify_torrents(torrents, ErrorClassifier(DEFAULT_ERROR_CATEGORIES))
+
+        assert [(t.name, c) for t, c in result] == [("a", OTHER_CATEGORY), ("b", "unregistered")]
+
+
+class TestLoadErrorRules:
+    """Tests for loading error rules."""
+
+    def test_loads_patterns_and_actions(self, tmp_path):
+        """Should return patterns for every category and actions only where set."""
+        rules_file = tmp_path / "rules.json"
+        rules_file.write_text(
+            json.dumps(
+                {
+                    "unregistered": {"patterns": ["unregistered"], "action": "delete"},
+                    "tracker down": {"patterns": ["timed out"]},
+                }
+            )
+        )
+
+        categories, actions = load_error_rules(str(rules_file))
+
+        assert categories == {"unregistered": ["unregistered"], "tracker down": ["timed out"]}
+        assert actions == {"unregistered": "delete"}
+
+    def test_rejects_unknown_action(self, tmp_path):
+        """Should reject actions the tool does not know."""
+        rules_file = tmp_path / "rules.json"
+        rules_file.write_text(json.dumps({"x": {"patterns": ["x"], "action": "nuke"}}))
+
+        with pytest.raises(ValueError):
+            load_error_rules(str(rules_file))
+
+    def test_rejects_malformed_rules(self, tmp_path):
+        """Invalid JSON and categories without a patterns list should raise ValueError."""
+        rules_file = tmp_path / "rules.json"
+        for content in ['{"x": {"patterns": [', '{"x": {"action": "list"}}', '["x"]']:
+            rules_file.write_text(content)
+
+            with pytest.raises(ValueError):
+                load_error_rules(str(rules_file))
+
+    def test_classifier_rejects_invalid_regex(self):
+        """An invalid regular expression should raise ValueError naming its category."""
+        with pytest.raises(ValueError, match="gone"):
+            ErrorClassifier({"gone": ["re:not (found"]})
+
+    @pytest.mark.parametrize("pattern", ["re:(?i)unregistered", r"re:(a)\1", "re:(?(1)a|b)"])
+    def test_classifier_rejects_patterns_that_break_the_combined_regex(self, pattern):
+        """Inline global flags and numbered group references raise ValueError instead of misbehaving."""
+        with pytest.raises(ValueError, match="gone"):
+            ErrorClassifier({"other": ["x"], "gone": [pattern]})
+
+    def test_classifier_accepts_scoped_flags_and_named_groups(self):
+        """Scoped flags, named backreferences and escaped backslashes before digits are allowed."""
+        classifier = ErrorClassifier({"gone": [r"re:(?s:a.b)", r"re:(?P<w>x)(?P=w)", r"re:\\1"]})
+
+        assert classifier.classify("xx") == "gone"
+        assert classifier.classify("\\1") == "gone"
+
+    def test_classifier_rejects_group_names_used_twice(self):
+        """Patterns that cannot be combined raise ValueError."""
+        with pytest.raises(ValueError):
+            ErrorClassifier({"a": ["re:(?P<w>a)"], "b": ["re:(?P<w>b)"]})
+
+
+class TestGetTrackerErrors:
+    """Tests for tracker-stat based error detection."""
+
+    def create_tracker_stat(self, announce, succeeded, result="", announce_time=100, is_backup=False):
+        """Helper to create a mock tracker stat."""
+        ts = Mock()
+        ts.announce = announce
+        ts.has_announced = True
+        ts.is_backup = is_backup
+        ts.last_announce_succeeded = succeeded
+        ts.last_announce_result = result
+        ts.last_announce_time = announce_time
+        return ts
+
+    def create_mock_torrent(self, torrent_id, tracker_stats):
+        """Helper to create a mock torrent with tracker stats."""
+        torrent = Mock()
+        torrent.id = torrent_id
+        torrent.hash_string = f"hash{torrent_id}"
+        torrent.tracker_stats = tracker_stats
+        return torrent
+
+    def test_all_trackers_failing(self):
+        """Should report torrents whose primary trackers all fail."""
+        torrent = self.create_mock_torrent(1, [self.create_tracker_stat("http://a", False, "Unregistered torrent")])
+
+        assert get_tracker_errors([torrent]) == {1: "Unregistered torrent"}
+
+    def test_one_good_tracker_clears_error(self):
+        """A successful announce on any primary tracker means the torrent is fine."""
+        torrent = self.create_mock_torrent(
+            1,
+            [
+                self.create_tracker_stat("http://a", False, "Unregistered torrent"),
+                self.create_tracker_stat("http://b", True, "Success"),
+            ],
+        )
+
+        assert get_tracker_errors([torrent]) == {}
+
+    def test_backup_trackers_ignored(self):
+        """Backup trackers should not count either way."""
+        torrent = self.create_mock_torrent(
+            1,
+            [
+                self.create_tracker_stat("http://a", False, "Unregistered torrent"),
+                self.create_tracker_stat("http://b", True, "Success", is_backup=True),
+            ],
+        )
+
+        assert get_tracker_errors([torrent]) == {1: "Unregistered torrent"}
+
+    def test_consecutive_failures_accumulate_across_runs(self):
+        """Failures should only count once per new announce, and reach the minimum over runs."""
+        state = {}
+        ts = self.create_tracker_stat("http://a", False, "Unregistered torrent", announce_time=100)
+        torrent = self.create_mock_torrent(1, [ts])
+
+        assert get_tracker_errors([torrent], min_failures=2, state=state) == {}
+        # Same announce seen again: no new failure
+        assert get_tracker_errors([torrent], min_failures=2, state=state) == {}
+        ts.last_announce_time = 200
+        assert get_tracker_errors([torrent], min_failures=2, state=state) == {1: "Unregistered torrent"}
+        assert state == {"hash1": {"http://a": [2, 200]}}
+
+    def test_missing_state_file_is_empty(self, tmp_path):
+        """A state file that does not exist yet should load as empty state."""
+        assert load_tracker_state(str(tmp_path / "state.json")) == {}
+
+    def test_error_strings_replace_torrent_errors(self):
+        """Pattern matching should use tracker errors instead of the torrent-level error."""
+        torrent = Mock()
+        torrent.id = 1
+        torrent.name = "t1"
+        torrent.error_string = ""
+
+        result = get_torrents_with_errors([torrent], "unregistered", error_strings={1: "Unregistered torrent"})
+
+        assert result == [torrent]
+
+
 class TestCheckCrossSeeding:
     """Tests for cross-seed detection."""
 
@@ -132,6 +331,83 @@ class TestCheckCrossSeeding:
         assert len(result) == 2
 
 
+class TestCrossSeedIndex:
+    """Tests for the shared cross-seed index."""
+
+    def create_mock_torrent(self, torrent_id, name, download_dir, file_names):
+        """Helper to create a mock torrent with files."""
+        torrent = Mock()
+        torrent.id = torrent_id
+        torrent.name = name
+        torrent.download_dir = download_dir
+        mock_files = []
+        for file_name in file_names:
+            mock_file = Mock()
+            mock_file.name = file_name
+            mock_files.append(mock_file)
+        torrent.get_files.return_value = mock_files
+        return torrent
+
+    def test_finds_each_cross_seeder_once(self):
+        """Torrents sharing several files should be reported once."""
+        target = self.create_mock_torrent(1, "target", "/data", ["pack/a.flac", "pack/b.flac"])
+        other = self.create_mock_torrent(2, "other", "/data", ["pack/a.flac", "pack/b.flac"])
+        unrelated = self.create_mock_torrent(3, "unrelated", "/data", ["movie.mkv"])
+
+        index = CrossSeedIndex([target, other, unrelated])
+
+        assert index.find(target) == [other]
+        assert index.find(unrelated) == []
+
+    def test_different_download_dirs_do_not_match(self):
+        """Same relative names in different download dirs are different files."""
+        target = self.create_mock_torrent(1, "target", "/data/a", ["movie.mkv"])
+        other = self.create_mock_torrent(2, "other", "/data/b", ["movie.mkv"])
+
+        assert CrossSeedIndex([target, other]).find(target) == []
+
+    def set_sizes(self, torrent, size):
+        """Helper to give every file of a mock torrent the same size."""
+        for file in torrent.get_files.return_value:
+            file.size = size
+
+    def test_signature_matches_relocated_cross_seed(self):
+        """Same size and name below the top-level folder should match across download dirs."""
+        target = self.create_mock_torrent(1, "target", "/data/a", ["Show.S01.GRP/ep1.mkv"])
+        other = self.create_mock_torrent(2, "other", "/data/b", ["Show S01 [GRP]/ep1.mkv"])
+        different = self.create_mock_torrent(3, "different", "/data/b", ["Other/ep1.mkv"])
+        self.set_sizes(target, 5 * 1024**3)
+        self.set_sizes(other, 5 * 1024**3)
+        self.set_sizes(different, 4 * 1024**3)
+
+        index = CrossSeedIndex([target, other, different], match="signature")
+
+        assert index.find(target) == [other]
+
+    def test_signature_ignores_small_files(self):
+        """Small extras with common names should not match by signature."""
+        target = self.create_mock_torrent(1, "target", "/data/a", ["Album/cover.jpg"])
+        other = self.create_mock_torrent(2, "other", "/data/b", ["Other Album/cover.jpg"])
+        self.set_sizes(target, 1000)
+        self.set_sizes(other, 1000)
+
+        assert CrossSeedIndex([target, other], match="signature").find(target) == []
+
+    def test_inode_matches_hardlinked_copy(self, tmp_path):
+        """Hardlinked copies with unrelated names should match by inode."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        (tmp_path / "a" / "movie.mkv").write_text("data")
+        (tmp_path / "b" / "Film (2020).mkv").hardlink_to(tmp_path / "a" / "movie.mkv")
+        target = self.create_mock_torrent(1, "target", str(tmp_path / "a"), ["movie.mkv"])
+        other = self.create_mock_torrent(2, "other", str(tmp_path / "b"), ["Film (2020).mkv"])
+        self.set_sizes(target, 4)
+        self.set_sizes(other, 4)
+
+        assert CrossSeedIndex([target, other], match="signature").find(target) == []
+        assert CrossSeedIndex([target, other], match="inode").find(target) == [other]
+
+
 class TestIsCrossSeeded:
     """Tests for is_cross_seeded convenience function."""
 
@@ -0,0 +1,95 @@
+"""Tests for gitignore-style exclusion rules."""
+
+from transmission_cleaner.exclusions import ExclusionRules, create_exclusions, load_exclusion_file
+
+
+class TestExclusionRules:
+    """Tests for pattern matching."""
+
+    def test_unanchored_patterns_match_at_any_depth(self):
+        """Patterns without a slash match names anywhere."""
+        rules = ExclusionRules(["*.nfo", "sample"])
+
+        assert rules.excludes("movie.nfo")
+        assert rules.excludes("a/b/movie.nfo")
+        assert rules.excludes("a/sample", is_dir=True)
+        assert not rules.excludes("movie.mkv")
+        assert not rules.excludes("a/nfo.mkv")
+
+    def test_anchored_patterns_match_from_root(self):
+        """Patterns with a slash are relative to the scanned root."""
+        rules = ExclusionRules(["/tmp", "tv/extras"])
+
+        assert rules.excludes("tmp", is_dir=True)
+        assert not rules.excludes("a/tmp", is_dir=True)
+        assert rules.excludes("tv/extras", is_dir=True)
+        assert not rules.excludes("x/tv/extras", is_dir=True)
+
+    def test_directory_only_patterns(self):
+        """A trailing slash only matches directories."""
+        rules = ExclusionRules(["@eaDir/"])
+
+        assert rules.excludes("music/@eaDir", is_dir=True)
+        assert not rules.excludes("music/@eaDir")
+
+    def test_double_star(self):
+        """** spans any number of directories."""
+        rules = ExclusionRules(["**/cache/*.tmp", "logs/**"])
+
+        assert rules.excludes("cache/a.tmp")
+        assert rules.excludes("x/y/cache/a.tmp")
+        assert not rules.excludes("x/cache/sub/a.tmp")
+        assert rules.excludes("logs/2024/jan.log")
+        assert not rules.excludes("logs", is_dir=True)
+
+    def test_character_classes(self):
+        """[...] and [!...] classes are supported."""
+        rules = ExclusionRules(["*.[tT][oO][rR][rR][eE][nN][tT]", "part[!0-9]"])
+
+        assert rules.excludes("a/Movie.TORRENT")
+        assert rules.excludes("partx")
+        assert not rules.excludes("part1")
+
+    def test_last_matching_rule_wins(self):
+        """A negated pattern re-includes what earlier rules excluded."""
+        rules = ExclusionRules([".*", "!.keep", "!.config/", ".config/secret"])
+
+        assert rules.excludes(".hidden")
+        assert not rules.excludes("a/.keep")
+        assert not rules.excludes(".config", is_dir=True)
+        assert rules.excludes(".config/secret")
+
+
+class TestCreateExclusions:
+    """Tests for building the rules of a scan."""
+
+    def test_defaults(self):
+        """System files, torrent files, hidden files and tool metadata directories are excluded."""
+        rules = create_exclusions()
+
+        assert rules.excludes("a/.DS_Store")
+        assert rules.excludes("Thumbs.db")
+        assert rules.excludes("x.Torrent")
+        assert rules.excludes(".hidden")
+        assert rules.excludes("music/@eaDir", is_dir=True)
+        assert rules.excludes(".incomplete", is_dir=True)
+        assert not rules.excludes("movie.mkv")
+
+    def test_include_hidden(self):
+        """Hidden files are kept on request, while hidden tool directories stay excluded."""
+        rules = create_exclusions(include_hidden=True)
+
+        assert not rules.excludes(".hidden")
+        assert rules.excludes(".stfolder", is_dir=True)
+
+    def test_patterns_from_file_and_arguments(self, tmp_path):
+        """Patterns are read from files, skipping blanks and comments, and given ones apply last."""
+        pattern_file = tmp_path / "excludes"
+        pattern_file.write_text("# comment\n\n*.nfo\n!@eaDir/\n")
+
+        assert load_exclusion_file(str(pattern_file)) == ["*.nfo", "!@eaDir/"]
+        rules = create_exclusions(patterns=["!keep.nfo"], pattern_files=[str(pattern_file)])
+
+        assert rules.excludes("a.nfo")
+        assert not rules.excludes("keep.nfo")
+        assert not rules.excludes("@eaDir", is_dir=True)
@@ -0,0 +1,41 @@
+"""Tests for external sorting through run files."""
+
+import random
+
+from transmission_cleaner import extsort
+from transmission_cleaner.extsort import ExternalSorter
+
+
+class TestExternalSorter:
+    """Tests for sorting records with bounded memory."""
+
+    def test_sorts_in_memory_below_limit(self, tmp_path):
+        """Records that fit in the limit are sorted without run files."""
+        with ExternalSorter(1, 1024**2, str(tmp_path)) as sorter:
+            for value in [b"c", b"a", b"b"]:
+                sorter.add((value,))
+
+            assert list(sorter) == [(b"a",), (b"b",), (b"c",)]
+            assert sorter._runs == []
+
+    def test_spills_and_merges_runs(self, tmp_path, monkeypatch):
+        """Records beyond the limit go through run files and come back sorted, across merge passes."""
+        monkeypatch.setattr(extsort, "MAX_MERGE_FANIN", 4)
+        monkeypatch.setattr(extsort, "READ_CHUNK_SIZE", 7)
+        records = [(f"/data/{random.random()}".encode(), b"%d" % i) for i in range(500)]
+
+        with ExternalSorter(2, 2000, str(tmp_path)) as sorter:
+            for record in records:
+                sorter.add(record)
+
+            assert list(sorter) == sorted(records)
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_empty_fields(self, tmp_path):
+        """Empty fields survive the round trip through a run file."""
+        with ExternalSorter(2, 1, str(tmp_path)) as sorter:
+            sorter.add((b"b", b""))
+            sorter.add((b"a", b"x"))
+
+            assert list(sorter) == [(b"a", b"x"), (b"b", b"")]
@@ -0,0 +1,130 @@
+"""Tests for the persistent file-list cache."""
+
+import sqlite3
+from unittest.mock import Mock, patch
+
+from transmission_rpc import Torrent
+
+from transmission_cleaner.filecache import CachedFilesClient, FileListCache
+
+
+def make_fields(torrent_id, hash_string, name, percent_done=1.0, edit_date=1000, inner="a.bin"):
+    """Helper to create torrent-get fields with two files, the second unwanted."""
+    return {
+        "id": torrent_id,
+        "hashString": hash_string,
+        "name": name,
+        "editDate": edit_date,
+        "downloadDir": "/data",
+        "percentDone": percent_done,
+        "priorities": [0, 0],
+        "wanted": [1, 0],
+        "files": [
+            {"name": f"{name}/{inner}", "length": 10, "bytesCompleted": 10 if percent_done == 1 else 3},
+            {"name": f"{name}/b.bin", "length": 20, "bytesCompleted": 0},
+        ],
+    }
+
+
+def create_client(*fields_list):
+    """Helper to create a mock client that honours the requested fields and IDs."""
+    by_id = {fields["id"]: fields for fields in fields_list}
+    client = Mock()
+
+    def get_torrents(ids=None, arguments=None, timeout=None):
+        selected = by_id.values() if ids is None else [by_id[i] for i in ids]
+        wanted = set(arguments) | {"id", "hashString"}
+        return [Torrent(fields={k: v for k, v in fields.items() if k in wanted}) for fields in selected]
+
+    client.get_torrents.side_effect = get_torrents
+    return client
+
+
+class TestCachedFilesClient:
+    """Tests for serving file lists from the cache."""
+
+    @patch("builtins.print")
+    def test_second_run_does_not_fetch_files(self, mock_print, tmp_path):
+        """File lists fetched once are served from the cache on the next run."""
+        cache_file = str(tmp_path / "files.sqlite")
+        fields = [make_fields(1, "aaa", "one"), make_fields(2, "bbb", "two")]
+
+        first = CachedFilesClient(create_client(*fields), FileListCache(cache_file)).get_torrents()
+        client = create_client(*fields)
+        second = CachedFilesClient(client, FileListCache(cache_file)).get_torrents()
+
+        assert client.get_torrents.call_count == 1
+        assert "files" not in client.get_torrents.call_args.kwargs["arguments"]
+        assert [[f[:3] for f in t.get_files()] for t in second] == [[f[:3] for f in t.get_files()] for t in first]
+        assert [f.selected for f in second[0].get_files()] == [True, False]
+
+    @patch("builtins.print")
+    def test_renamed_and_incomplete_torrents_are_refetched(self, mock_print, tmp_path):
+        """Torrents renamed since caching, or still downloading, get their files fetched."""
+        cache = FileListCache(str(tmp_path / "files.sqlite"))
+        CachedFilesClient(
+            create_client(make_fields(1, "aaa", "one"), make_fields(2, "bbb", "two")), cache
+        ).get_torrents()
+
+        client = create_client(make_fields(1, "aaa", "renamed"), make_fields(2, "bbb", "two", percent_done=0.5))
+        torrents = CachedFilesClient(client, cache).get_torrents()
+
+        assert client.get_torrents.call_args.kwargs["ids"] == [1, 2]
+        assert torrents[0].get_files()[0].name == "renamed/a.bin"
+        assert torrents[1].get_files()[0].completed == 3
+
+    @patch("builtins.print")
+    def test_inner_rename_is_refetched(self, mock_print, tmp_path):
+        """A file renamed inside a torrent changes its edit date, so its files are fetched again."""
+        cache = FileListCache(str(tmp_path / "files.sqlite"))
+        CachedFilesClient(create_client(make_fields(1, "aaa", "one")), cache).get_torrents()
+
+        client = create_client(make_fields(1, "aaa", "one", edit_date=2000, inner="renamed.bin"))
+        torrents = CachedFilesClient(client, cache).get_torrents()
+
+        assert client.get_torrents.call_args.kwargs["ids"] == [1]
+        assert torrents[0].get_files()[0].name == "one/renamed.bin"
+
+    @patch("builtins.print")
+    def test_missing_edit_date_bypasses_cache(self, mock_print, tmp_path):
+        """Without edit dates from the daemon, renames cannot be detected and files are always fetched."""
+        cache = FileListCache(str(tmp_path / "files.sqlite"))
+        fields = make_fields(1, "aaa", "one")
+        del fields["editDate"]
+        CachedFilesClient(create_client(fields), cache).get_torrents()
+
+        client = create_client(fields)
+        CachedFilesClient(client, cache).get_torrents()
+
+        assert client.get_torrents.call_count == 2
+
+    def test_cache_without_edit_dates_is_replaced(self, tmp_path):
+        """A cache file written before edit dates were stored is emptied rather than misread."""
+        path = str(tmp_path / "files.sqlite")
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE files (hash TEXT PRIMARY KEY, name TEXT, data BLOB)")
+        connection.execute("INSERT INTO files VALUES ('aaa', 'one', x'00')")
+        connection.commit()
+        connection.close()
+
+        assert FileListCache(path).get(["aaa"]) == {}
+
+    def test_fields_without_files_pass_through(self, tmp_path):
+        """Requests that do not include files go straight to the client."""
+        client = create_client(make_fields(1, "aaa", "one"))
+
+        CachedFilesClient(client, FileListCache(str(tmp_path / "files.sqlite"))).get_torrents(arguments=["name"])
+
+        client.get_torrents.assert_called_once_with(ids=None, arguments=["name"], timeout=None)
+
+    @patch("builtins.print")
+    def test_removed_torrents_are_dropped_from_cache(self, mock_print, tmp_path):
+        """A full fetch drops cache entries of torrents that no longer exist."""
+        cache = FileListCache(str(tmp_path / "files.sqlite"))
+        CachedFilesClient(
+            create_client(make_fields(1, "aaa", "one"), make_fields(2, "bbb", "two")), cache
+        ).get_torrents()
+
+        CachedFilesClient(create_client(make_fields(1, "aaa", "one")), cache).get_torrents()
+
+        assert set(cache.get(["aaa", "bbb"])) == {"aaa"}
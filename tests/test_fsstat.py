@@ -0,0 +1,109 @@
+"""Tests for locality-ordered stat scheduling."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from transmission_cleaner.fsstat import SUPPORTS_DIR_FD, DirStat, stat_paths
+
+
+class TestStatPaths:
+    """Tests for grouping and ordering stat calls."""
+
+    def test_returns_stat_for_every_path(self, tmp_path):
+        """Every path gets its stat result, whatever its directory."""
+        (tmp_path / "sub").mkdir()
+        paths = [tmp_path / "a.bin", tmp_path / "sub" / "b.bin", tmp_path / "c.bin"]
+        for i, path in enumerate(paths):
+            path.write_bytes(b"x" * i)
+
+        for inode_order in (True, False):
+            results = stat_paths(paths, inode_order)
+
+            assert {path: result.st_size for path, result in results.items()} == {
+                paths[0]: 0,
+                paths[1]: 1,
+                paths[2]: 2,
+            }
+
+    def test_missing_files_and_directories_are_errors(self, tmp_path):
+        """Missing files and files in missing directories map to FileNotFoundError."""
+        (tmp_path / "a.bin").touch()
+        missing_file = tmp_path / "missing.bin"
+        missing_dir_file = tmp_path / "nodir" / "x.bin"
+
+        for inode_order in (True, False):
+            results = stat_paths([tmp_path / "a.bin", missing_file, missing_dir_file], inode_order)
+
+            assert isinstance(results[missing_file], FileNotFoundError)
+            assert isinstance(results[missing_dir_file], FileNotFoundError)
+            assert not isinstance(results[tmp_path / "a.bin"], OSError)
+
+    def test_entries_are_stat_ed_in_inode_order(self, tmp_path):
+        """Within a directory, entries are visited by inode number, not in the order given."""
+        paths = [tmp_path / f"f{i}" for i in range(20)]
+        for path in paths:
+            path.touch()
+        inode_order = sorted(paths, key=lambda p: p.stat().st_ino)
+
+        with patch("transmission_cleaner.fsstat.os.stat", wraps=os.stat) as mock_stat:
+            stat_paths(list(reversed(paths)))
+
+        visited = [os.path.basename(call.args[0]) for call in mock_stat.call_args_list if call.args[0] != str(tmp_path)]
+        assert visited == [path.name for path in inode_order]
+
+
+class TestDirStat:
+    """Tests for directory-relative stat calls."""
+
+    def test_stat_matches_lstat(self, tmp_path):
+        """Results match lstat of the full path, without following symlinks."""
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "a.bin").write_bytes(b"abc")
+        (tmp_path / "sub" / "link").symlink_to(tmp_path / "sub" / "a.bin")
+
+        with DirStat() as dir_stat:
+            for path in (tmp_path / "sub" / "a.bin", tmp_path / "sub" / "link"):
+                st = dir_stat.stat(path)
+
+                assert (st.st_ino, st.st_size) == (path.lstat().st_ino, path.lstat().st_size)
+
+    def test_missing_file_raises(self, tmp_path):
+        """Missing files and directories raise FileNotFoundError."""
+        with DirStat() as dir_stat:
+            with pytest.raises(FileNotFoundError):
+                dir_stat.stat(tmp_path / "missing.bin")
+            with pytest.raises(FileNotFoundError):
+                dir_stat.stat(tmp_path / "nodir" / "missing.bin")
+
+    def test_unopenable_directory_falls_back_to_path(self, tmp_path):
+        """Entries of a directory that cannot be opened are stat-ed by full path."""
+        (tmp_path / "a.bin").write_bytes(b"abc")
+
+        with (
+            patch("transmission_cleaner.fsstat.os.open", side_effect=PermissionError("execute-only")),
+            DirStat() as dir_stat,
+        ):
+            st = dir_stat.stat(tmp_path / "a.bin")
+
+        assert st.st_ino == (tmp_path / "a.bin").lstat().st_ino
+
+    @pytest.mark.skipif(not SUPPORTS_DIR_FD, reason="dir_fd is not supported on this platform")
+    def test_open_directories_are_bounded(self, tmp_path):
+        """At most max_open directories stay open, and all are closed on exit."""
+        paths = []
+        for i in range(5):
+            (tmp_path / f"d{i}").mkdir()
+            paths.append(tmp_path / f"d{i}" / "f.bin")
+            paths[-1].touch()
+
+        with (
+            patch("transmission_cleaner.fsstat.os.close", wraps=os.close) as mock_close,
+            DirStat(max_open=2) as dir_stat,
+        ):
+            for path in paths + paths:
+                dir_stat.stat(path)
+            assert len(dir_stat._fds) == 2
+
+        assert mock_close.call_count == 2 * len(paths)
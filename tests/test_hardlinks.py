@@ -1,8 +1,19 @@
 """Tests for hardlink detection functionality."""
 
+import os
+import random
 from unittest.mock import Mock, patch
 
-from transmission_cleaner.checkers.hardlinks import get_torrents_without_hardlinks, is_hardlink
+from transmission_rpc import Torrent
+
+from transmission_cleaner.checkers.hardlinks import (
+    SAMPLE_LARGEST,
+    get_sample_size,
+    get_torrents_likely_without_hardlinks,
+    get_torrents_without_hardlinks,
+    is_hardlink,
+    sample_files,
+)
 
 
 class TestIsHardlink:
@@ -38,6 +49,8 @@ class TestGetTorrentsWithoutHardlinks:
         for file_name in files:
             mock_file = Mock()
             mock_file.name = file_name
+            mock_file.size = mock_file.completed = 1
+            mock_file.selected = True
             mock_files.append(mock_file)
         torrent.get_files.return_value = mock_files
         return torrent
@@ -74,3 +87,211 @@ class TestGetTorrentsWithoutHardlinks:
 
         assert result == []
         mock_print.assert_called()
+
+    @patch("builtins.print")
+    def test_scheduled_stat_matches_default(self, mock_print, tmp_path):
+        """Scheduled stat-ing selects the same torrents as checking torrent by torrent."""
+        (tmp_path / "single.bin").touch()
+        (tmp_path / "linked.bin").touch()
+        os.link(tmp_path / "linked.bin", tmp_path / "link.bin")
+        torrents = [
+            self.create_mock_torrent("single", str(tmp_path), ["single.bin"]),
+            self.create_mock_torrent("linked", str(tmp_path), ["linked.bin"]),
+            self.create_mock_torrent("missing", str(tmp_path), ["missing.bin"]),
+        ]
+
+        for schedule in ("directory", "inode"):
+            result = get_torrents_without_hardlinks(torrents, schedule)
+
+            assert [t.name for t in result] == [t.name for t in get_torrents_without_hardlinks(torrents)]
+            assert [t.name for t in result] == ["single"]
+
+    @patch("builtins.print")
+    def test_skips_files_without_data(self, mock_print, tmp_path):
+        """Never-downloaded files are not stat-ed, and missing incomplete files are not errors."""
+        (tmp_path / "done.mkv").touch()
+        torrent = Torrent(
+            fields={
+                "id": 1,
+                "name": "pack",
+                "downloadDir": str(tmp_path),
+                "files": [
+                    {"name": "done.mkv", "length": 10, "bytesCompleted": 10},
+                    {"name": "deselected.mkv", "length": 10, "bytesCompleted": 0},
+                    {"name": "partial.mkv", "length": 10, "bytesCompleted": 4},
+                ],
+                "priorities": [0, 0, 0],
+                "wanted": [1, 0, 1],
+            }
+        )
+
+        with patch("transmission_cleaner.fsstat.os.stat", wraps=os.stat) as mock_stat:
+            result = get_torrents_without_hardlinks([torrent])
+
+        assert result == [torrent]
+        assert not any("deselected" in str(call.args[0]) for call in mock_stat.call_args_list)
+        for schedule in ("directory", "inode"):
+            assert get_torrents_without_hardlinks([torrent], schedule) == [torrent]
+        mock_print.assert_not_called()
+
+    @patch("builtins.print")
+    def test_torrents_with_nothing_on_disk_are_not_selected(self, mock_print, tmp_path):
+        """Just added and partially downloaded torrents whose files are all elsewhere are never selected."""
+        torrents = [
+            Torrent(
+                fields={
+                    "id": torrent_id,
+                    "name": name,
+                    "downloadDir": str(tmp_path / "missing"),
+                    "files": [{"name": f"{name}.mkv", "length": 100, "bytesCompleted": completed}],
+                    "priorities": [0],
+                    "wanted": [1],
+                }
+            )
+            for torrent_id, name, completed in [(1, "added", 0), (2, "partial", 50)]
+        ]
+
+        assert get_torrents_without_hardlinks(torrents) == []
+        for schedule in ("directory", "inode"):
+            assert get_torrents_without_hardlinks(torrents, schedule) == []
+        assert get_torrents_likely_without_hardlinks(torrents, 0.9) == []
+        mock_print.assert_not_called()
+
+
+class TestSampling:
+    """Tests for sampled hardlink checks."""
+
+    def create_files(self, sizes):
+        """Helper to create mock torrent files of the given sizes."""
+        files = []
+        for index, size in enumerate(sizes):
+            file = Mock()
+            file.name = f"file{index:04d}.bin"
+            file.size = size
+            files.append(file)
+        return files
+
+    def test_sample_size_grows_with_confidence(self):
+        """Higher confidence needs more files."""
+        assert get_sample_size(0) == 0
+        assert get_sample_size(0.9) < get_sample_size(0.99) < get_sample_size(0.999)
+
+    def test_small_torrents_are_fully_checked(self):
+        """Torrents with few files are checked completely."""
+        files = self.create_files(range(20))
+
+        assert len(sample_files(files, 0.99, random.Random(0))) == 20
+
+    def test_largest_files_always_sampled(self):
+        """The largest files are in every sample, plus a random sample of the rest."""
+        files = self.create_files(range(1000))
+
+        sampled = sample_files(files, 0.9, random.Random(0))
+
+        assert len(sampled) == SAMPLE_LARGEST + get_sample_size(0.9)
+        assert {f.size for f in sampled[:SAMPLE_LARGEST]} == set(range(990, 1000))
+        assert len({f.name for f in sampled}) == len(sampled)
+
+    def test_full_confidence_checks_every_file(self):
+        """A confidence of 1 samples every file."""
+        files = self.create_files(range(1000))
+
+        assert len(sample_files(files, 1, random.Random(0))) == 1000
+
+    def create_torrent(self, download_dir, sizes):
+        """Helper to create a torrent with files of the given sizes on disk."""
+        names = [f"file{index:04d}.bin" for index in range(len(sizes))]
+        for name in names:
+            (download_dir / name).touch()
+        return Torrent(
+            fields={
+                "id": 1,
+                "name": "pack",
+                "downloadDir": str(download_dir),
+                "files": [{"name": n, "length": size, "bytesCompleted": size} for n, size in zip(names, sizes)],
+                "priorities": [0] * len(sizes),
+                "wanted": [1] * len(sizes),
+            }
+        )
+
+    @patch("builtins.print")
+    def test_sampling_can_miss_but_verification_does_not(self, mock_print, tmp_path):
+        """A hardlink among small files may be missed by sampling, never by the full check."""
+        torrent = self.create_torrent(tmp_path, [1000] * SAMPLE_LARGEST + [1] * 500)
+        os.link(tmp_path / "file0509.bin", tmp_path / "link.bin")
+
+        for schedule in (None, "inode"):
+            likely = get_torrents_likely_without_hardlinks([torrent], 0, schedule)
+
+            assert likely == [torrent]
+        assert get_torrents_without_hardlinks(likely, "inode") == []
+
+    @patch("builtins.print")
+    def test_sampled_hardlink_excludes_torrent(self, mock_print, tmp_path):
+        """A hardlinked large file is always found."""
+        torrent = self.create_torrent(tmp_path, [1000] + [1] * 500)
+        os.link(tmp_path / "file0000.bin", tmp_path / "link.bin")
+
+        assert get_torrents_likely_without_hardlinks([torrent], 0.5) == []
+
+
+class TestDeadline:
+    """Tests for time-budgeted hardlink checks."""
+
+    def create_torrents(self, tmp_path, sizes):
+        """Helper to create unlinked torrents of the given sizes, one file each."""
+        torrents = []
+        for i, size in enumerate(sizes):
+            (tmp_path / f"file{i}").touch()
+            torrents.append(
+                Torrent(
+                    fields={
+                        "id": i,
+                        "name": f"torrent{i}",
+                        "downloadDir": str(tmp_path),
+                        "totalSize": size,
+                        "files": [{"name": f"file{i}", "length": size, "bytesCompleted": size}],
+                        "priorities": [0],
+                        "wanted": [1],
+                    }
+                )
+            )
+        return torrents
+
+    @patch("builtins.print")
+    def test_checks_largest_first_until_deadline(self, mock_print, tmp_path):
+        """Torrents are checked largest first, and the rest are left once the deadline passes."""
+        torrents = self.create_torrents(tmp_path, [10, 30, 20])
+        deadline = Mock()
+        deadline.reached.side_effect = [False, False, True]
+
+        result = get_torrents_without_hardlinks(torrents, deadline=deadline)
+
+        assert [t.total_size for t in result] == [30, 20]
+        mock_print.assert_called_with("[WARN]   Runtime limit reached, 1 of 3 torrents left unchecked")
+
+    @patch("builtins.print")
+    def test_scheduled_and_sampled_checks_stop_at_deadline(self, mock_print, tmp_path):
+        """A passed deadline stops every mode before any file is stat-ed."""
+        torrents = self.create_torrents(tmp_path, [10, 30])
+        deadline = Mock()
+        deadline.reached.return_value = True
+
+        with patch("transmission_cleaner.checkers.hardlinks.stat_paths") as mock_stat_paths:
+            assert get_torrents_without_hardlinks(torrents, "inode", deadline) == []
+            assert get_torrents_likely_without_hardlinks(torrents, 0.9, "inode", deadline=deadline) == []
+        mock_stat_paths.assert_not_called()
+
+    @patch("builtins.print")
+    def test_results_largest_first_with_deadline(self, mock_print, tmp_path):
+        """With time left, every mode finds every torrent, largest first."""
+        torrents = self.create_torrents(tmp_path, [10, 30, 20])
+        deadline = Mock()
+        deadline.reached.return_value = False
+
+        for schedule in (None, "directory", "inode"):
+            result = get_torrents_without_hardlinks(torrents, schedule, deadline)
+            likely = get_torrents_likely_without_hardlinks(torrents, 0.9, schedule, deadline=deadline)
+
+            assert [t.total_size for t in result] == [30, 20, 10]
+            assert [t.total_size for t in likely] == [30, 20, 10]
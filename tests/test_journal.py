@@ -0,0 +1,227 @@
+"""Tests for the deletion journal and resuming interrupted runs."""
+
+import pathlib
+from unittest.mock import Mock, patch
+
+import pytest
+from transmission_rpc import Torrent
+
+from transmission_cleaner.actions import process_orphaned_files, process_torrents, resume_journal
+from transmission_cleaner.deleter import LocalDeleter
+from transmission_cleaner.journal import DELETED, REMOVED, SKIPPED, Journal, file_key, torrent_key
+
+
+def create_mock_torrent(name, torrent_id, hash_string, download_dir="/data", file_names=()):
+    """Helper to create a mock torrent."""
+    torrent = Mock(spec=Torrent)
+    torrent.name = name
+    torrent.id = torrent_id
+    torrent.hash_string = hash_string
+    torrent.total_size = 1024
+    torrent.download_dir = download_dir
+    files = []
+    for file_name in file_names:
+        file = Mock()
+        file.name = file_name
+        file.size = file.completed = 1
+        file.selected = True
+        files.append(file)
+    torrent.get_files.return_value = files
+    return torrent
+
+
+class TestJournal:
+    """Tests for journal records and pending items."""
+
+    def test_pending_excludes_finished_items(self, tmp_path):
+        """Items are pending until their final step is recorded."""
+        path = str(tmp_path / "journal.ndjson")
+        journal = Journal.create(path, "hardlinks")
+        daemon = create_mock_torrent("daemon", 1, "aaa")
+        local = create_mock_torrent("local", 2, "bbb", file_names=["x.bin"])
+        journal.plan_torrent(daemon, delete_data=True)
+        journal.plan_torrent(local, delete_data=False, local=True)
+        journal.plan_file(pathlib.Path("/data/orphan"))
+        journal.mark_done([torrent_key(daemon), torrent_key(local)], REMOVED)
+        journal.close()
+
+        pending = Journal.open(path).pending()
+
+        assert [record["name"] for record in pending if record["kind"] == "torrent"] == ["local"]
+        assert pending[0]["files"] == ["x.bin"]
+        assert pending[0]["steps"] == {REMOVED}
+        assert [record["path"] for record in pending if record["kind"] == "file"] == [str(pathlib.Path("/data/orphan"))]
+
+    def test_truncated_last_line_is_ignored(self, tmp_path):
+        """A record cut short by a crash does not break reading the journal."""
+        path = tmp_path / "journal.ndjson"
+        journal = Journal.create(str(path), "orphans")
+        journal.plan_file(pathlib.Path("/data/orphan"))
+        journal.close()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"type": "done", "key": "file:/da')
+
+        assert len(Journal.open(str(path)).pending()) == 1
+
+    def test_create_refuses_unfinished_journal(self, tmp_path):
+        """A journal with pending items is not overwritten by a new run."""
+        path = str(tmp_path / "journal.ndjson")
+        journal = Journal.create(path, "orphans")
+        journal.plan_file(pathlib.Path("/data/orphan"))
+        journal.close()
+
+        with pytest.raises(FileExistsError, match="1 unfinished items"):
+            Journal.create(path, "orphans")
+
+        assert len(Journal.open(path).pending()) == 1
+
+    def test_create_overwrites_finished_journal(self, tmp_path):
+        """A journal whose items are all done is replaced."""
+        path = str(tmp_path / "journal.ndjson")
+        journal = Journal.create(path, "orphans")
+        journal.plan_file(pathlib.Path("/data/orphan"))
+        journal.mark_done([file_key(pathlib.Path("/data/orphan"))], SKIPPED)
+        journal.close()
+
+        Journal.create(path, "hardlinks").close()
+
+        assert Journal.open(path).command == "hardlinks"
+
+
+class TestJournaledActions:
+    """Tests for journaling the action processors."""
+
+    @patch("builtins.print")
+    def test_remove_action_marks_each_torrent(self, mock_print, tmp_path):
+        """Removed torrents are no longer pending."""
+        journal = Journal.create(str(tmp_path / "journal.ndjson"), "hardlinks")
+        torrents = [create_mock_torrent("t1", 1, "aaa"), create_mock_torrent("t2", 2, "bbb")]
+
+        process_torrents(Mock(), torrents, "remove", journal=journal)
+
+        assert journal.pending() == []
+
+    @patch("builtins.print")
+    def test_orphan_delete_marks_deleted_files(self, mock_print, tmp_path):
+        """Deleted and already missing files are marked, files that failed stay pending."""
+        journal = Journal.create(str(tmp_path / "journal.ndjson"), "orphans")
+        present = tmp_path / "present.bin"
+        present.write_bytes(b"x")
+        missing = tmp_path / "missing.bin"
+
+        process_orphaned_files([present, missing], "delete", deleter=LocalDeleter(), journal=journal)
+
+        assert journal.pending() == []
+
+
+class TestResumeJournal:
+    """Tests for resuming an interrupted run."""
+
+    @patch("builtins.print")
+    def test_resume_removes_remaining_torrents_by_hash(self, mock_print, tmp_path):
+        """Torrents still in the client are found by hash, even with a new ID; gone ones are skipped."""
+        journal = Journal.create(str(tmp_path / "journal.ndjson"), "errors")
+        journal.plan_torrent(create_mock_torrent("done", 1, "aaa"), delete_data=True)
+        journal.plan_torrent(create_mock_torrent("left", 2, "bbb"), delete_data=True)
+        journal.plan_torrent(create_mock_torrent("gone", 3, "ccc"), delete_data=True)
+        journal.mark_done(["torrent:aaa"], REMOVED)
+
+        client = Mock()
+        client.get_torrents.return_value = [create_mock_torrent("left", 7, "bbb")]
+
+        result = resume_journal(client, journal)
+
+        client.remove_torrent.assert_called_once_with([7], delete_data=True)
+        assert result == 1024
+        assert journal.pending() == []
+
+    @patch("builtins.print")
+    def test_resume_deletes_data_of_removed_torrents(self, mock_print, tmp_path):
+        """Local deletion carries on from the journaled file list of a torrent already removed."""
+        (tmp_path / "pack").mkdir()
+        (tmp_path / "pack" / "a.bin").write_bytes(b"x" * 10)
+        torrent = create_mock_torrent("pack", 1, "aaa", str(tmp_path), ["pack/a.bin"])
+        journal = Journal.create(str(tmp_path / "journal.ndjson"), "hardlinks")
+        journal.plan_torrent(torrent, delete_data=False, local=True)
+        journal.mark_done([torrent_key(torrent)], REMOVED)
+
+        client = Mock()
+        client.get_torrents.return_value = []
+        result = resume_journal(client, journal, LocalDeleter())
+
+        client.remove_torrent.assert_not_called()
+        assert result == 10
+        assert not (tmp_path / "pack").exists()
+        assert journal.pending() == []
+
+    @patch("builtins.print")
+    def test_resume_deletes_remaining_files(self, mock_print, tmp_path):
+        """Only files not yet marked deleted are deleted."""
+        kept = tmp_path / "kept.bin"
+        kept.write_bytes(b"x")
+        left = tmp_path / "left.bin"
+        left.write_bytes(b"xx")
+        journal = Journal.create(str(tmp_path / "journal.ndjson"), "orphans")
+        journal.plan_file(kept)
+        journal.plan_file(left)
+        # Recreated after the first run deleted it: not touched again
+        journal.mark_done([file_key(kept)], DELETED)
+
+        client = Mock()
+        client.get_torrents.return_value = []
+        result = resume_journal(client, journal, LocalDeleter())
+
+        assert result == 2
+        assert kept.exists()
+        assert not left.exists()
+
+    @patch("builtins.print")
+    def test_resume_skips_file_tracked_again(self, mock_print, tmp_path):
+        """A file planned as orphaned that a torrent tracks now is not deleted."""
+        orphan = tmp_path / "movie.mkv"
+        orphan.write_bytes(b"x")
+        journal = Journal.create(str(tmp_path / "journal.ndjson"), "orphans")
+        journal.plan_file(orphan)
+
+        client = Mock()
+        client.get_torrents.return_value = [create_mock_torrent("new", 1, "aaa", str(tmp_path), ["movie.mkv"])]
+        result = resume_journal(client, journal, LocalDeleter())
+
+        assert result == 0
+        assert orphan.exists()
+        assert journal.pending() == []
+
+    @patch("builtins.print")
+    def test_resume_keeps_torrent_that_gained_hardlink(self, mock_print, tmp_path):
+        """A torrent of a hardlinks run that is hardlinked by now is neither removed nor deleted."""
+        (tmp_path / "a.bin").write_bytes(b"x")
+        torrent = create_mock_torrent("linked", 1, "aaa", str(tmp_path), ["a.bin"])
+        journal = Journal.create(str(tmp_path / "journal.ndjson"), "hardlinks")
+        journal.plan_torrent(torrent, delete_data=False, local=True)
+        (tmp_path / "b.bin").hardlink_to(tmp_path / "a.bin")
+
+        client = Mock()
+        client.get_torrents.return_value = [torrent]
+        result = resume_journal(client, journal, LocalDeleter())
+
+        client.remove_torrent.assert_not_called()
+        assert result == 0
+        assert (tmp_path / "a.bin").exists()
+        assert journal.pending() == []
+
+    @patch("builtins.print")
+    def test_resume_keeps_data_shared_with_new_torrent(self, mock_print, tmp_path):
+        """A torrent whose files a cross-seed added since also uses is removed without its data."""
+        (tmp_path / "a.bin").write_bytes(b"x")
+        torrent = create_mock_torrent("pack", 1, "aaa", str(tmp_path), ["a.bin"])
+        journal = Journal.create(str(tmp_path / "journal.ndjson"), "errors")
+        journal.plan_torrent(torrent, delete_data=True)
+
+        client = Mock()
+        client.get_torrents.return_value = [torrent, create_mock_torrent("cross", 2, "bbb", str(tmp_path), ["a.bin"])]
+        result = resume_journal(client, journal, LocalDeleter())
+
+        client.remove_torrent.assert_called_once_with([1], delete_data=False)
+        assert result == 0
+        assert (tmp_path / "a.bin").exists()
+        assert journal.pending() == []
@@ -1,10 +1,24 @@
 """Tests for main module functionality."""
 
-from unittest.mock import patch
+import io
+import json
+import threading
+from unittest.mock import Mock, patch
 
 import pytest
+from transmission_rpc import Session, Torrent
 
-from transmission_cleaner.main import parse_args
+from transmission_cleaner.filecache import CachedFilesClient, FileListCache
+from transmission_cleaner.main import (
+    handle_check,
+    handle_errors,
+    handle_hardlinks,
+    handle_merge,
+    handle_orphans,
+    parse_args,
+    run_command,
+)
+from transmission_cleaner.reporters import create_reporter
 
 
 class TestParseArgsHardlinks:
@@ -74,6 +88,27 @@ class TestParseArgsHardlinks:
         assert args.command == "hardlinks"
         assert args.action == "delete"
 
+    @patch(
+        "sys.argv",
+        ["transmission-cleaner", "hardlinks", "--password", "pass", "--free-until", "85%", "--score", "ratio"],
+    )
+    def test_hardlinks_free_space_target(self):
+        """Should parse free-space target options."""
+        args = parse_args()
+
+        assert args.free_until == 0.85
+        assert args.free is None
+        assert args.score == "ratio"
+
+    @patch("sys.argv", ["transmission-cleaner", "errors", "--password", "pass", "--free", "500G"])
+    def test_errors_free_size_target(self):
+        """Should parse a free-space size target."""
+        args = parse_args()
+
+        assert args.free == 500 * 1024**3
+        assert args.free_until is None
+        assert args.score == "age"
+
 
 class TestParseArgsErrors:
     """Tests for errors subcommand argument parsing."""
@@ -88,6 +123,7 @@ class TestParseArgsErrors:
         assert args.action == "list"  # Changed default
         assert args.error_pattern is None
         assert args.skip_cross_seed is False  # Cross-seed check enabled by default
+        assert args.cross_seed_match == "signature"
 
     @patch(
         "sys.argv",
@@ -124,6 +160,137 @@ class TestParseArgsErrors:
         assert args.command == "errors"
         assert args.action == "interactive"
 
+    @patch("sys.argv", ["transmission-cleaner", "errors", "--password", "pass", "--error-rules", "rules.json"])
+    def test_errors_rules_file(self):
+        """Should parse the error rules file."""
+        args = parse_args()
+
+        assert args.error_rules == "rules.json"
+        assert args.classify is False
+
+    @patch(
+        "sys.argv",
+        ["transmission-cleaner", "errors", "--password", "pass", "--classify", "--error-pattern", "Unregistered"],
+    )
+    def test_errors_classify_excludes_pattern(self):
+        """Should reject combining a single pattern with classification."""
+        with pytest.raises(SystemExit):
+            parse_args()
+
+
+class TestParseArgsMinFailures:
+    """Tests for the consecutive failure threshold."""
+
+    @patch(
+        "sys.argv", ["transmission-cleaner", "errors", "--password", "pass", "--tracker-stats", "--min-failures", "0"]
+    )
+    def test_rejects_zero(self):
+        """Should reject a threshold every announced torrent would meet."""
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    @patch(
+        "sys.argv", ["transmission-cleaner", "errors", "--password", "pass", "--tracker-stats", "--min-failures", "3"]
+    )
+    def test_above_one_requires_state(self):
+        """Should reject a threshold no run can reach without saved failure counts."""
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    @patch(
+        "sys.argv",
+        [
+            "transmission-cleaner",
+            "errors",
+            "--password",
+            "pass",
+            "--tracker-stats",
+            "--min-failures",
+            "3",
+            "--tracker-state",
+            "state.json",
+        ],
+    )
+    def test_above_one_with_state(self):
+        """Should accept a higher threshold when failure counts are kept between runs."""
+        assert parse_args().min_failures == 3
+
+
+class TestErrorRuleActions:
+    """Tests for per-category actions from the error rules."""
+
+    def run_errors(self, tmp_path, *extra_args):
+        """Run the errors command on one unregistered torrent with a rule that removes it."""
+        rules_file = tmp_path / "rules.json"
+        rules_file.write_text(json.dumps({"unregistered": {"patterns": ["unregistered"], "action": "remove"}}))
+        torrent = Torrent(
+            fields={
+                "id": 1,
+                "hashString": "a" * 40,
+                "name": "gone",
+                "downloadDir": str(tmp_path),
+                "totalSize": 1,
+                "status": 6,
+                "secondsSeeding": 0,
+                "error": 2,
+                "errorString": "Unregistered torrent",
+            }
+        )
+        client = Mock()
+        client.get_torrents.return_value = [torrent]
+        argv = ["transmission-cleaner", "errors", "--password", "pass", "--min-days", "0", "--skip-cross-seed"]
+        with patch("sys.argv", [*argv, "--error-rules", str(rules_file), *extra_args]):
+            args = parse_args()
+        handle_errors(client, args, create_reporter("ndjson", io.StringIO()))
+        return client
+
+    @patch("builtins.print")
+    def test_rule_actions_ignored_by_default(self, mock_print, tmp_path):
+        """A rule's action does not override the default list action."""
+        client = self.run_errors(tmp_path)
+
+        client.remove_torrent.assert_not_called()
+
+    @patch("builtins.print")
+    def test_rule_actions_run_when_asked(self, mock_print, tmp_path):
+        """With --rule-actions, each category runs its own action."""
+        client = self.run_errors(tmp_path, "--rule-actions")
+
+        client.remove_torrent.assert_called_once_with(1, delete_data=False)
+
+    @patch("sys.argv", ["transmission-cleaner", "errors", "--password", "pass", "--rule-actions"])
+    def test_rule_actions_require_rules(self):
+        """Should reject --rule-actions without --error-rules."""
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    @patch("builtins.print")
+    def test_invalid_rules_exit_with_error(self, mock_print, tmp_path):
+        """A malformed rules file ends the run with an error message instead of a traceback."""
+        rules_file = tmp_path / "rules.json"
+        rules_file.write_text('{"gone": {"patterns": ["re:not (found"]}}')
+        client = Mock()
+        client.get_torrents.return_value = []
+        argv = ["transmission-cleaner", "errors", "--password", "pass", "--error-rules", str(rules_file)]
+        with patch("sys.argv", argv):
+            args = parse_args()
+
+        with pytest.raises(SystemExit):
+            handle_errors(client, args)
+        assert mock_print.call_args.args[0].startswith("[ERROR]  Cannot load error rules:")
+
+    @patch("builtins.print")
+    @patch("sys.argv", ["transmission-cleaner", "errors", "--password", "pass", "--error-pattern", "re:("])
+    def test_invalid_error_pattern_exits_with_error(self, mock_print):
+        """An invalid --error-pattern ends the run with an error message before fetching."""
+        args = parse_args()
+        client = Mock()
+
+        with pytest.raises(SystemExit):
+            handle_errors(client, args)
+        client.get_torrents.assert_not_called()
+        assert mock_print.call_args.args[0].startswith("[ERROR]  Invalid pattern 're:('")
+
 
 class TestParseArgsOrphans:
     """Tests for orphans subcommand argument parsing."""
@@ -162,6 +329,76 @@ class TestParseArgsOrphans:
         assert args.include_hidden is True
         assert args.action == "delete"
 
+    @patch(
+        "sys.argv",
+        [
+            "transmission-cleaner",
+            "orphans",
+            "--password",
+            "pass",
+            "--auto-roots",
+            "--exclude",
+            "*.nfo",
+            "--exclude",
+            "!keep.nfo",
+            "--exclude-from",
+            "/etc/excludes",
+            "--min-age",
+            "12h",
+        ],
+    )
+    def test_orphans_exclusions(self):
+        """Should collect exclusion patterns and parse the minimum age."""
+        args = parse_args()
+
+        assert args.exclude == ["*.nfo", "!keep.nfo"]
+        assert args.exclude_from == ["/etc/excludes"]
+        assert args.min_age == 12 * 3600
+
+    @patch("sys.argv", ["transmission-cleaner", "orphans", "--password", "pass", "--auto-roots"])
+    def test_orphans_auto_roots(self):
+        """Should accept --auto-roots instead of a directory."""
+        args = parse_args()
+
+        assert args.auto_roots is True
+        assert args.directory is None
+
+    @patch("sys.argv", ["transmission-cleaner", "orphans", "--password", "pass", "--auto-roots", "--dir", "/data"])
+    def test_orphans_auto_roots_excludes_directory(self):
+        """Should reject --auto-roots combined with a directory."""
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    @patch(
+        "sys.argv",
+        ["transmission-cleaner", "orphans", "--password", "pass", "--auto-roots", "--index-file", "/tmp/tracked.idx"],
+    )
+    def test_orphans_index_file(self):
+        """Should parse the compact index options."""
+        args = parse_args()
+
+        assert args.compact_index is False
+        assert args.index_file == "/tmp/tracked.idx"
+
+    @patch(
+        "sys.argv",
+        [
+            "transmission-cleaner",
+            "orphans",
+            "--password",
+            "pass",
+            "--auto-roots",
+            "--spill-dir",
+            "/tmp",
+            "-a",
+            "review",
+        ],
+    )
+    def test_spill_dir_rejects_review(self):
+        """Should reject --spill-dir with the review action, whose plan holds every orphan."""
+        with pytest.raises(SystemExit):
+            parse_args()
+
     @patch("sys.argv", ["transmission-cleaner", "orphans", "--password", "pass"])
     def test_orphans_missing_required_directory(self):
         """Should require directory argument for orphans."""
@@ -169,6 +406,151 @@ class TestParseArgsOrphans:
             parse_args()
 
 
+class TestParseArgsHardlinksSample:
+    """Tests for the hardlinks sampling option."""
+
+    @patch("sys.argv", ["transmission-cleaner", "hardlinks", "--password", "pass", "--sample", "99%"])
+    def test_sample_confidence(self):
+        """Should parse the sampling confidence as a fraction."""
+        args = parse_args()
+
+        assert args.sample == 0.99
+
+    @patch("sys.argv", ["transmission-cleaner", "hardlinks", "--password", "pass"])
+    def test_sample_disabled_by_default(self):
+        """Should check every file by default."""
+        args = parse_args()
+
+        assert args.sample is None
+
+
+class TestHandleHardlinksSample:
+    """Tests for verifying sampled hardlink checks against a free-space target."""
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.actions.process_torrents", return_value=0)
+    @patch("transmission_cleaner.main.plan_free_space", side_effect=lambda torrents, args: torrents[:1])
+    def test_torrents_failing_verification_are_replanned(self, mock_plan, mock_process, mock_print):
+        """A planned torrent with a hardlink missed by sampling is replaced by the next candidate."""
+        first, second = Torrent(fields={"id": 1}), Torrent(fields={"id": 2})
+        argv = ["transmission-cleaner", "hardlinks", "--password", "pass", "--sample", "99%"]
+        argv += ["--action", "delete", "--free", "1G"]
+        with patch("sys.argv", argv):
+            args = parse_args()
+        client = Mock()
+        client.get_torrents.return_value = []
+
+        with (
+            patch(
+                "transmission_cleaner.checkers.hardlinks.get_torrents_likely_without_hardlinks",
+                return_value=[first, second],
+            ),
+            patch(
+                "transmission_cleaner.checkers.hardlinks.get_torrents_without_hardlinks",
+                side_effect=lambda torrents, *rest: [t for t in torrents if t.id != 1],
+            ),
+        ):
+            handle_hardlinks(client, args)
+
+        assert [t.id for t in mock_process.call_args.args[1]] == [2]
+
+
+class TestParseArgsCheck:
+    """Tests for check subcommand argument parsing."""
+
+    @patch(
+        "sys.argv",
+        ["transmission-cleaner", "check", "--password", "pass", "--checker", "errors", "--checker", "hardlinks"],
+    )
+    def test_check_collects_checkers(self):
+        """Should collect every --checker in order."""
+        args = parse_args()
+
+        assert args.command == "check"
+        assert args.checkers == ["errors", "hardlinks"]
+        assert args.action == "list"
+
+    @patch(
+        "sys.argv",
+        [
+            "transmission-cleaner",
+            "check",
+            "--password",
+            "pass",
+            "--checker",
+            "hardlinks",
+            "--sample",
+            "99%",
+            "--free-until",
+            "85%",
+            "--score",
+            "size",
+            "--max-runtime",
+            "20m",
+        ],
+    )
+    def test_check_accepts_sample_target_and_runtime(self):
+        """Should parse the sampling, free-space target and runtime options like hardlinks."""
+        args = parse_args()
+
+        assert args.sample == 0.99
+        assert args.free_until == 0.85
+        assert args.score == "size"
+        assert args.max_runtime == 1200
+
+    @patch("sys.argv", ["transmission-cleaner", "check", "--password", "pass"])
+    def test_check_requires_checker(self):
+        """Should require at least one checker."""
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    @patch(
+        "sys.argv",
+        [
+            "transmission-cleaner",
+            "check",
+            "--config-dir",
+            "/var/lib/transmission",
+            "--checker",
+            "errors",
+            "--action",
+            "delete",
+        ],
+    )
+    def test_check_config_dir_rejects_torrent_removal(self):
+        """Should reject actions that remove torrents in offline mode."""
+        with pytest.raises(SystemExit):
+            parse_args()
+
+
+class TestHandleCheck:
+    """Tests for the check pipeline."""
+
+    @pytest.mark.parametrize(
+        ("extra_args", "files_fetched"),
+        [
+            ([], False),
+            (["--local-delete"], True),
+            (["--journal", "JOURNAL"], True),
+        ],
+    )
+    @patch("builtins.print")
+    @patch("transmission_cleaner.checkers.registry.run_checkers", return_value=([], {"errors": []}))
+    def test_file_lists_fetched_when_data_is_deleted_locally(
+        self, mock_run_checkers, mock_print, extra_args, files_fetched, tmp_path
+    ):
+        """File lists are fetched without cross-seed checks when local deletion or the journal needs them."""
+        extra_args = [str(tmp_path / "journal.ndjson") if arg == "JOURNAL" else arg for arg in extra_args]
+        argv = ["transmission-cleaner", "check", "--password", "pass", "--checker", "errors"]
+        argv += ["--action", "delete", "--skip-cross-seed", *extra_args]
+        with patch("sys.argv", argv):
+            args = parse_args()
+
+        handle_check(Mock(), args)
+
+        assert ("files" in mock_run_checkers.call_args.kwargs["extra_fields"]) == files_fetched
+
+
 class TestParseArgsCommon:
     """Tests for common argument parsing behavior."""
 
@@ -184,6 +566,56 @@ class TestParseArgsCommon:
         with pytest.raises(SystemExit):
             parse_args()
 
+    @patch("sys.argv", ["transmission-cleaner", "hardlinks", "--instances", "instances.json"])
+    def test_instances_replace_password(self):
+        """Should not require a password when an instances file is given."""
+        args = parse_args()
+
+        assert args.instances == "instances.json"
+        assert args.password is None
+
+    @patch("sys.argv", ["transmission-cleaner", "orphans", "--password", "pass", "--auto-roots", "--resume"])
+    def test_resume_requires_journal(self):
+        """Should reject --resume without --journal."""
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    @patch(
+        "sys.argv",
+        ["transmission-cleaner", "orphans", "--password", "pass", "--auto-roots", "--journal", "j.ndjson", "--resume"],
+    )
+    def test_resume_with_journal(self):
+        """Should parse --resume together with --journal."""
+        args = parse_args()
+
+        assert args.journal == "j.ndjson"
+        assert args.resume is True
+
+    @patch("sys.argv", ["transmission-cleaner", "orphans", "--auto-roots", "--config-dir", "/var/lib/transmission"])
+    def test_config_dir_replaces_password(self):
+        """Should not require a password when reading the config directory."""
+        args = parse_args()
+
+        assert args.config_dir == "/var/lib/transmission"
+
+    @patch(
+        "sys.argv",
+        ["transmission-cleaner", "hardlinks", "--config-dir", "/var/lib/transmission", "--action", "delete"],
+    )
+    def test_config_dir_rejects_torrent_removal(self):
+        """Should reject hardlinks actions that remove torrents in offline mode."""
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    @patch(
+        "sys.argv",
+        ["transmission-cleaner", "orphans", "--auto-roots", "--config-dir", "/var/lib/transmission", "-a", "delete"],
+    )
+    def test_config_dir_rejects_orphan_deletion(self):
+        """Should reject deleting orphans found from the config directory."""
+        with pytest.raises(SystemExit):
+            parse_args()
+
     @patch("sys.argv", ["transmission-cleaner", "hardlinks", "--password", "pass", "--action", "invalid"])
     def test_invalid_action_rejected(self):
         """Should reject invalid action choices."""
@@ -205,3 +637,239 @@ class TestParseArgsCommon:
         """Should reject invalid subcommand."""
         with pytest.raises(SystemExit):
             parse_args()
+
+
+class TestRunCommandJournal:
+    """Tests for opening the journal before a run."""
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.client.create_client")
+    def test_missing_journal_on_resume_exits(self, mock_create_client, mock_print, tmp_path):
+        """A journal that cannot be read exits with an error instead of a traceback."""
+        journal = str(tmp_path / "missing.ndjson")
+        argv = ["transmission-cleaner", "orphans", "--password", "pass", "--auto-roots"]
+        argv += ["--journal", journal, "--resume"]
+        with patch("sys.argv", argv):
+            args = parse_args()
+
+        with pytest.raises(SystemExit) as exc_info:
+            run_command(args, None)
+
+        assert exc_info.value.code == 1
+        assert any("[ERROR]  Cannot open journal" in str(call) for call in mock_print.call_args_list)
+
+
+class TestParseArgsMaxRuntime:
+    """Tests for the runtime limit."""
+
+    @patch("sys.argv", ["transmission-cleaner", "hardlinks", "--password", "pass", "--max-runtime", "20m"])
+    def test_max_runtime_parsed(self):
+        """Should parse the runtime limit into seconds."""
+        assert parse_args().max_runtime == 1200
+
+    @patch("sys.argv", ["transmission-cleaner", "errors", "--password", "pass"])
+    def test_no_limit_by_default(self):
+        """Should run without a limit unless asked."""
+        assert parse_args().max_runtime is None
+
+
+class TestHandleErrorsMaxRuntime:
+    """Tests for time-budgeted error checks."""
+
+    @patch("builtins.print")
+    def test_lists_largest_checked_torrents(self, mock_print, tmp_path):
+        """Cross-seed lookups run largest first, and only looked-up torrents are reported."""
+        torrents = [
+            Torrent(
+                fields={
+                    "id": i,
+                    "hashString": f"{i:040x}",
+                    "name": f"torrent{i}",
+                    "downloadDir": str(tmp_path),
+                    "totalSize": size,
+                    "status": 6,
+                    "secondsSeeding": 0,
+                    "error": 2,
+                    "errorString": "Unregistered torrent",
+                    "files": [{"name": f"file{i}", "length": size, "bytesCompleted": size}],
+                    "priorities": [0],
+                    "wanted": [1],
+                }
+            )
+            for i, size in enumerate([10, 30, 20])
+        ]
+        client = Mock()
+        client.get_torrents.return_value = torrents
+        argv = ["transmission-cleaner", "errors", "--password", "pass", "--min-days", "0", "--max-runtime", "20m"]
+        with patch("sys.argv", argv):
+            args = parse_args()
+        output = io.StringIO()
+
+        with patch("transmission_cleaner.deadline.Deadline.reached", side_effect=[False, False, True]):
+            handle_errors(client, args, create_reporter("ndjson", output))
+
+        assert [json.loads(line)["size"] for line in output.getvalue().splitlines()] == [30, 20]
+
+
+class TestParseArgsShard:
+    """Tests for sharding and merge arguments."""
+
+    @patch("sys.argv", ["transmission-cleaner", "errors", "--password", "pass", "--shard", "1/4"])
+    def test_shard_parsed(self):
+        """Should parse the shard into index and count."""
+        assert parse_args().shard == (1, 4)
+
+    @patch("sys.argv", ["transmission-cleaner", "hardlinks", "--password", "pass", "--shard", "4/4"])
+    def test_shard_out_of_range_rejected(self):
+        """Should reject a shard index not below the count."""
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    @patch("sys.argv", ["transmission-cleaner", "merge", "a.ndjson", "b.ndjson"])
+    def test_merge_needs_no_authentication(self):
+        """Should parse merge without a password, defaulting to ndjson output."""
+        args = parse_args()
+
+        assert args.files == ["a.ndjson", "b.ndjson"]
+        assert args.output == "ndjson"
+
+
+class TestHandleShards:
+    """Tests for sharded runs and merging their results."""
+
+    @patch("builtins.print")
+    def test_sharded_runs_merge_into_full_report(self, mock_print, tmp_path):
+        """Shards check disjoint torrents, and merging their output reports every torrent once."""
+        torrents = []
+        for i in range(10):
+            (tmp_path / f"file{i}").touch()
+            torrents.append(
+                Torrent(
+                    fields={
+                        "id": i,
+                        "hashString": f"{i:040x}",
+                        "name": f"torrent{i}",
+                        "downloadDir": str(tmp_path),
+                        "totalSize": 1,
+                        "status": 6,
+                        "secondsSeeding": 0,
+                        "files": [{"name": f"file{i}", "length": 1, "bytesCompleted": 1}],
+                        "priorities": [0],
+                        "wanted": [1],
+                    }
+                )
+            )
+        client = Mock()
+        client.get_torrents.return_value = torrents
+        results = []
+        for index in range(3):
+            argv = [
+                "transmission-cleaner",
+                "hardlinks",
+                "--password",
+                "pass",
+                "--min-days",
+                "0",
+                "--shard",
+                f"{index}/3",
+            ]
+            with patch("sys.argv", argv):
+                args = parse_args()
+            results.append(tmp_path / f"shard{index}.ndjson")
+            with results[-1].open("w") as f:
+                handle_hardlinks(client, args, create_reporter("ndjson", f))
+
+        with patch("sys.argv", ["transmission-cleaner", "merge", *map(str, results)]):
+            args = parse_args()
+        output = io.StringIO()
+        handle_merge(args, create_reporter("ndjson", output))
+
+        shard_names = [[json.loads(line)["name"] for line in result.read_text().splitlines()] for result in results]
+        merged_names = [json.loads(line)["name"] for line in output.getvalue().splitlines()]
+        assert sum(len(names) for names in shard_names) == 10
+        assert merged_names == sorted(f"torrent{i}" for i in range(10))
+
+
+class TestHandleOrphans:
+    """Tests for the orphans pipeline."""
+
+    @patch("builtins.print")
+    @pytest.mark.parametrize(
+        "extra_args", [[], ["--compact-index"], ["--index-file", "INDEX"], ["--spill-dir", "SPILL"]]
+    )
+    def test_fetch_runs_alongside_scan(self, mock_print, extra_args, tmp_path):
+        """File lists are fetched off the main thread, and orphans are found in every mode."""
+        data = tmp_path / "data"
+        data.mkdir()
+        (data / "tracked.mkv").write_bytes(b"x" * 3)
+        (data / "orphan.mkv").write_bytes(b"x" * 5)
+        (tmp_path / "spill").mkdir()
+        torrent = Torrent(
+            fields={
+                "id": 1,
+                "downloadDir": str(data),
+                "files": [{"name": "tracked.mkv", "length": 3, "bytesCompleted": 3}],
+                "priorities": [0],
+                "wanted": [1],
+            }
+        )
+        fetch_threads = []
+
+        def get_torrents(**kwargs):
+            fetch_threads.append(threading.current_thread())
+            return [torrent]
+
+        client = Mock()
+        client.get_torrents.side_effect = get_torrents
+        client.get_session.return_value = Session(fields={})
+        paths = {"SPILL": str(tmp_path / "spill"), "INDEX": str(tmp_path / "tracked.idx")}
+        extra_args = [paths.get(arg, arg) for arg in extra_args]
+        argv = ["transmission-cleaner", "orphans", "--password", "pass", "--dir", str(data), *extra_args]
+        with patch("sys.argv", argv):
+            args = parse_args()
+        output = io.StringIO()
+
+        handle_orphans(client, args, create_reporter("ndjson", output))
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert [(r["path"], r["size"]) for r in records] == [(str(data / "orphan.mkv"), 5)]
+        assert fetch_threads and threading.main_thread() not in fetch_threads
+
+    @patch("builtins.print")
+    @pytest.mark.parametrize("extra_args", [[], ["--spill-dir", "SPILL"]])
+    def test_file_cache_used_from_fetch_thread(self, mock_print, extra_args, tmp_path):
+        """The file cache opened on the main thread serves the background fetch, on every run."""
+        data = tmp_path / "data"
+        data.mkdir()
+        (data / "tracked.mkv").write_bytes(b"x" * 3)
+        (data / "orphan.mkv").write_bytes(b"x" * 5)
+        (tmp_path / "spill").mkdir()
+        fields = {
+            "id": 1,
+            "hashString": "a" * 40,
+            "name": "tracked.mkv",
+            "editDate": 1000,
+            "downloadDir": str(data),
+            "percentDone": 1.0,
+            "files": [{"name": "tracked.mkv", "length": 3, "bytesCompleted": 3}],
+            "priorities": [0],
+            "wanted": [1],
+        }
+        client = Mock()
+        client.get_torrents.side_effect = lambda ids=None, arguments=None, timeout=None: [
+            Torrent(fields={k: v for k, v in fields.items() if arguments is None or k in arguments or k == "id"})
+        ]
+        client.get_session.return_value = Session(fields={})
+        extra_args = [str(tmp_path / "spill") if arg == "SPILL" else arg for arg in extra_args]
+        argv = ["transmission-cleaner", "orphans", "--password", "pass", "--dir", str(data), *extra_args]
+        with patch("sys.argv", argv):
+            args = parse_args()
+
+        for _ in range(2):
+            cache = FileListCache(str(tmp_path / "files.sqlite"))
+            output = io.StringIO()
+            handle_orphans(CachedFilesClient(client, cache), args, create_reporter("ndjson", output))
+            cache.close()
+
+            records = [json.loads(line) for line in output.getvalue().splitlines()]
+            assert [r["path"] for r in records] == [str(data / "orphan.mkv")]
@@ -0,0 +1,65 @@
+"""Tests for merging sharded results."""
+
+import json
+from unittest.mock import patch
+
+from transmission_cleaner.merge import merge_records, read_records
+
+
+def torrent_record(name, hash_string, cross_seeded=False):
+    """Helper to create a torrent record as written by NdjsonReporter."""
+    return {
+        "type": "torrent",
+        "id": 1,
+        "hash": hash_string,
+        "name": name,
+        "download_dir": "/data",
+        "size": 10,
+        "cross_seeded": cross_seeded,
+    }
+
+
+def file_record(path, size=1):
+    """Helper to create a file record as written by NdjsonReporter."""
+    return {"type": "file", "path": path, "size": size, "error": None}
+
+
+class TestReadRecords:
+    """Tests for reading result files."""
+
+    @patch("builtins.print")
+    def test_skips_invalid_lines(self, mock_print, tmp_path):
+        """Blank, malformed and foreign lines are skipped; complete records are kept."""
+        result = tmp_path / "shard0.ndjson"
+        lines = [json.dumps(file_record("/data/a")), "", '{"type": "other"}', '{"type": "file", "pa']
+        result.write_text("\n".join(lines))
+
+        records = list(read_records([str(result)]))
+
+        assert records == [file_record("/data/a")]
+        assert mock_print.call_count == 2
+
+
+class TestMergeRecords:
+    """Tests for combining records."""
+
+    def test_dedupes_and_sorts(self):
+        """Records reported by several shards are kept once, torrents before files."""
+        records = [
+            file_record("/data/b"),
+            torrent_record("Zed", "bb"),
+            file_record("/data/a"),
+            torrent_record("Alpha", "aa"),
+            file_record("/data/b"),
+            torrent_record("Zed", "bb"),
+        ]
+
+        merged = merge_records(records)
+
+        assert [r.get("name", r.get("path")) for r in merged] == ["Alpha", "Zed", "/data/a", "/data/b"]
+
+    def test_cross_seeded_in_any_shard(self):
+        """A torrent flagged as cross-seeded by one run stays cross-seeded."""
+        merged = merge_records([torrent_record("A", "aa"), torrent_record("A", "aa", cross_seeded=True)])
+
+        assert [r["cross_seeded"] for r in merged] == [True]
@@ -0,0 +1,177 @@
+"""Tests for the offline backend reading Transmission's config directory."""
+
+import hashlib
+import json
+from unittest.mock import patch
+
+import pytest
+
+from transmission_cleaner import offline
+from transmission_cleaner.offline import OfflineClient, bdecode, get_info_hash, load_config_dir, parse_torrent
+
+
+def bencode(value):
+    """Helper to encode fixture data."""
+    if isinstance(value, int):
+        return b"i%de" % value
+    if isinstance(value, str):
+        value = value.encode()
+    if isinstance(value, bytes):
+        return b"%d:%s" % (len(value), value)
+    if isinstance(value, list):
+        return b"l" + b"".join(bencode(item) for item in value) + b"e"
+    items = sorted((k.encode() if isinstance(k, str) else k, v) for k, v in value.items())
+    return b"d" + b"".join(bencode(k) + bencode(v) for k, v in items) + b"e"
+
+
+def make_torrent(name, files=None, length=None, announce="http://tracker.example/announce"):
+    """Helper to create a .torrent file's bytes and its info dict."""
+    info = {"name": name, "piece length": 16384, "pieces": b"\0" * 20}
+    if files is not None:
+        info["files"] = [{"path": path.split("/"), "length": size} for path, size in files]
+    else:
+        info["length"] = length
+    return bencode({"announce": announce, "info": info}), info
+
+
+class TestBdecode:
+    """Tests for the bencode decoder."""
+
+    def test_decodes_nested_values(self):
+        """Integers, strings, lists and dicts decode to Python values."""
+        data = bencode({"a": [1, -2, "x"], "b": {"c": b"\xff\x00"}})
+
+        assert bdecode(data) == {b"a": [1, -2, b"x"], b"b": {b"c": b"\xff\x00"}}
+
+    @pytest.mark.parametrize("data", [b"", b"i12", b"5:abc", b"l1:a", b"d1:ai1e", b"i1ei2e"])
+    def test_rejects_invalid_data(self, data):
+        """Truncated or trailing data raises ValueError."""
+        with pytest.raises(ValueError):
+            bdecode(data)
+
+    def test_info_hash_uses_raw_info_bytes(self):
+        """The infohash is the SHA-1 of the info dict as it appears in the file."""
+        data, info = make_torrent("file.bin", length=5)
+
+        assert get_info_hash(data) == hashlib.sha1(bencode(info)).hexdigest()
+
+
+class TestParseTorrent:
+    """Tests for building torrent fields from torrent and resume files."""
+
+    def test_multi_file_torrent_with_resume(self):
+        """Files, progress and wanted flags come from the torrent and resume files."""
+        torrent_data, _ = make_torrent("pack", files=[("a.bin", 16384), ("sub/b.bin", 16384), ("c.bin", 100)])
+        resume = {
+            "destination": "/data",
+            "added-date": 1700000000,
+            "seeding-time-seconds": 86400,
+            "uploaded": 200,
+            "downloaded": 100,
+            "dnd": [0, 0, 1],
+            "priority": [0, 1, 0],
+            # Blocks 0 and 1 done, block 2 (c.bin) missing
+            "progress": {"blocks": bytes([0b11000000])},
+        }
+
+        fields = parse_torrent(torrent_data, bencode(resume))
+
+        assert fields["name"] == "pack"
+        assert fields["downloadDir"] == "/data"
+        assert fields["totalSize"] == 32868
+        assert fields["uploadRatio"] == 2.0
+        assert fields["status"] == offline.STATUS_SEEDING
+        assert [f["name"] for f in fields["files"]] == ["pack/a.bin", "pack/sub/b.bin", "pack/c.bin"]
+        assert [f["bytesCompleted"] for f in fields["files"]] == [16384, 16384, 0]
+        assert fields["wanted"] == [1, 1, 0]
+        assert fields["trackers"][0]["announce"] == "http://tracker.example/announce"
+
+    def test_single_file_without_resume(self):
+        """A torrent without a resume file still parses, with nothing downloaded."""
+        torrent_data, _ = make_torrent("movie.mkv", length=1000)
+
+        fields = parse_torrent(torrent_data, None)
+
+        assert [(f["name"], f["length"], f["bytesCompleted"]) for f in fields["files"]] == [("movie.mkv", 1000, 0)]
+        assert fields["status"] == offline.STATUS_DOWNLOADING
+
+    def test_renamed_files_and_paused(self):
+        """Renamed files from the resume file replace the metainfo names."""
+        torrent_data, _ = make_torrent("pack", files=[("a.bin", 1)])
+        resume = {"destination": "/data", "files": ["renamed/a.bin"], "paused": 1, "progress": {"blocks": "all"}}
+
+        fields = parse_torrent(torrent_data, bencode(resume))
+
+        assert fields["files"][0]["name"] == "renamed/a.bin"
+        assert fields["status"] == offline.STATUS_STOPPED
+
+
+class TestLoadConfigDir:
+    """Tests for loading a whole config directory."""
+
+    def create_config_dir(self, tmp_path, count):
+        """Helper to write count torrents with resume files, added in reverse order."""
+        (tmp_path / "torrents").mkdir()
+        (tmp_path / "resume").mkdir()
+        for i in range(count):
+            torrent_data, _ = make_torrent(f"t{i}", length=i + 1)
+            stem = get_info_hash(torrent_data)
+            (tmp_path / "torrents" / f"{stem}.torrent").write_bytes(torrent_data)
+            resume = {"destination": "/data", "added-date": 1000 - i, "progress": {"blocks": "all"}}
+            (tmp_path / "resume" / f"{stem}.resume").write_bytes(bencode(resume))
+        return tmp_path
+
+    @patch("builtins.print")
+    def test_loads_torrents_numbered_by_date_added(self, mock_print, tmp_path):
+        """Every torrent is loaded, with IDs in order of date added; broken files are skipped."""
+        config_dir = self.create_config_dir(tmp_path, 3)
+        (config_dir / "torrents" / "broken.torrent").write_bytes(b"d4:info")
+
+        torrents = load_config_dir(str(config_dir))
+
+        assert [(t.id, t.name) for t in torrents] == [(1, "t2"), (2, "t1"), (3, "t0")]
+        assert all(t.status == "seeding" for t in torrents)
+        mock_print.assert_called_once()
+
+    @patch("builtins.print")
+    def test_warns_about_torrents_without_resume(self, mock_print, tmp_path):
+        """Torrents without a resume file have no download directory, which is reported."""
+        config_dir = self.create_config_dir(tmp_path, 2)
+        next((config_dir / "resume").iterdir()).unlink()
+
+        torrents = load_config_dir(str(config_dir))
+
+        assert sorted(t.download_dir for t in torrents) == ["", "/data"]
+        mock_print.assert_called_once_with(
+            "[WARN]   1 torrents have no download directory (missing or unreadable resume file)"
+        )
+
+    def test_process_pool_gives_same_result(self, tmp_path, monkeypatch):
+        """Parsing in worker processes gives the same torrents."""
+        config_dir = self.create_config_dir(tmp_path, 5)
+        in_process = load_config_dir(str(config_dir))
+        monkeypatch.setattr(offline, "POOL_THRESHOLD", 1)
+
+        pooled = load_config_dir(str(config_dir), workers=2)
+
+        assert [t.fields for t in pooled] == [t.fields for t in in_process]
+
+    def test_offline_client(self, tmp_path):
+        """The offline client serves loaded torrents and refuses removal."""
+        client = OfflineClient(str(self.create_config_dir(tmp_path, 2)))
+
+        assert [t.id for t in client.get_torrents()] == [1, 2]
+        assert [t.name for t in client.get_torrents(ids=[2])] == ["t0"]
+        assert [t.name for t in client.get_torrents(ids=client.get_torrents()[1].hash_string)] == ["t0"]
+        assert client.get_torrents()[0].get_files()[0].completed == 2
+        with pytest.raises(RuntimeError):
+            client.remove_torrent([1])
+
+    @patch("builtins.print")
+    def test_offline_session_from_settings(self, mock_print, tmp_path):
+        """The session comes from settings.json, and is empty without it."""
+        client = OfflineClient(str(tmp_path))
+
+        assert client.get_session().fields == {}
+        (tmp_path / "settings.json").write_text(json.dumps({"incomplete-dir": "/data/incomplete"}))
+        assert client.get_session().fields["incomplete-dir"] == "/data/incomplete"
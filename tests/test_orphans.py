@@ -1,9 +1,23 @@
 """Tests for orphaned file detection functionality."""
 
+import os
 import pathlib
-from unittest.mock import Mock
+import time
+from unittest.mock import Mock, patch
 
-from transmission_cleaner.checkers.orphans import find_orphaned_files, get_tracked_files, scan_directory
+from transmission_rpc import Torrent
+
+from transmission_cleaner.checkers.orphans import (
+    find_orphaned_files,
+    find_orphaned_files_external,
+    get_download_roots,
+    get_tracked_files,
+    get_tracked_files_from_torrents,
+    iter_directory,
+    scan_directory,
+    scan_roots,
+)
+from transmission_cleaner.exclusions import create_exclusions
 
 
 class TestScanDirectory:
@@ -98,6 +112,71 @@ class TestScanDirectory:
         assert not any(f.is_symlink() for f in result)
 
 
+class TestIterDirectory:
+    """Tests for scanning with sizes."""
+
+    def test_yields_sizes_from_scan(self, tmp_path):
+        """Should yield each file with its size."""
+        (tmp_path / "a.bin").write_bytes(b"x" * 10)
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "b.bin").write_bytes(b"x" * 20)
+
+        result = dict(iter_directory(tmp_path))
+
+        assert result == {tmp_path / "a.bin": 10, tmp_path / "sub" / "b.bin": 20}
+
+    def test_prunes_excluded_directories(self, tmp_path):
+        """Excluded directories are not listed at all."""
+        (tmp_path / "music" / "@eaDir").mkdir(parents=True)
+        (tmp_path / "music" / "@eaDir" / "thumb.jpg").touch()
+        (tmp_path / "music" / "song.flac").touch()
+        (tmp_path / "music" / "song.nfo").touch()
+
+        with patch("transmission_cleaner.fsstat.os.scandir", wraps=os.scandir) as mock_scandir:
+            result = dict(iter_directory(tmp_path, exclusions=create_exclusions(patterns=["*.nfo"])))
+
+        assert list(result) == [tmp_path / "music" / "song.flac"]
+        assert mock_scandir.call_count == 2
+
+    def test_skips_recent_files(self, tmp_path):
+        """Files modified within min_age are skipped."""
+        (tmp_path / "old.bin").touch()
+        (tmp_path / "new.bin").touch()
+        os.utime(tmp_path / "old.bin", (time.time() - 3600, time.time() - 3600))
+
+        result = dict(iter_directory(tmp_path, min_age=600))
+
+        assert list(result) == [tmp_path / "old.bin"]
+
+    def test_prunes_skip_dirs(self, tmp_path):
+        """Directories given to skip are pruned, whatever path leads to them."""
+        (tmp_path / "incomplete").mkdir()
+        (tmp_path / "incomplete" / "partial.bin").touch()
+        (tmp_path / "done.bin").touch()
+        (tmp_path / "alias").symlink_to(tmp_path / "incomplete")
+
+        result = dict(iter_directory(tmp_path, skip_dirs=[tmp_path / "alias"]))
+
+        assert list(result) == [tmp_path / "done.bin"]
+
+    def test_shards_split_top_level_entries(self, tmp_path):
+        """Each top-level entry is scanned, whole, by exactly one shard."""
+        for i in range(20):
+            (tmp_path / f"release{i}").mkdir()
+            (tmp_path / f"release{i}" / "a.mkv").touch()
+            (tmp_path / f"release{i}" / "b.mkv").touch()
+            (tmp_path / f"loose{i}.mkv").touch()
+
+        shards = [set(iter_directory(tmp_path, shard=(index, 3))) for index in range(3)]
+
+        assert set().union(*shards) == set(iter_directory(tmp_path))
+        assert sum(len(shard) for shard in shards) == 60
+        for shard in shards:
+            for file_path, _ in shard:
+                top = file_path.relative_to(tmp_path).parts[0]
+                assert (tmp_path / top / "a.mkv", 0) in shard or not (tmp_path / top).is_dir()
+
+
 class TestGetTrackedFiles:
     """Tests for getting tracked files from torrents."""
 
@@ -111,6 +190,8 @@ class TestGetTrackedFiles:
         for file_name in file_names:
             mock_file = Mock()
             mock_file.name = file_name
+            mock_file.size = mock_file.completed = 1
+            mock_file.selected = True
             mock_files.append(mock_file)
         torrent.get_files.return_value = mock_files
 
@@ -136,6 +217,33 @@ class TestGetTrackedFiles:
         assert pathlib.Path("/data/show.mkv").resolve() in result
         assert pathlib.Path("/data/subs2.srt").resolve() in result
 
+    def test_unwanted_and_incomplete_files(self):
+        """Deselected files without data are untracked; incomplete files are tracked with their .part name."""
+        torrent = Torrent(
+            fields={
+                "id": 1,
+                "downloadDir": "/data",
+                "files": [
+                    {"name": "pack/done.mkv", "length": 10, "bytesCompleted": 10},
+                    {"name": "pack/skipped.mkv", "length": 10, "bytesCompleted": 0},
+                    {"name": "pack/partial.mkv", "length": 10, "bytesCompleted": 4},
+                    {"name": "pack/deselected-later.mkv", "length": 10, "bytesCompleted": 10},
+                ],
+                "priorities": [0, 0, 0, 0],
+                "wanted": [1, 0, 1, 0],
+            }
+        )
+
+        result = get_tracked_files_from_torrents([torrent])
+
+        data = pathlib.Path("/data/pack").resolve()
+        assert result == {
+            data / "done.mkv",
+            data / "partial.mkv",
+            data / "partial.mkv.part",
+            data / "deselected-later.mkv",
+        }
+
     def test_handles_no_torrents(self):
         """Should handle case with no torrents."""
         client = Mock()
@@ -162,6 +270,56 @@ class TestGetTrackedFiles:
         assert pathlib.Path("/data/tv/show.mkv").resolve() in result
 
 
+class TestAutoRoots:
+    """Tests for deriving scan roots from torrents."""
+
+    def create_mock_torrent(self, download_dir):
+        """Helper to create a mock torrent in a download directory."""
+        torrent = Mock()
+        torrent.download_dir = str(download_dir)
+        return torrent
+
+    def test_collapses_nested_and_duplicate_roots(self, tmp_path):
+        """Nested directories should be covered by their parent, duplicates kept once."""
+        (tmp_path / "data" / "tv").mkdir(parents=True)
+        (tmp_path / "movies").mkdir()
+        torrents = [
+            self.create_mock_torrent(tmp_path / "data" / "tv"),
+            self.create_mock_torrent(tmp_path / "data"),
+            self.create_mock_torrent(tmp_path / "movies"),
+            self.create_mock_torrent(tmp_path / "movies"),
+        ]
+
+        result = get_download_roots(torrents)
+
+        assert result == [(tmp_path / "data").resolve(), (tmp_path / "movies").resolve()]
+
+    def test_symlinked_root_scanned_once(self, tmp_path):
+        """A root reached through a symlink should not be scanned twice."""
+        (tmp_path / "real").mkdir()
+        (tmp_path / "link").symlink_to(tmp_path / "real")
+        torrents = [self.create_mock_torrent(tmp_path / "real"), self.create_mock_torrent(tmp_path / "link")]
+
+        assert get_download_roots(torrents) == [(tmp_path / "real").resolve()]
+
+    def test_skips_missing_directories(self, tmp_path):
+        """Download directories that do not exist should be skipped."""
+        torrents = [self.create_mock_torrent(tmp_path / "missing")]
+
+        assert get_download_roots(torrents) == []
+
+    def test_scan_roots_merges_results(self, tmp_path):
+        """Scanning several roots should return the files of all of them."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        (tmp_path / "a" / "1.bin").write_bytes(b"x")
+        (tmp_path / "b" / "2.bin").write_bytes(b"xx")
+
+        result = scan_roots([tmp_path / "a", tmp_path / "b"])
+
+        assert result == {tmp_path / "a" / "1.bin": 1, tmp_path / "b" / "2.bin": 2}
+
+
 class TestFindOrphanedFiles:
     """Tests for finding orphaned files."""
 
@@ -212,3 +370,39 @@ class TestFindOrphanedFiles:
 
         # Should not be orphaned since resolved paths match
         assert result == []
+
+
+class TestFindOrphanedFilesExternal:
+    """Tests for the on-disk sort-merge join."""
+
+    def test_matches_in_memory_result(self, tmp_path):
+        """The join finds the same orphans as the in-memory set, with their sizes."""
+        data = tmp_path / "data"
+        files = []
+        for i in range(300):
+            file_path = data / f"dir{i % 5}" / f"file{i}.bin"
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_bytes(b"x" * i)
+            files.append(file_path)
+        tracked = [f.resolve() for f in files if int(f.stem[4:]) % 3]
+        spill_dir = tmp_path / "spill"
+        spill_dir.mkdir()
+
+        # A tiny limit forces many run files and a multi-pass merge
+        result = dict(
+            find_orphaned_files_external(
+                iter_directory(data), iter(tracked), memory_limit=2000, spill_dir=str(spill_dir)
+            )
+        )
+
+        assert sorted(result) == sorted(find_orphaned_files(files, set(tracked)))
+        assert all(size == int(path.stem[4:]) for path, size in result.items())
+        assert list(spill_dir.iterdir()) == []
+
+    def test_no_tracked_files(self, tmp_path):
+        """Every scanned file is an orphan when nothing is tracked."""
+        (tmp_path / "a.bin").write_bytes(b"x")
+
+        result = list(find_orphaned_files_external(iter_directory(tmp_path), [], memory_limit=1024))
+
+        assert result == [(tmp_path / "a.bin", 1)]
@@ -0,0 +1,104 @@
+"""Tests for the compact tracked-path index."""
+
+import pathlib
+from unittest.mock import patch
+
+import pytest
+
+from transmission_cleaner.checkers.orphans import find_orphaned_files
+from transmission_cleaner.pathindex import PathIndex
+
+
+class TestPathIndex:
+    """Tests for building, saving and querying the index."""
+
+    def test_membership_matches_set(self, tmp_path):
+        """Indexed paths are found, as paths or strings, and others are not."""
+        paths = [tmp_path / f"dir{i % 7}" / f"file{i}.mkv" for i in range(500)]
+        index = PathIndex.from_paths(paths + paths[:10])
+
+        assert len(index) == 500
+        assert all(path in index for path in paths)
+        assert str(paths[3]) in index
+        assert tmp_path / "missing.mkv" not in index
+        assert 42 not in index
+
+    def test_saved_index_is_memory_mapped(self, tmp_path):
+        """A saved index loads back with the same contents."""
+        paths = [pathlib.Path(f"/data/file{i}") for i in range(100)]
+        index_file = str(tmp_path / "tracked.idx")
+        PathIndex.from_paths(paths).save(index_file)
+
+        index = PathIndex.load(index_file)
+        try:
+            assert len(index) == 100
+            assert all(path in index for path in paths)
+            assert pathlib.Path("/data/file100") not in index
+        finally:
+            index.close()
+
+    def test_built_index_is_only_rewritten_when_paths_change(self, tmp_path):
+        """Building the same paths again keeps the file; other paths replace it."""
+        paths = [f"/data/file{i}" for i in range(100)]
+        index_file = tmp_path / "tracked.idx"
+
+        with PathIndex.build(reversed(paths), str(index_file)) as index:
+            assert len(index) == 100
+            assert all(path in index for path in paths)
+        written = index_file.stat()
+        with PathIndex.build(paths + paths[:5], str(index_file)):
+            assert (index_file.stat().st_ino, index_file.stat().st_mtime_ns) == (written.st_ino, written.st_mtime_ns)
+        with PathIndex.build(paths[:50], str(index_file)) as index:
+            assert len(index) == 50
+            assert paths[60] not in index
+
+        assert [p.name for p in tmp_path.iterdir()] == ["tracked.idx"]
+
+    def test_context_manager_releases_mapped_file(self, tmp_path):
+        """Leaving the with block releases the memory-mapped file."""
+        index_file = str(tmp_path / "tracked.idx")
+        PathIndex.from_paths(["/data/file"]).save(index_file)
+
+        with PathIndex.load(index_file) as index:
+            assert "/data/file" in index
+
+        assert index._mapped is None
+
+    def test_empty_index(self, tmp_path):
+        """An empty index can be saved, loaded and queried."""
+        index_file = str(tmp_path / "empty.idx")
+        PathIndex.from_paths([]).save(index_file)
+
+        index = PathIndex.load(index_file)
+        assert len(index) == 0
+        assert pathlib.Path("/data/file") not in index
+        index.close()
+
+    def test_hash_collisions_are_confirmed_by_path(self):
+        """Paths with the same hash are told apart by comparing the stored path."""
+        with patch("transmission_cleaner.pathindex._hash", return_value=1):
+            index = PathIndex.from_paths(["/a", "/b", "/a"])
+
+            assert len(index) == 2
+            assert "/a" in index
+            assert "/b" in index
+            assert "/c" not in index
+
+    def test_load_rejects_other_files(self, tmp_path):
+        """A file that is not an index is rejected."""
+        other = tmp_path / "other"
+        other.write_bytes(b"x" * 32)
+
+        with pytest.raises(ValueError):
+            PathIndex.load(str(other))
+
+    def test_find_orphaned_files_accepts_index(self, tmp_path):
+        """The index can replace the tracked-files set."""
+        tracked = tmp_path / "tracked.mkv"
+        orphan = tmp_path / "orphan.mkv"
+        tracked.touch()
+        orphan.touch()
+
+        index = PathIndex.from_paths([tracked.resolve()])
+
+        assert find_orphaned_files([tracked, orphan], index) == [orphan]
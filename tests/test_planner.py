@@ -0,0 +1,165 @@
+"""Tests for free-space target planning."""
+
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+from transmission_cleaner.planner import (
+    FilesystemUsage,
+    get_bytes_to_free,
+    get_reclaimable_bytes,
+    plan_deletions,
+)
+
+
+def create_mock_torrent(torrent_id, download_dir, files, added=0, ratio=0.0):
+    """Helper to create a mock torrent with files in download_dir."""
+    torrent = Mock()
+    torrent.id = torrent_id
+    torrent.name = f"t{torrent_id}"
+    torrent.download_dir = str(download_dir)
+    torrent.added_date = datetime.fromtimestamp(added, timezone.utc)
+    torrent.ratio = ratio
+    torrent.total_size = 0
+    torrent.seconds_seeding = 0
+    mock_files = []
+    for file_name in files:
+        mock_file = Mock()
+        mock_file.name = file_name
+        mock_files.append(mock_file)
+    torrent.get_files.return_value = mock_files
+    return torrent
+
+
+class TestGetBytesToFree:
+    """Tests for target calculation."""
+
+    def test_usage_target(self):
+        """Should free the bytes above the usage threshold."""
+        usage = FilesystemUsage(total=1000, used=900, free=100)
+
+        assert get_bytes_to_free(usage, max_usage=0.85) == 50
+
+    def test_free_target(self):
+        """Should free the bytes missing from the free-space threshold."""
+        usage = FilesystemUsage(total=1000, used=900, free=100)
+
+        assert get_bytes_to_free(usage, min_free=300) == 200
+
+    def test_target_already_met(self):
+        """Should return 0 when there is enough space."""
+        usage = FilesystemUsage(total=1000, used=500, free=500)
+
+        assert get_bytes_to_free(usage, max_usage=0.85, min_free=300) == 0
+
+
+class TestGetReclaimableBytes:
+    """Tests for reclaimable byte accounting."""
+
+    def test_hardlinked_files_do_not_count(self, tmp_path):
+        """Only files with a single link should count as reclaimable."""
+        (tmp_path / "single.bin").write_bytes(b"x" * 10)
+        (tmp_path / "linked.bin").write_bytes(b"x" * 20)
+        (tmp_path / "library.bin").hardlink_to(tmp_path / "linked.bin")
+        torrent = create_mock_torrent(1, tmp_path, ["single.bin", "linked.bin", "missing.bin"])
+
+        assert get_reclaimable_bytes(torrent) == 10
+
+    def test_symlinks_not_followed(self, tmp_path):
+        """A symlink frees nothing of its target when deleted."""
+        (tmp_path / "target.bin").write_bytes(b"x" * 10)
+        (tmp_path / "link.bin").symlink_to(tmp_path / "target.bin")
+        torrent = create_mock_torrent(1, tmp_path, ["link.bin"])
+
+        assert get_reclaimable_bytes(torrent) == (tmp_path / "link.bin").lstat().st_size
+
+    def test_shared_files_counted_once(self, tmp_path):
+        """A file already counted for another candidate is not counted again."""
+        (tmp_path / "shared.bin").write_bytes(b"x" * 10)
+        (tmp_path / "own.bin").write_bytes(b"x" * 5)
+        counted = set()
+
+        assert get_reclaimable_bytes(create_mock_torrent(1, tmp_path, ["shared.bin"]), counted) == 10
+        assert get_reclaimable_bytes(create_mock_torrent(2, tmp_path, ["shared.bin", "own.bin"]), counted) == 5
+
+
+class TestPlanDeletions:
+    """Tests for deletion planning."""
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.planner.get_filesystem_usage")
+    def test_deletes_only_as_much_as_needed(self, mock_usage, mock_print, tmp_path):
+        """Should stop once the target is reached, oldest first."""
+        for name in ["a", "b", "c"]:
+            (tmp_path / name).write_bytes(b"x" * 100)
+        torrents = [
+            create_mock_torrent(1, tmp_path, ["a"], added=300),
+            create_mock_torrent(2, tmp_path, ["b"], added=100),
+            create_mock_torrent(3, tmp_path, ["c"], added=200),
+        ]
+        mock_usage.return_value = FilesystemUsage(total=1000, used=1000, free=0)
+
+        result = plan_deletions(torrents, min_free=150, score="age")
+
+        assert [t.id for t in result] == [2, 3]
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.planner.get_filesystem_usage")
+    def test_protected_kept_and_unreclaimable_skipped(self, mock_usage, mock_print, tmp_path):
+        """Protected torrents are planned for removal without reclaiming bytes; torrents that free nothing are not."""
+        (tmp_path / "a").write_bytes(b"x" * 100)
+        (tmp_path / "b").write_bytes(b"x" * 100)
+        (tmp_path / "lib").hardlink_to(tmp_path / "b")
+        (tmp_path / "c").write_bytes(b"x" * 100)
+        torrents = [
+            create_mock_torrent(1, tmp_path, ["a"], ratio=3.0),
+            create_mock_torrent(2, tmp_path, ["b"], ratio=2.0),
+            create_mock_torrent(3, tmp_path, ["c"], ratio=1.0),
+        ]
+        mock_usage.return_value = FilesystemUsage(total=1000, used=1000, free=0)
+
+        result = plan_deletions(torrents, min_free=50, score="ratio", protected_ids={1})
+
+        assert [t.id for t in result] == [1, 3]
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.planner.get_filesystem_usage")
+    def test_protected_planned_after_target_reached(self, mock_usage, mock_print, tmp_path):
+        """Protected torrents ranked after the target is reached are still removed."""
+        (tmp_path / "a").write_bytes(b"x" * 100)
+        (tmp_path / "b").write_bytes(b"x" * 100)
+        torrents = [
+            create_mock_torrent(1, tmp_path, ["a"], ratio=3.0),
+            create_mock_torrent(2, tmp_path, ["b"], ratio=1.0),
+        ]
+        mock_usage.return_value = FilesystemUsage(total=1000, used=1000, free=0)
+
+        result = plan_deletions(torrents, min_free=50, score="ratio", protected_ids={2})
+
+        assert [t.id for t in result] == [1, 2]
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.planner.get_filesystem_usage")
+    def test_shared_files_do_not_reach_target_twice(self, mock_usage, mock_print, tmp_path):
+        """Two candidates sharing a file reclaim it once, so planning carries on."""
+        (tmp_path / "shared").write_bytes(b"x" * 100)
+        (tmp_path / "c").write_bytes(b"x" * 100)
+        torrents = [
+            create_mock_torrent(1, tmp_path, ["shared"], ratio=3.0),
+            create_mock_torrent(2, tmp_path, ["shared"], ratio=2.0),
+            create_mock_torrent(3, tmp_path, ["c"], ratio=1.0),
+        ]
+        mock_usage.return_value = FilesystemUsage(total=1000, used=1000, free=0)
+
+        result = plan_deletions(torrents, min_free=150, score="ratio")
+
+        assert [t.id for t in result] == [1, 3]
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.planner.get_filesystem_usage")
+    def test_nothing_planned_when_target_met(self, mock_usage, mock_print, tmp_path):
+        """Should plan nothing when the filesystem is below the target."""
+        (tmp_path / "a").write_bytes(b"x")
+        torrents = [create_mock_torrent(1, tmp_path, ["a"])]
+        mock_usage.return_value = FilesystemUsage(total=1000, used=100, free=900)
+
+        assert plan_deletions(torrents, max_usage=0.85) == []
@@ -0,0 +1,181 @@
+"""Tests for the checker registry and shared pipeline."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+from transmission_rpc import Torrent
+
+from transmission_cleaner.checkers.registry import (
+    BASE_FIELDS,
+    CHECKERS,
+    Checker,
+    ErrorsChecker,
+    HardlinksChecker,
+    get_required_fields,
+    register_checker,
+    run_checkers,
+    verify_checkers,
+)
+
+
+def make_torrent(torrent_id, name, download_dir, files=(), error=0, error_string=""):
+    """Helper to create a torrent with the fields fetched by the pipeline."""
+    return Torrent(
+        fields={
+            "id": torrent_id,
+            "hashString": f"{torrent_id:040x}",
+            "name": name,
+            "downloadDir": download_dir,
+            "totalSize": len(files),
+            "error": error,
+            "errorString": error_string,
+            "files": [{"name": file_name, "length": 1, "bytesCompleted": 1} for file_name in files],
+            "priorities": [0] * len(files),
+            "wanted": [1] * len(files),
+        }
+    )
+
+
+class TestRegistry:
+    """Tests for checker registration."""
+
+    def test_builtin_checkers_registered(self):
+        """The hardlinks and errors checkers are available by name."""
+        assert CHECKERS["hardlinks"] is HardlinksChecker
+        assert CHECKERS["errors"] is ErrorsChecker
+
+    def test_register_rejects_unknown_phase(self):
+        """Checkers must declare a known phase."""
+
+        class BadChecker(Checker):
+            name = "bad"
+            phase = "network"
+
+        with pytest.raises(ValueError):
+            register_checker(BadChecker)
+        assert "bad" not in CHECKERS
+
+    def test_check_is_abstract(self):
+        """A checker without check() cannot be instantiated."""
+
+        class IncompleteChecker(Checker):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            IncompleteChecker()
+
+    def test_required_fields_are_merged(self):
+        """Fields of all checkers are fetched once, with file fields for file and stat phases."""
+        fields = get_required_fields([ErrorsChecker(), HardlinksChecker()])
+
+        assert fields[: len(BASE_FIELDS)] == BASE_FIELDS
+        assert {"error", "errorString", "files", "priorities", "wanted"} <= set(fields)
+        assert len(fields) == len(set(fields))
+
+    def test_metadata_checkers_do_not_fetch_files(self):
+        """A metadata-only run does not request file lists."""
+        assert "files" not in get_required_fields([ErrorsChecker()])
+
+
+class TestRunCheckers:
+    """Tests for the shared pipeline."""
+
+    @patch("builtins.print")
+    def test_runs_checkers_on_one_fetch(self, mock_print, tmp_path):
+        """Every checker sees the same fetch and the stat results of all files."""
+        (tmp_path / "single.txt").write_text("a")
+        (tmp_path / "linked.txt").write_text("b")
+        (tmp_path / "link.txt").hardlink_to(tmp_path / "linked.txt")
+        torrents = [
+            make_torrent(1, "single", str(tmp_path), ["single.txt"]),
+            make_torrent(2, "linked", str(tmp_path), ["linked.txt"], error=2, error_string="Unregistered"),
+        ]
+        client = Mock()
+        client.get_torrents.return_value = torrents
+
+        all_torrents, results = run_checkers(client, [HardlinksChecker(), ErrorsChecker()])
+
+        client.get_torrents.assert_called_once()
+        assert all_torrents == torrents
+        assert [t.id for t in results["hardlinks"]] == [1]
+        assert [t.id for t in results["errors"]] == [2]
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.checkers.registry.stat_paths")
+    def test_skips_stat_without_stat_phase(self, mock_stat_paths, mock_print):
+        """No file is stat-ed when no checker needs it."""
+        client = Mock()
+        client.get_torrents.return_value = [make_torrent(1, "a", "/data", error=1, error_string="x")]
+
+        _, results = run_checkers(client, [ErrorsChecker()])
+
+        mock_stat_paths.assert_not_called()
+        assert len(results["errors"]) == 1
+
+    @patch("builtins.print")
+    def test_filter_applies_to_checked_torrents(self, mock_print):
+        """Checkers only see filtered torrents, while all torrents stay in the context."""
+        seen = {}
+
+        class RecordingChecker(Checker):
+            name = "recording"
+
+            def check(self, torrents, context):
+                seen["torrents"] = list(torrents)
+                seen["all"] = list(context.all_torrents)
+                return []
+
+        torrents = [make_torrent(1, "a", "/data"), make_torrent(2, "b", "/other")]
+        client = Mock()
+        client.get_torrents.return_value = torrents
+
+        run_checkers(client, [RecordingChecker()], lambda ts: [t for t in ts if t.download_dir == "/data"])
+
+        assert [t.id for t in seen["torrents"]] == [1]
+        assert seen["all"] == torrents
+
+    @patch("builtins.print")
+    @patch(
+        "transmission_cleaner.checkers.registry.sample_files",
+        side_effect=lambda files, confidence, rng: [max(files, key=lambda file: file.size)],
+    )
+    def test_sampled_results_are_verified(self, mock_sample_files, mock_print, tmp_path):
+        """A hardlink missed by the sample is found when the flagged torrents are verified."""
+        (tmp_path / "big.mkv").write_text("big")
+        (tmp_path / "linked.nfo").write_text("n")
+        (tmp_path / "link.nfo").hardlink_to(tmp_path / "linked.nfo")
+        torrent = make_torrent(1, "pack", str(tmp_path), ["big.mkv", "linked.nfo"])
+        torrent.fields["files"][0]["length"] = 3
+        client = Mock()
+        client.get_torrents.return_value = [torrent]
+        checkers = [HardlinksChecker()]
+
+        # The sample only holds the largest file
+        all_torrents, results = run_checkers(client, checkers, sample=0.5)
+
+        assert [t.id for t in results["hardlinks"]] == [1]
+        assert verify_checkers(checkers, results, all_torrents) == {"hardlinks": []}
+
+    @patch("builtins.print")
+    @patch("transmission_cleaner.checkers.registry.stat_paths")
+    def test_deadline_stops_stat_pass(self, mock_stat_paths, mock_print):
+        """Torrents not stat-ed before the deadline are not passed to any checker."""
+        seen = {}
+
+        class RecordingChecker(Checker):
+            name = "recording"
+            phase = "stat"
+
+            def check(self, torrents, context):
+                seen["torrents"] = list(torrents)
+                return []
+
+        client = Mock()
+        client.get_torrents.return_value = [make_torrent(1, "a", "/data", ["a.bin"])]
+        deadline = Mock()
+        deadline.reached.return_value = True
+
+        run_checkers(client, [RecordingChecker()], deadline=deadline)
+
+        mock_stat_paths.assert_not_called()
+        assert seen["torrents"] == []
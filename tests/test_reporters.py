@@ -0,0 +1,123 @@
+"""Tests for list output reporters."""
+
+import csv
+import io
+import json
+import pathlib
+
+from transmission_rpc import Torrent
+
+from transmission_cleaner.reporters import BUFFER_RECORDS, create_reporter
+
+
+def create_torrent(torrent_id=1, name="Movie (2020)"):
+    """Helper to create a torrent with the fields reporters use."""
+    return Torrent(
+        fields={
+            "id": torrent_id,
+            "hashString": "abc123",
+            "name": name,
+            "downloadDir": "/data",
+            "totalSize": 2 * 1024**3,
+        }
+    )
+
+
+class TestTextReporter:
+    """Tests for human-readable output."""
+
+    def test_torrent_line(self):
+        """Should print the same line as the list action always did."""
+        stream = io.StringIO()
+        reporter = create_reporter("text", stream)
+
+        reporter.torrent(create_torrent(), cross_seeded=True)
+        reporter.flush()
+
+        assert stream.getvalue() == "  - Movie (2020) [CROSS-SEEDED] (2.00 GB)\n"
+
+    def test_buffers_until_flush(self):
+        """Records should be written in batches, not one write per line."""
+        stream = io.StringIO()
+        reporter = create_reporter("text", stream)
+
+        reporter.file(pathlib.Path("/data/a"), 1024 * 1024)
+        assert stream.getvalue() == ""
+
+        for _ in range(BUFFER_RECORDS):
+            reporter.file(pathlib.Path("/data/a"), 1024 * 1024)
+        assert stream.getvalue().count("\n") == BUFFER_RECORDS
+
+
+class TestNdjsonReporter:
+    """Tests for NDJSON output."""
+
+    def test_one_json_object_per_line(self):
+        """Each record should be a complete JSON object on its own line."""
+        stream = io.StringIO()
+        reporter = create_reporter("ndjson", stream)
+
+        reporter.torrent(create_torrent())
+        reporter.file(pathlib.Path("/data/orphan.bin"), 42)
+        reporter.flush()
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert lines[0]["hash"] == "abc123"
+        assert lines[0]["size"] == 2 * 1024**3
+        assert lines[0]["cross_seeded"] is False
+        assert lines[1] == {"type": "file", "path": str(pathlib.Path("/data/orphan.bin")), "size": 42, "error": None}
+
+
+class TestRecord:
+    """Tests for reporting records read back from NDJSON output."""
+
+    def test_record_matches_reported_torrent(self):
+        """A torrent's NDJSON record renders as the torrent itself would in every format."""
+        ndjson = io.StringIO()
+        reporter = create_reporter("ndjson", ndjson)
+        reporter.torrent(create_torrent(), cross_seeded=True)
+        reporter.flush()
+        record = json.loads(ndjson.getvalue())
+
+        for output_format in ["text", "ndjson", "csv"]:
+            direct, replayed = io.StringIO(), io.StringIO()
+            reporter = create_reporter(output_format, direct)
+            reporter.torrent(create_torrent(), cross_seeded=True)
+            reporter.flush()
+            reporter = create_reporter(output_format, replayed)
+            reporter.record(record)
+            reporter.flush()
+
+            assert replayed.getvalue() == direct.getvalue()
+
+
+class TestCsvReporter:
+    """Tests for CSV output."""
+
+    def test_header_and_quoting(self):
+        """Should write a header once and quote fields containing commas."""
+        stream = io.StringIO()
+        reporter = create_reporter("csv", stream)
+
+        reporter.torrent(create_torrent(1, "Album, Deluxe"))
+        reporter.torrent(create_torrent(2, "Other"))
+        reporter.flush()
+
+        rows = list(csv.reader(io.StringIO(stream.getvalue())))
+        assert rows[0][:4] == ["type", "id", "hash", "name"]
+        assert rows[1][3] == "Album, Deluxe"
+        assert len(rows) == 3
+
+    def test_header_per_record_type(self):
+        """Files after torrents get their own header, as in a merged report."""
+        stream = io.StringIO()
+        reporter = create_reporter("csv", stream)
+
+        reporter.torrent(create_torrent())
+        reporter.file(pathlib.Path("/data/orphan.mkv"), 5)
+        reporter.file(pathlib.Path("/data/other.mkv"), 7)
+        reporter.flush()
+
+        rows = list(csv.reader(io.StringIO(stream.getvalue())))
+        assert [row[0] for row in rows] == ["type", "torrent", "type", "file", "file"]
+        assert rows[2] == ["type", "path", "size", "error"]
@@ -0,0 +1,105 @@
+"""Tests for batch review plans."""
+
+import pathlib
+from unittest.mock import Mock, patch
+
+import pytest
+
+from transmission_cleaner.review import (
+    PlanError,
+    edit_plan,
+    format_file_plan,
+    format_torrent_plan,
+    parse_file_plan,
+    parse_torrent_plan,
+)
+
+
+def create_mock_torrent(torrent_id, name):
+    """Helper to create a mock torrent."""
+    torrent = Mock()
+    torrent.id = torrent_id
+    torrent.name = name
+    torrent.total_size = 1024**3
+    return torrent
+
+
+class TestTorrentPlan:
+    """Tests for torrent plans."""
+
+    def test_round_trip_defaults_to_keep(self):
+        """An unedited plan should keep every torrent."""
+        torrents = [create_mock_torrent(1, "a"), create_mock_torrent(2, "b\twith tab")]
+
+        plan = format_torrent_plan(torrents, cross_seeded_ids={2})
+
+        assert "CROSS-SEEDED" in plan
+        assert parse_torrent_plan(plan) == {1: "keep", 2: "keep"}
+
+    def test_parses_edited_decisions(self):
+        """Full and short decisions should be accepted."""
+        plan = format_torrent_plan([create_mock_torrent(1, "a"), create_mock_torrent(2, "b")])
+        plan = plan.replace("keep\t1\t", "d\t1\t").replace("keep\t2\t", "remove\t2\t")
+
+        assert parse_torrent_plan(plan) == {1: "delete", 2: "remove"}
+
+    def test_rejects_unknown_decision(self):
+        """Typos should fail instead of being silently kept or deleted."""
+        with pytest.raises(ValueError):
+            parse_torrent_plan("nuke\t1\t1.00 GB\t-\ta\n")
+
+
+class TestFilePlan:
+    """Tests for orphaned file plans."""
+
+    def test_parses_paths_and_sizes(self):
+        """Paths should survive the round trip and sizes come from the scan."""
+        files = [pathlib.Path("/data/a b.bin"), pathlib.Path("/data/c.bin")]
+
+        plan = format_file_plan(files, {files[0]: 1024 * 1024})
+        plan = plan.replace("keep\t1.00 MB", "delete\t1.00 MB")
+
+        assert parse_file_plan(plan) == {files[0]: "delete", files[1]: "keep"}
+
+    def test_files_cannot_be_removed(self):
+        """Only keep and delete make sense for files."""
+        with pytest.raises(ValueError):
+            parse_file_plan("remove\t?\t/data/a\n")
+
+
+class TestEditPlan:
+    """Tests for opening the editor."""
+
+    @patch("transmission_cleaner.review.subprocess.run")
+    def test_runs_editor_and_reads_result(self, mock_run, tmp_path, monkeypatch):
+        """Should open $EDITOR on the plan file and return the edited text."""
+        monkeypatch.setenv("VISUAL", "")
+        monkeypatch.setenv("EDITOR", "myeditor --wait")
+        plan_file = tmp_path / "plan.txt"
+
+        def fake_editor(command, check):
+            pathlib.Path(command[-1]).write_text("edited")
+            return Mock(returncode=0)
+
+        mock_run.side_effect = fake_editor
+
+        result = edit_plan("original", str(plan_file))
+
+        assert result == "edited"
+        assert mock_run.call_args[0][0] == ["myeditor", "--wait", str(plan_file)]
+
+    @patch("transmission_cleaner.review.subprocess.run")
+    def test_failing_editor_raises(self, mock_run, tmp_path, monkeypatch):
+        """An editor exiting with an error (e.g. :cq in vim) should not yield a plan."""
+        monkeypatch.setenv("VISUAL", "vim")
+        mock_run.return_value = Mock(returncode=1)
+
+        with pytest.raises(PlanError):
+            edit_plan("original", str(tmp_path / "plan.txt"))
+
+    def test_missing_editor_raises(self, tmp_path, monkeypatch):
+        """An editor that cannot be started should raise PlanError, not FileNotFoundError."""
+        monkeypatch.setenv("VISUAL", str(tmp_path / "no-such-editor"))
+
+        with pytest.raises(PlanError):
+            edit_plan("original", str(tmp_path / "plan.txt"))
@@ -0,0 +1,45 @@
+"""Tests for shard assignment."""
+
+import hashlib
+
+from transmission_rpc import Torrent
+
+from transmission_cleaner.sharding import in_shard, shard_of, shard_torrents
+
+
+def make_torrent(torrent_id, hash_string):
+    """Helper to create a torrent with an infohash."""
+    return Torrent(fields={"id": torrent_id, "hashString": hash_string, "name": f"t{torrent_id}"})
+
+
+class TestShardOf:
+    """Tests for key assignment."""
+
+    def test_stable_across_processes(self):
+        """The assignment doesn't depend on the per-process hash() seed."""
+        digest = hashlib.blake2b(b"movies", digest_size=8).digest()
+
+        assert shard_of("movies", 4) == int.from_bytes(digest, "big") % 4
+
+    def test_each_key_in_exactly_one_shard(self):
+        """Shards of the same count partition the keys."""
+        keys = [f"{i:040x}" for i in range(200)]
+
+        shards = [[key for key in keys if in_shard(key, (index, 3))] for index in range(3)]
+
+        assert sorted(key for shard in shards for key in shard) == sorted(keys)
+        assert all(shards)
+
+
+class TestShardTorrents:
+    """Tests for splitting torrents by infohash."""
+
+    def test_assigns_by_infohash_regardless_of_case(self):
+        """The same infohash lands in the same shard whichever instance reports it."""
+        torrents = [make_torrent(i, f"{i:040X}") for i in range(50)]
+
+        shards = [shard_torrents(torrents, (index, 2)) for index in range(2)]
+
+        assert sorted(t.id for shard in shards for t in shard) == list(range(50))
+        for index, shard in enumerate(shards):
+            assert all(in_shard(f"{t.id:040x}", (index, 2)) for t in shard)
@@ -0,0 +1,70 @@
+"""Startup benchmarks: the CLI must answer --help without loading the RPC stack."""
+
+import subprocess
+import sys
+import time
+
+import pytest
+
+# Cumulative import time of transmission_cleaner modules for --help, in microseconds
+IMPORT_BUDGET_US = 50_000
+# Wall time of a cold `transmission-cleaner --help`, in seconds (includes interpreter startup)
+WALL_TIME_BUDGET_S = 1.0
+
+HEAVY_MODULES = ("transmission_rpc", "requests", "urllib3", "concurrent.futures")
+
+
+def run_help(*python_args):
+    """Run `transmission-cleaner --help` in a fresh interpreter."""
+    return subprocess.run(
+        [sys.executable, *python_args, "-m", "transmission_cleaner.main", "--help"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` output into {module: (self_us, cumulative_us)}."""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:") :].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # Header line
+        imports[fields[2].strip()] = (self_us, cumulative_us)
+    return imports
+
+
+class TestStartup:
+    """Tests for CLI startup cost."""
+
+    def test_help_does_not_import_heavy_modules(self):
+        """--help should not import transmission_rpc or its HTTP stack."""
+        imports = parse_importtime(run_help("-X", "importtime").stderr)
+
+        loaded = [name for name in imports if name.startswith(HEAVY_MODULES)]
+        assert loaded == []
+
+    @pytest.mark.benchmark
+    def test_help_import_time_within_budget(self):
+        """Importing the package for --help should stay within the import budget."""
+        imports = parse_importtime(run_help("-X", "importtime").stderr)
+
+        own_us = sum(self_us for name, (self_us, _) in imports.items() if name.startswith("transmission_cleaner"))
+        assert own_us <= IMPORT_BUDGET_US
+
+    @pytest.mark.benchmark
+    def test_help_wall_time_within_budget(self):
+        """A cold --help should return within the wall time budget (best of 3)."""
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            result = run_help()
+            timings.append(time.perf_counter() - start)
+
+        assert "hardlinks" in result.stdout
+        assert min(timings) <= WALL_TIME_BUDGET_S
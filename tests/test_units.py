@@ -0,0 +1,70 @@
+"""Tests for size and percentage parsing."""
+
+import pytest
+
+from transmission_cleaner.units import parse_duration, parse_percent, parse_shard, parse_size
+
+
+class TestParseSize:
+    """Tests for size parsing."""
+
+    def test_parses_binary_units(self):
+        """Should treat units as powers of 1024."""
+        assert parse_size("500G") == 500 * 1024**3
+        assert parse_size("1.5T") == int(1.5 * 1024**4)
+        assert parse_size("10k") == 10 * 1024
+
+    def test_accepts_byte_suffixes(self):
+        """Should accept B, GB and GiB spellings."""
+        assert parse_size("2GB") == parse_size("2GiB") == parse_size("2G")
+        assert parse_size("123") == parse_size("123B") == 123
+
+    def test_rejects_invalid_sizes(self):
+        """Should raise ValueError for garbage input."""
+        with pytest.raises(ValueError):
+            parse_size("lots")
+
+
+class TestParsePercent:
+    """Tests for percentage parsing."""
+
+    def test_parses_with_and_without_sign(self):
+        """Should return a fraction for both '85%' and '85'."""
+        assert parse_percent("85%") == 0.85
+        assert parse_percent("85") == 0.85
+
+    def test_rejects_out_of_range(self):
+        """Should reject percentages above 100."""
+        with pytest.raises(ValueError):
+            parse_percent("150%")
+
+
+class TestParseDuration:
+    """Tests for duration parsing."""
+
+    def test_parses_units(self):
+        """Should convert each unit to seconds, with bare numbers in seconds."""
+        assert parse_duration("90") == parse_duration("90s") == 90
+        assert parse_duration("30m") == 1800
+        assert parse_duration("1.5h") == 5400
+        assert parse_duration("7D") == 7 * 86400
+
+    def test_rejects_invalid_durations(self):
+        """Should raise ValueError for garbage input."""
+        with pytest.raises(ValueError):
+            parse_duration("soon")
+
+
+class TestParseShard:
+    """Tests for shard spec parsing."""
+
+    def test_parses_index_and_count(self):
+        """Should split the spec into a zero-based index and a count."""
+        assert parse_shard("0/4") == (0, 4)
+        assert parse_shard("3/4") == (3, 4)
+
+    def test_rejects_invalid_shards(self):
+        """Should raise ValueError for malformed or out-of-range specs."""
+        for value in ("4/4", "1", "a/b", "-1/2", "0/0"):
+            with pytest.raises(ValueError):
+                parse_shard(value)
@@ -1,25 +1,253 @@
 """Torrent and file action processing functionality."""
 
+import itertools
 import pathlib
-from collections.abc import Mapping, Sequence
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from typing import TypeVar
 
-from transmission_rpc import Client, Torrent
+from transmission_rpc import Torrent
+
+from transmission_cleaner.checkers.hardlinks import get_torrents_without_hardlinks
+from transmission_cleaner.checkers.orphans import iter_tracked_files
+from transmission_cleaner.client import TorrentClient
+from transmission_cleaner.deleter import LocalDeleter, remove_empty_dirs
+from transmission_cleaner.fsstat import DirStat
+from transmission_cleaner.journal import DELETED, REMOVED, SKIPPED, Journal, file_key, torrent_key
+from transmission_cleaner.reporters import Reporter, TextReporter
+from transmission_cleaner.review import (
+    PlanError,
+    edit_plan,
+    format_file_plan,
+    format_torrent_plan,
+    parse_file_plan,
+    parse_torrent_plan,
+)
+
+# Torrents removed per torrent-remove request when data is deleted locally
+REMOVE_BATCH_SIZE = 50
+# Streamed orphaned files journaled and deleted at a time
+ORPHAN_BATCH_SIZE = 1000
+
+T = TypeVar("T")
+
+
+def _review_plan(plan: str, parse: Callable[[str], T], plan_file: str | None = None) -> T | None:
+    """Let the user edit a plan and parse it.
+
+    Args:
+        plan: Initial plan text
+        parse: Plan parser, e.g. parse_torrent_plan
+        plan_file: Where to keep the plan (default: a temporary file)
+
+    Returns:
+        Parsed decisions, or None if the editor failed or the plan is malformed, in which
+        case nothing may be acted on
+    """
+    try:
+        return parse(edit_plan(plan, plan_file))
+    except (PlanError, ValueError) as e:
+        print(f"[ERROR]  {e}")
+        print("[ERROR]  Review aborted, nothing was changed")
+        return None
+
+
+def _delete_torrent_data(deleter: LocalDeleter, download_dir: pathlib.Path, names: Sequence[str]) -> tuple[int, bool]:
+    """Delete a removed torrent's files and the directories they leave empty.
+
+    Args:
+        deleter: Local deleter used for the data
+        download_dir: Torrent download directory
+        names: File names relative to the download directory
+
+    Returns:
+        Bytes freed, and whether every file is gone
+    """
+    freed = 0
+    complete = True
+    results = deleter.delete([download_dir / name for name in names])
+    for result in results:
+        if result.error is not None and not isinstance(result.error, FileNotFoundError):
+            print(f"[ERROR]  Failed to delete {result.path}: {result.error}")
+            complete = False
+        freed += result.size
+    remove_empty_dirs((result.path for result in results), download_dir)
+    return freed, complete
+
+
+def _delete_files(deleter: LocalDeleter, paths: Sequence[pathlib.Path], journal: Journal | None = None) -> int:
+    """Delete files, logging each outcome and journaling the ones that are gone.
+
+    Args:
+        deleter: Local deleter used for the files
+        paths: Files to delete
+        journal: Optional journal to mark deleted files in
+
+    Returns:
+        Total bytes freed
+    """
+    total_space_freed = 0
+    for result in deleter.iter_delete(paths):
+        if isinstance(result.error, FileNotFoundError):
+            print(f"[SKIP]   File no longer exists: {result.path}")
+        elif result.error is not None:
+            print(f"[ERROR]  Failed to delete {result.path}: {result.error}")
+            continue
+        else:
+            size_mb = result.size / (1024 * 1024)
+            print(f"[ACTION] Deleted: {result.path} ({size_mb:.2f} MB)")
+            total_space_freed += result.size
+        if journal is not None:
+            journal.mark_done([file_key(result.path)], DELETED)
+    return total_space_freed
+
+
+def delete_torrents_locally(
+    client: TorrentClient,
+    torrents: Sequence[Torrent],
+    deleter: LocalDeleter,
+    cross_seed_map: Mapping[int, Sequence[Torrent]] | None = None,
+    journal: Journal | None = None,
+) -> int:
+    """Remove torrents from the client without data, then delete the data locally.
+
+    Removing with delete_data=True makes the daemon delete files on its event loop, which stalls
+    every other torrent. Here torrents are removed in batches and the files are deleted by the
+    local deleter instead.
+
+    Args:
+        client: Transmission RPC client
+        torrents: Torrents to remove
+        deleter: Local deleter used for the data
+        cross_seed_map: Optional dict mapping torrent IDs to cross-seeding torrents, whose data is kept
+        journal: Optional journal recording the plan and its progress
+
+    Returns:
+        Total bytes freed
+    """
+    cross_seed_map = cross_seed_map or {}
+    to_delete: list[Torrent] = []
+    to_remove: list[Torrent] = []
+    for torrent in torrents:
+        if torrent.id in cross_seed_map:
+            print(f"[PROTECTED] {torrent.name}: Cross-seeded, removing torrent only (keeping data)")
+        elif torrent.total_size > 0 and not torrent.get_files():
+            # Without the file list (not fetched), the data could not be found once the torrent is removed
+            print(f"[ERROR]  {torrent.name}: No file list to delete the data from, keeping torrent")
+            continue
+        else:
+            size_gb = torrent.total_size / (1024**3)
+            print(f"[ACTION] {torrent.name}: Removing, deleting data locally ({size_gb:.2f} GB)")
+            to_delete.append(torrent)
+        to_remove.append(torrent)
+    torrents = to_remove
+
+    if journal is not None:
+        for torrent in torrents:
+            journal.plan_torrent(torrent, delete_data=False, local=torrent.id not in cross_seed_map)
+        journal.sync()
+
+    for start in range(0, len(torrents), REMOVE_BATCH_SIZE):
+        batch = torrents[start : start + REMOVE_BATCH_SIZE]
+        client.remove_torrent([torrent.id for torrent in batch], delete_data=False)
+        if journal is not None:
+            journal.mark_done((torrent_key(torrent) for torrent in batch), REMOVED)
+
+    total_space_freed = 0
+    for torrent in to_delete:
+        names = [file.name for file in torrent.get_files()]
+        freed, complete = _delete_torrent_data(deleter, pathlib.Path(torrent.download_dir), names)
+        total_space_freed += freed
+        if journal is not None and complete:
+            journal.mark_done([torrent_key(torrent)], DELETED)
+
+    return total_space_freed
+
+
+def execute_torrent_plan(
+    client: TorrentClient,
+    torrents: Sequence[Torrent],
+    decisions: Mapping[int, str],
+    cross_seed_map: Mapping[int, Sequence[Torrent]] | None = None,
+    deleter: LocalDeleter | None = None,
+    journal: Journal | None = None,
+) -> int:
+    """Run reviewed decisions as batched removals.
+
+    Args:
+        client: Transmission RPC client
+        torrents: Reviewed torrents
+        decisions: Mapping of torrent ID to "keep", "remove" or "delete"; missing IDs are kept
+        cross_seed_map: Optional dict mapping torrent IDs to cross-seeding torrents, whose data is kept
+        deleter: Optional local deleter. If provided, data is deleted locally instead of by the daemon.
+        journal: Optional journal recording the plan and its progress
+
+    Returns:
+        Total bytes freed
+    """
+    cross_seed_map = cross_seed_map or {}
+    to_remove = [t for t in torrents if decisions.get(t.id) == "remove"]
+    to_delete = [t for t in torrents if decisions.get(t.id) == "delete"]
+    print(f"[INFO]   Plan: {len(to_remove)} to remove, {len(to_delete)} to delete with data")
+
+    for torrent in to_remove:
+        print(f"[ACTION] {torrent.name}: Removing without data")
+
+    if deleter is not None:
+        # Removes everything marked delete in batches, protecting cross-seeded data
+        total_space_freed = delete_torrents_locally(client, to_delete, deleter, cross_seed_map, journal)
+        with_data: list[Torrent] = []
+    else:
+        total_space_freed = 0
+        with_data = []
+        for torrent in to_delete:
+            if torrent.id in cross_seed_map:
+                print(f"[PROTECTED] {torrent.name}: Cross-seeded, removing torrent only (keeping data)")
+                to_remove.append(torrent)
+            else:
+                size_gb = torrent.total_size / (1024**3)
+                print(f"[ACTION] {torrent.name}: Removing with data ({size_gb:.2f} GB)")
+                with_data.append(torrent)
+                total_space_freed += torrent.total_size
+
+    if journal is not None:
+        for torrent in with_data:
+            journal.plan_torrent(torrent, delete_data=True)
+        for torrent in to_remove:
+            journal.plan_torrent(torrent, delete_data=False)
+        journal.sync()
+
+    for group, delete_data in ((with_data, True), (to_remove, False)):
+        for start in range(0, len(group), REMOVE_BATCH_SIZE):
+            batch = group[start : start + REMOVE_BATCH_SIZE]
+            client.remove_torrent([t.id for t in batch], delete_data=delete_data)
+            if journal is not None:
+                journal.mark_done((torrent_key(t) for t in batch), REMOVED)
+
+    return total_space_freed
 
 
 def process_torrents(
-    client: Client,
+    client: TorrentClient,
     torrents: Sequence[Torrent],
     action: str | None,
     cross_seed_map: Mapping[int, Sequence[Torrent]] | None = None,
+    deleter: LocalDeleter | None = None,
+    reporter: Reporter | None = None,
+    plan_file: str | None = None,
+    journal: Journal | None = None,
 ) -> int:
     """Process torrents based on the specified action.
 
     Args:
         client: Transmission RPC client
         torrents: List of torrents to process
-        action: Action to perform - None (interactive), "list"/"l", "delete"/"d", "remove"/"r"
+        action: Action to perform - None (interactive), "list"/"l", "delete"/"d", "remove"/"r", "review"/"v"
         cross_seed_map: Optional dict mapping torrent IDs to list of cross-seeding torrents.
                        If provided, protects cross-seeded torrents from data deletion.
+        deleter: Optional local deleter. If provided, data is deleted locally instead of by the daemon.
+        reporter: Reporter used by the list action (default: text on stdout)
+        plan_file: Where the review action keeps its plan (default: a temporary file)
+        journal: Optional journal recording the delete, remove and review actions' plan and progress
 
     Returns:
         Total bytes freed (only counts data that was actually deleted)
@@ -29,12 +257,27 @@ def process_torrents(
 
     # Handle action based on argument
     if action in ["list", "l"]:
+        reporter = reporter or TextReporter()
         for torrent in torrents:
-            cross_status = " [CROSS-SEEDED]" if torrent.id in cross_seed_map else ""
-            size_gb = torrent.total_size / (1024**3)
-            print(f"  - {torrent.name}{cross_status} ({size_gb:.2f} GB)")
+            reporter.torrent(torrent, cross_seeded=torrent.id in cross_seed_map)
+        reporter.flush()
+
+    elif action in ["review", "v"]:
+        if torrents:
+            decisions = _review_plan(
+                format_torrent_plan(torrents, cross_seed_map.keys()), parse_torrent_plan, plan_file
+            )
+            if decisions is not None:
+                total_space_freed += execute_torrent_plan(client, torrents, decisions, cross_seed_map, deleter, journal)
+
+    elif action in ["delete", "d"] and deleter is not None:
+        total_space_freed += delete_torrents_locally(client, torrents, deleter, cross_seed_map, journal)
 
     elif action in ["delete", "d"]:
+        if journal is not None:
+            for torrent in torrents:
+                journal.plan_torrent(torrent, delete_data=torrent.id not in cross_seed_map)
+            journal.sync()
         for torrent in torrents:
             if torrent.id in cross_seed_map:
                 # Cross-seeded: protect data, remove torrent only
@@ -46,11 +289,19 @@ def process_torrents(
                 print(f"[ACTION] {torrent.name}: Removing with data ({size_gb:.2f} GB)")
                 client.remove_torrent(torrent.id, delete_data=True)
                 total_space_freed += torrent.total_size
+            if journal is not None:
+                journal.mark_done([torrent_key(torrent)], REMOVED)
 
     elif action in ["remove", "r"]:
+        if journal is not None:
+            for torrent in torrents:
+                journal.plan_torrent(torrent, delete_data=False)
+            journal.sync()
         for torrent in torrents:
             print(f"[ACTION] {torrent.name}: Removing without data")
             client.remove_torrent(torrent.id, delete_data=False)
+            if journal is not None:
+                journal.mark_done([torrent_key(torrent)], REMOVED)
 
     elif action in ["interactive", "i", None]:
         # Interactive mode
@@ -66,6 +317,8 @@ def process_torrents(
             if choice == "r":
                 print(f"[ACTION] {torrent.name}: Removing without data")
                 client.remove_torrent(torrent.id, delete_data=False)
+            elif choice == "d" and deleter is not None:
+                total_space_freed += delete_torrents_locally(client, [torrent], deleter, cross_seed_map)
             elif choice == "d":
                 if torrent.id in cross_seed_map:
                     # Cross-seeded: protect data even if user wants to delete
@@ -86,12 +339,22 @@ def process_torrents(
 def process_orphaned_files(
     orphaned_files: Sequence[pathlib.Path],
     action: str | None,
+    deleter: LocalDeleter | None = None,
+    reporter: Reporter | None = None,
+    sizes: Mapping[pathlib.Path, int] | None = None,
+    plan_file: str | None = None,
+    journal: Journal | None = None,
 ) -> int:
     """Process orphaned files based on the specified action.
 
     Args:
         orphaned_files: List of orphaned file paths to process
-        action: Action to perform - None (interactive), "list"/"l", "delete"/"d"
+        action: Action to perform - None (interactive), "list"/"l", "delete"/"d", "review"/"v"
+        deleter: Local deleter used by the delete action (defaults to an unthrottled one)
+        reporter: Reporter used by the list action (default: text on stdout)
+        sizes: File sizes already known from the directory scan; other files are stat-ed
+        plan_file: Where the review action keeps its plan (default: a temporary file)
+        journal: Optional journal recording the delete and review actions' plan and progress
 
     Returns:
         Total bytes freed (only counts files that were actually deleted)
@@ -99,44 +362,248 @@ def process_orphaned_files(
     total_space_freed = 0
 
     if action in ["list", "l"]:
-        for file_path in sorted(orphaned_files):
-            try:
-                size = file_path.stat().st_size if file_path.exists() else 0
-                size_mb = size / (1024 * 1024)
-                print(f"  - {file_path} ({size_mb:.2f} MB)")
-            except (OSError, PermissionError) as e:
-                print(f"  - {file_path} [ERROR: {e}]")
+        reporter = reporter or TextReporter()
+        sizes = sizes or {}
+        # Sorted paths visit each directory once, so its descriptor stays open in the DirStat
+        with DirStat() as dir_stat:
+            for file_path in sorted(orphaned_files):
+                size = sizes.get(file_path)
+                if size is not None:
+                    reporter.file(file_path, size)
+                    continue
+                try:
+                    reporter.file(file_path, dir_stat.stat(file_path).st_size)
+                except FileNotFoundError:
+                    reporter.file(file_path, 0)
+                except OSError as e:
+                    reporter.file(file_path, None, error=str(e))
+        reporter.flush()
+
+    elif action in ["delete", "d", "review", "v"]:
+        if action in ["review", "v"]:
+            if not orphaned_files:
+                return 0
+            decisions = _review_plan(format_file_plan(sorted(orphaned_files), sizes or {}), parse_file_plan, plan_file)
+            if decisions is None:
+                return 0
+            orphaned_files = [f for f in orphaned_files if decisions.get(f) == "delete"]
+            print(f"[INFO]   Plan: {len(orphaned_files)} files to delete")
+
+        if journal is not None:
+            for file_path in orphaned_files:
+                journal.plan_file(file_path)
+            journal.sync()
+        total_space_freed += _delete_files(deleter or LocalDeleter(), orphaned_files, journal)
+
+    else:  # interactive mode
+        total_space_freed += _prompt_delete_files(orphaned_files)
+
+    return total_space_freed
+
+
+def _prompt_delete_files(paths: Iterable[pathlib.Path]) -> int:
+    """Ask about each file and delete the ones confirmed.
+
+    Args:
+        paths: Files to ask about
+
+    Returns:
+        Total bytes freed
+    """
+    total_space_freed = 0
+    for file_path in paths:
+        try:
+            if not file_path.exists():
+                print(f"[SKIP]   File no longer exists: {file_path}")
+                continue
+            size = file_path.stat().st_size
+            size_mb = size / (1024 * 1024)
+            choice = input(f"[PROMPT] {file_path} ({size_mb:.2f} MB)\n         Delete file? [y/N] ").strip().lower()
+            if choice == "y":
+                print(f"[ACTION] Deleting: {file_path}")
+                file_path.unlink()
+                total_space_freed += size
+            else:
+                print("[SKIP]   Skipped")
+        except (OSError, PermissionError) as e:
+            print(f"[ERROR]  Cannot process {file_path}: {e}")
+    return total_space_freed
+
+
+def process_orphaned_file_stream(
+    orphaned_files: Iterable[tuple[pathlib.Path, int]],
+    action: str | None,
+    deleter: LocalDeleter | None = None,
+    reporter: Reporter | None = None,
+    journal: Journal | None = None,
+) -> tuple[int, int]:
+    """Process orphaned files as they are found, without holding them in memory.
+
+    Like process_orphaned_files, for the streamed output of find_orphaned_files_external. Files
+    are listed in the order they come, and deleted ORPHAN_BATCH_SIZE at a time, each batch
+    journaled before it is deleted. The review action needs the whole plan, so it is not
+    supported.
+
+    Args:
+        orphaned_files: (path, size) of orphaned files
+        action: Action to perform - None (interactive), "list"/"l", "delete"/"d"
+        deleter: Local deleter used by the delete action (defaults to an unthrottled one)
+        reporter: Reporter used by the list action (default: text on stdout)
+        journal: Optional journal recording the delete action's plan and progress
+
+    Returns:
+        Number of orphaned files, and total bytes freed (only counts files that were actually deleted)
+    """
+    count = 0
+
+    def counted() -> Iterator[tuple[pathlib.Path, int]]:
+        nonlocal count
+        for item in orphaned_files:
+            count += 1
+            yield item
+
+    total_space_freed = 0
+    if action in ["list", "l"]:
+        reporter = reporter or TextReporter()
+        for file_path, size in counted():
+            reporter.file(file_path, size)
+        reporter.flush()
 
     elif action in ["delete", "d"]:
-        for file_path in orphaned_files:
-            try:
-                if file_path.exists():
-                    size = file_path.stat().st_size
-                    size_mb = size / (1024 * 1024)
-                    print(f"[ACTION] Deleting: {file_path} ({size_mb:.2f} MB)")
-                    file_path.unlink()
-                    total_space_freed += size
-                else:
-                    print(f"[SKIP]   File no longer exists: {file_path}")
-            except (OSError, PermissionError) as e:
-                print(f"[ERROR]  Failed to delete {file_path}: {e}")
+        deleter = deleter or LocalDeleter()
+        orphans = counted()
+        while paths := [file_path for file_path, _ in itertools.islice(orphans, ORPHAN_BATCH_SIZE)]:
+            if journal is not None:
+                for file_path in paths:
+                    journal.plan_file(file_path)
+                journal.sync()
+            total_space_freed += _delete_files(deleter, paths, journal)
+
+    elif action in ["review", "v"]:
+        raise ValueError("The review action needs every orphaned file up front")
 
     else:  # interactive mode
-        for file_path in orphaned_files:
-            try:
-                if not file_path.exists():
-                    print(f"[SKIP]   File no longer exists: {file_path}")
-                    continue
-                size = file_path.stat().st_size
-                size_mb = size / (1024 * 1024)
-                choice = input(f"[PROMPT] {file_path} ({size_mb:.2f} MB)\n         Delete file? [y/N] ").strip().lower()
-                if choice == "y":
-                    print(f"[ACTION] Deleting: {file_path}")
-                    file_path.unlink()
-                    total_space_freed += size
-                else:
-                    print("[SKIP]   Skipped")
-            except (OSError, PermissionError) as e:
-                print(f"[ERROR]  Cannot process {file_path}: {e}")
+        total_space_freed += _prompt_delete_files(file_path for file_path, _ in counted())
+
+    return count, total_space_freed
+
+
+def _get_tracked_owners(torrents: Sequence[Torrent]) -> dict[pathlib.Path, set[str]]:
+    """Map each tracked file path to the hashes of the torrents tracking it."""
+    owners: dict[pathlib.Path, set[str]] = {}
+    for torrent in torrents:
+        for file_path in iter_tracked_files([torrent]):
+            owners.setdefault(file_path, set()).add(torrent.hash_string)
+    return owners
+
+
+def _is_tracked_by_others(
+    owners: Mapping[pathlib.Path, set[str]],
+    paths: Iterable[pathlib.Path],
+    own_hash: str | None = None,
+) -> bool:
+    """Whether a torrent other than own_hash tracks any of the files."""
+    for file_path in paths:
+        try:
+            file_path = file_path.resolve()
+        except (OSError, RuntimeError):
+            pass
+        if owners.get(file_path, set()) - {own_hash}:
+            return True
+    return False
+
+
+def resume_journal(client: TorrentClient, journal: Journal, deleter: LocalDeleter | None = None) -> int:
+    """Carry on with the unfinished items of an interrupted run.
+
+    Only the remaining items are re-checked, against the torrents in the client now:
+    torrents are looked up by hash (IDs change when the daemon restarts) and removed if still
+    present, and files that are already gone are skipped. Data shared with a torrent that
+    was added since (a new cross-seed) is kept, files tracked again are not deleted, and for
+    a hardlinks run, a torrent that gained a hardlink is left alone.
+
+    Args:
+        client: Transmission RPC client
+        journal: Journal of the interrupted run
+        deleter: Local deleter used for torrent data deleted locally and for files (defaults to an unthrottled one)
+
+    Returns:
+        Total bytes freed
+    """
+    deleter = deleter or LocalDeleter()
+    pending = journal.pending()
+    print(f"[INFO]   Resuming {len(pending)} unfinished items from {journal.path}")
+    total_space_freed = 0
+    if not pending:
+        return 0
+
+    # Every pending item deletes data or removes a torrent, so the current torrents are
+    # fetched once, with their files, to re-check what is left
+    current = {t.hash_string: t for t in client.get_torrents()}
+    owners = _get_tracked_owners(list(current.values()))
+
+    # Items no longer eligible, and torrents whose data is no longer safe to delete
+    skipped: set[str] = set()
+    keep_data: set[str] = set()
+    to_remove = []
+    for record in (r for r in pending if r["kind"] == "torrent"):
+        torrent = current.get(record["hash"])
+        if REMOVED not in record["steps"] and torrent is not None:
+            if journal.command == "hardlinks" and not get_torrents_without_hardlinks([torrent]):
+                print(f"[SKIP]   {record['name']}: Hardlinked or missing data now, keeping it")
+                skipped.add(record["key"])
+                continue
+            paths = [pathlib.Path(torrent.download_dir) / file.name for file in torrent.get_files()]
+        elif record["local"]:
+            paths = [pathlib.Path(record["download_dir"]) / name for name in record["files"]]
+        else:
+            paths = []
+        if (record["delete_data"] or record["local"]) and _is_tracked_by_others(owners, paths, record["hash"]):
+            print(f"[PROTECTED] {record['name']}: Files now shared with another torrent, keeping data")
+            keep_data.add(record["key"])
+        if REMOVED not in record["steps"]:
+            to_remove.append(record)
+
+    gone = [r for r in to_remove if r["hash"] not in current]
+    for record in gone:
+        print(f"[SKIP]   {record['name']}: Already removed")
+    journal.mark_done((r["key"] for r in gone), REMOVED)
+
+    for delete_data in (True, False):
+        group = [
+            r
+            for r in to_remove
+            if r["hash"] in current and (r["delete_data"] and r["key"] not in keep_data) == delete_data
+        ]
+        for start in range(0, len(group), REMOVE_BATCH_SIZE):
+            batch = group[start : start + REMOVE_BATCH_SIZE]
+            for record in batch:
+                print(f"[ACTION] {record['name']}: Removing {'with' if delete_data else 'without'} data")
+                if delete_data:
+                    total_space_freed += record["size"]
+            client.remove_torrent([current[r["hash"]].id for r in batch], delete_data=delete_data)
+            journal.mark_done((r["key"] for r in batch), REMOVED)
+
+    for record in pending:
+        if record["kind"] != "torrent" or not record["local"] or record["key"] in skipped:
+            continue
+        if record["key"] in keep_data:
+            skipped.add(record["key"])
+            continue
+        print(f"[ACTION] {record['name']}: Deleting data locally")
+        freed, complete = _delete_torrent_data(deleter, pathlib.Path(record["download_dir"]), record["files"])
+        total_space_freed += freed
+        if complete:
+            journal.mark_done([record["key"]], DELETED)
+
+    files = []
+    for record in (r for r in pending if r["kind"] == "file"):
+        if _is_tracked_by_others(owners, [pathlib.Path(record["path"])]):
+            print(f"[SKIP]   {record['path']}: Tracked by a torrent now, keeping it")
+            skipped.add(record["key"])
+        else:
+            files.append(pathlib.Path(record["path"]))
+    total_space_freed += _delete_files(deleter, files, journal)
 
+    journal.mark_done(skipped, SKIPPED)
     return total_space_freed
@@ -1,8 +1,32 @@
 """Checker modules for different torrent and file analysis operations."""
 
-from transmission_cleaner.checkers.errors import check_cross_seeding, get_torrents_with_errors, is_cross_seeded
+from transmission_cleaner.checkers.errors import (
+    CrossSeedIndex,
+    check_cross_seeding,
+    get_torrents_with_errors,
+    is_cross_seeded,
+)
 from transmission_cleaner.checkers.hardlinks import get_torrents_without_hardlinks, is_hardlink
-from transmission_cleaner.checkers.orphans import find_orphaned_files, get_tracked_files, scan_directory
+from transmission_cleaner.checkers.orphans import (
+    find_orphaned_files,
+    find_orphaned_files_external,
+    get_download_roots,
+    get_tracked_files,
+    get_tracked_files_from_torrents,
+    iter_directory,
+    iter_tracked_files,
+    scan_directory,
+    scan_roots,
+)
+from transmission_cleaner.checkers.registry import (
+    CHECKERS,
+    CheckContext,
+    Checker,
+    load_plugins,
+    register_checker,
+    run_checkers,
+    verify_checkers,
+)
 
 __all__ = [
     # Hardlinks
@@ -11,9 +35,24 @@ __all__ = [
     # Errors
     "get_torrents_with_errors",
     "check_cross_seeding",
+    "CrossSeedIndex",
     "is_cross_seeded",
     # Orphans
     "scan_directory",
+    "iter_directory",
+    "scan_roots",
+    "get_download_roots",
     "get_tracked_files",
+    "get_tracked_files_from_torrents",
+    "iter_tracked_files",
     "find_orphaned_files",
+    "find_orphaned_files_external",
+    # Registry
+    "Checker",
+    "CheckContext",
+    "CHECKERS",
+    "register_checker",
+    "load_plugins",
+    "run_checkers",
+    "verify_checkers",
 ]
@@ -1,42 +1,378 @@
 """Error status and cross-seed detection for torrents."""
 
+import json
 import pathlib
+import re
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Mapping, Sequence
 
-from transmission_rpc import Client, Torrent
+from transmission_rpc import Torrent
+
+from transmission_cleaner.client import TorrentClient
+
+# Category for errors that match no pattern
+OTHER_CATEGORY = "other"
+
+# Actions an error category may map to
+RULE_ACTIONS = {"list", "l", "interactive", "i", "review", "v", "delete", "d", "remove", "r"}
+
+DEFAULT_ERROR_CATEGORIES: dict[str, list[str]] = {
+    "unregistered": [
+        "unregistered",
+        "not registered",
+        "torrent not found",
+        "infohash not found",
+        "torrent has been deleted",
+        "trumped",
+        "nuked",
+    ],
+    "tracker down": [
+        "could not connect to tracker",
+        "connection failed",
+        "connection refused",
+        "couldn't resolve host",
+        "timed out",
+        "tracker gave http response code",
+        "bad gateway",
+        "service unavailable",
+    ],
+    "I/O error": [
+        "input/output error",
+        "no space left on device",
+        "read-only file system",
+        "permission denied",
+    ],
+    "data missing": [
+        "no data found",
+        "no such file or directory",
+        "please verify local data",
+        "file not found",
+    ],
+}
+
+
+def _check_regex(regex: str) -> None:
+    """Check that a regex can be one alternative of the combined ErrorClassifier pattern.
+
+    Raises:
+        re.error: If the regex is invalid
+        ValueError: If it sets inline global flags or uses numbered backreferences
+    """
+    if re.compile(regex).flags & ~re.UNICODE:
+        raise ValueError("inline global flags apply to every pattern, use a scoped group like (?i:...)")
+    # Escapes are matched pairwise, so an escaped backslash followed by a digit is not a backreference
+    backreference = any(escape[1] in "123456789" for escape in re.findall(r"\\.", regex))
+    if backreference or re.search(r"\(\?\(\d", regex):
+        raise ValueError("numbered group references change meaning once combined, use named groups")
+
+
+class ErrorClassifier:
+    """Sort error strings into categories using a single compiled regex.
+
+    Patterns are case-insensitive substrings, or regular expressions when prefixed with "re:".
+    All categories are compiled into one alternation of named groups, so each error string is
+    scanned once no matter how many patterns there are. The earliest match in the string wins;
+    matches at the same position go to the category listed first. An invalid "re:" pattern
+    raises ValueError naming its category, as do inline global flags such as (?i) and numbered
+    backreferences, which cannot work inside the combined alternation (use scoped flags such
+    as (?i:...) and named groups instead).
+    """
+
+    def __init__(self, categories: Mapping[str, Sequence[str]]):
+        self.categories = list(categories)
+        alternatives = []
+        for index, (name, patterns) in enumerate(categories.items()):
+            regexes = [p[3:] if p.startswith("re:") else re.escape(p) for p in patterns]
+            for pattern, regex in zip(patterns, regexes, strict=True):
+                try:
+                    _check_regex(regex)
+                except (re.error, ValueError) as e:
+                    raise ValueError(f"Invalid pattern {pattern!r} for error category {name!r}: {e}") from None
+            if regexes:
+                alternatives.append(f"(?P<c{index}>{'|'.join(regexes)})")
+        try:
+            self._pattern = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+        except re.error as e:
+            # E.g. the same group name used in two patterns
+            raise ValueError(f"Invalid error patterns: {e}") from None
+
+    def classify(self, error_string: str) -> str | None:
+        """Find the category of an error string.
+
+        Args:
+            error_string: Error message to classify
+
+        Returns:
+            Category name, or None if no pattern matches
+        """
+        if self._pattern is None:
+            return None
+        match = self._pattern.search(error_string)
+        if match is None or match.lastgroup is None:
+            return None
+        return self.categories[int(match.lastgroup[1:])]
+
+
+def load_error_rules(rules_file: str) -> tuple[dict[str, list[str]], dict[str, str]]:
+    """Load error categories and their actions from a JSON file.
+
+    The file maps category names to objects with a "patterns" list and an optional "action":
+    ``{"unregistered": {"patterns": ["unregistered", "re:not (found|registered)"], "action": "delete"}}``
+
+    Args:
+        rules_file: Path to the JSON rules file
+
+    Returns:
+        Tuple of (category patterns, category actions); categories without an action are omitted from the latter
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not valid JSON, a category has no "patterns" list or an unknown action
+    """
+    with open(rules_file, "r") as f:
+        try:
+            rules = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{rules_file} is not valid JSON: {e}") from None
+
+    try:
+        invalid = [
+            name
+            for name, rule in rules.items()
+            if not isinstance(rule, dict) or not isinstance(rule.get("patterns"), list)
+        ]
+    except AttributeError:
+        raise ValueError(f"{rules_file} must map category names to rules") from None
+    if invalid:
+        raise ValueError(f'Error category {invalid[0]!r} has no "patterns" list')
+
+    categories = {name: list(rule["patterns"]) for name, rule in rules.items()}
+    actions = {name: rule["action"] for name, rule in rules.items() if rule.get("action")}
+    for name, action in actions.items():
+        if action not in RULE_ACTIONS:
+            raise ValueError(f"Unknown action {action!r} for error category {name!r}")
+    return categories, actions
+
+
+def get_error_string(torrent: Torrent, error_strings: Mapping[int, str] | None = None) -> str:
+    """Get the error message of a torrent, or an empty string if it has none.
+
+    Args:
+        torrent: Torrent to check
+        error_strings: Optional error messages by torrent ID (e.g. from get_tracker_errors),
+                       used instead of the torrent-level error
+
+    Returns:
+        Error message, or an empty string
+    """
+    if error_strings is not None:
+        return error_strings.get(torrent.id, "")
+    return getattr(torrent, "error_string", "") or getattr(torrent, "error", "")
+
+
+def load_tracker_state(state_file: str) -> dict[str, dict[str, list[int]]]:
+    """Load consecutive tracker failure counts saved by a previous run.
+
+    Args:
+        state_file: Path to the JSON state file
+
+    Returns:
+        Mapping of info hash to {announce URL: [consecutive failures, last announce time]};
+        empty if the file does not exist yet
+    """
+    try:
+        with open(state_file, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_tracker_state(state_file: str, state: Mapping[str, Mapping[str, list[int]]]) -> None:
+    """Save consecutive tracker failure counts for the next run.
+
+    Args:
+        state_file: Path to the JSON state file
+        state: State as returned by load_tracker_state and updated by get_tracker_errors
+    """
+    with open(state_file, "w") as f:
+        json.dump(state, f)
+
+
+def get_tracker_errors(
+    torrents: list[Torrent],
+    min_failures: int = 1,
+    state: dict[str, dict[str, list[int]]] | None = None,
+) -> dict[int, str]:
+    """Find torrents whose trackers all fail to announce, using per-tracker stats.
+
+    Unlike the torrent-level error, which Transmission clears after one good announce on
+    another tracker and also sets for local errors, this looks at every primary tracker's
+    last announce. Backup trackers and trackers that never announced are ignored.
+
+    Only the trackerStats field is needed, so all torrents are evaluated from a single
+    projected torrent-get.
+
+    Args:
+        torrents: List of torrents to check, fetched with trackerStats
+        min_failures: Consecutive failed announces required on every tracker
+        state: Optional failure counts from previous runs, updated in place. Without it,
+               each failing tracker counts as one failure.
+
+    Returns:
+        Mapping of torrent ID to the last announce result of its first failing tracker
+    """
+    errors: dict[int, str] = {}
+
+    for torrent in torrents:
+        trackers = [ts for ts in torrent.tracker_stats if ts.has_announced and not ts.is_backup]
+        if not trackers:
+            continue
+
+        torrent_state = state.setdefault(torrent.hash_string, {}) if state is not None else None
+        failures: list[int] = []
+        for ts in trackers:
+            count = 0 if ts.last_announce_succeeded else 1
+            if torrent_state is not None:
+                previous, last_time = torrent_state.get(ts.announce, [0, 0])
+                if ts.last_announce_time == last_time:
+                    # No new announce since the last run
+                    count = previous
+                elif not ts.last_announce_succeeded:
+                    count = previous + 1
+                torrent_state[ts.announce] = [count, ts.last_announce_time]
+            failures.append(count)
+
+        if min(failures) >= min_failures:
+            errors[torrent.id] = trackers[0].last_announce_result
+
+    return errors
+
+
+def classify_torrents(
+    torrents: list[Torrent],
+    classifier: ErrorClassifier,
+    error_strings: Mapping[int, str] | None = None,
+) -> list[tuple[Torrent, str]]:
+    """Tag every errored torrent with its error category in a single pass.
+
+    Args:
+        torrents: List of torrents to check
+        classifier: Compiled error classifier
+        error_strings: Optional error messages by torrent ID, used instead of the torrent-level error
+
+    Returns:
+        List of (torrent, category) for torrents with errors; unmatched errors are tagged OTHER_CATEGORY
+    """
+    classified: list[tuple[Torrent, str]] = []
+
+    for torrent in sorted(torrents, key=lambda t: t.name):
+        error_string = get_error_string(torrent, error_strings)
+        if error_string:
+            classified.append((torrent, classifier.classify(error_string) or OTHER_CATEGORY))
+
+    return classified
 
 
 def get_torrents_with_errors(
     torrents: list[Torrent],
     error_pattern: str | None = None,
+    error_strings: Mapping[int, str] | None = None,
 ) -> list[Torrent]:
     """Find torrents with error status.
 
     Args:
         torrents: List of torrents to check
         error_pattern: Optional pattern to match in error string (e.g., "Unregistered")
+        error_strings: Optional error messages by torrent ID, used instead of the torrent-level error
 
     Returns:
         List of torrents with errors matching the pattern (or any error if no pattern)
     """
+    # Compile the pattern once instead of lowercasing it for every torrent
+    classifier = ErrorClassifier({"match": [error_pattern]}) if error_pattern else None
     errored_torrents: list[Torrent] = []
 
     for torrent in sorted(torrents, key=lambda t: t.name):
-        # Check if torrent has an error
-        error_string = getattr(torrent, "error_string", "") or getattr(torrent, "error", "")
+        error_string = get_error_string(torrent, error_strings)
 
-        if error_string:
-            # If pattern provided, check if it matches
-            if error_pattern:
-                if error_pattern.lower() in error_string.lower():
-                    errored_torrents.append(torrent)
-            else:
-                # No pattern - include all errors
-                errored_torrents.append(torrent)
+        # No pattern - include all errors
+        if error_string and (classifier is None or classifier.classify(error_string)):
+            errored_torrents.append(torrent)
 
     return errored_torrents
 
 
-def check_cross_seeding(client: Client, torrent: Torrent) -> list[Torrent]:
+# Files smaller than this are not matched by signature, so that small extras with common
+# names (cover.jpg, info.nfo) do not mark unrelated torrents as cross-seeds
+SIGNATURE_MIN_SIZE = 1024 * 1024
+
+
+def get_name_tail(file_name: str) -> str:
+    """Get a torrent file's name without its top-level folder.
+
+    Args:
+        file_name: File name relative to the download directory
+
+    Returns:
+        The name below the torrent's top-level folder, or the name itself for single-file torrents
+    """
+    _, _, tail = file_name.partition("/")
+    return tail or file_name
+
+
+class CrossSeedIndex:
+    """Index of torrent files, built once over all torrents.
+
+    Files are indexed by absolute path and, depending on ``match``, by signature
+    (size and name below the top-level folder) and by inode. Signatures catch
+    cross-seeds relocated to another download dir or renamed top-level folder;
+    inodes catch hardlinked copies with unrelated names.
+
+    Looking up a torrent only costs as much as its own file list, instead of
+    re-fetching and scanning every other torrent.
+    """
+
+    def __init__(self, torrents: Iterable[Torrent], match: str = "path"):
+        self.match_signatures = match in ("signature", "inode")
+        self.match_inodes = match == "inode"
+        self._files: dict[tuple[object, ...], list[Torrent]] = defaultdict(list)
+        for torrent in torrents:
+            for key in self._keys(torrent):
+                self._files[key].append(torrent)
+
+    def _keys(self, torrent: Torrent) -> Iterator[tuple[object, ...]]:
+        """Yield the index keys of every file in a torrent."""
+        download_dir = pathlib.Path(torrent.download_dir)
+        for file in torrent.get_files():
+            file_path = download_dir / file.name
+            yield ("path", file_path)
+            if self.match_signatures and file.size >= SIGNATURE_MIN_SIZE:
+                yield ("signature", file.size, get_name_tail(file.name))
+            if self.match_inodes:
+                try:
+                    st = file_path.stat()
+                except OSError:
+                    continue
+                yield ("inode", st.st_dev, st.st_ino)
+
+    def find(self, torrent: Torrent) -> list[Torrent]:
+        """Find other torrents sharing files with a torrent.
+
+        Args:
+            torrent: Torrent to check for cross-seeding
+
+        Returns:
+            List of other torrents that share files with this torrent
+        """
+        cross_seeders: dict[int, Torrent] = {}
+        for key in self._keys(torrent):
+            for other in self._files.get(key, ()):
+                if other.id != torrent.id:
+                    cross_seeders.setdefault(other.id, other)
+        return list(cross_seeders.values())
+
+
+def check_cross_seeding(client: TorrentClient, torrent: Torrent) -> list[Torrent]:
     """Check if a torrent's files are cross-seeded by other torrents.
 
     Args:
@@ -72,7 +408,7 @@ def check_cross_seeding(client: Client, torrent: Torrent) -> list[Torrent]:
     return cross_seeders
 
 
-def is_cross_seeded(client: Client, torrent: Torrent) -> bool:
+def is_cross_seeded(client: TorrentClient, torrent: Torrent) -> bool:
     """Check if a torrent is cross-seeded by any other torrent.
 
     Args:
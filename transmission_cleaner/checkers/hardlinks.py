@@ -1,45 +1,289 @@
 """Hardlink detection for torrent files."""
 
+import itertools
+import math
 import pathlib
+import random
+from collections.abc import Iterator, Mapping, Sequence
 
-from transmission_rpc import Torrent
+from transmission_rpc import File, Torrent
 
+from transmission_cleaner.deadline import Deadline, largest_first
+from transmission_cleaner.fsstat import DirStat, StatResult, stat_paths
 
-def is_hardlink(path: pathlib.Path) -> bool:
+# With sampling, the largest files of a torrent are always checked: media managers import
+# the main files, and those hold most of the space a deletion would free
+SAMPLE_LARGEST = 10
+# The random sample is sized to detect a torrent with at least this fraction of its files hardlinked
+SAMPLE_LINKED_FRACTION = 0.1
+# With a deadline, torrents are checked in batches of this many (stat-ed together when
+# scheduled), and the deadline is checked between batches
+DEADLINE_BATCH_SIZE = 100
+
+
+def is_hardlink(path: pathlib.Path, dir_stat: DirStat | None = None) -> bool:
     """Check if a file has multiple hardlinks.
 
     Args:
-        path: Path to the file to check
+        path: Path to the file to check (a symlink is checked itself, not its target)
+        dir_stat: Optional DirStat to stat the file through its open directory
 
     Returns:
         True if the file has more than one hardlink, False otherwise
     """
-    return path.stat().st_nlink > 1
+    st = dir_stat.stat(path) if dir_stat is not None else path.lstat()
+    return st.st_nlink > 1
+
+
+def get_downloaded_files(torrent: Torrent) -> list[File]:
+    """Get the files of a torrent that have downloaded data, sorted by name.
+
+    Files without completed bytes (deselected, or not downloaded yet) have nothing on disk
+    that could be hardlinked, so they are skipped without a stat.
+
+    Args:
+        torrent: Torrent with its file list
+
+    Returns:
+        Files with at least one completed byte
+    """
+    return sorted(file for file in torrent.get_files() if file.completed > 0)
+
+
+def is_missing_expected(file: File) -> bool:
+    """Whether a file may legitimately be missing from the download directory.
+
+    Incomplete files may be kept under a .part name or in the incomplete directory, so only
+    a missing complete file means the torrent's data is gone.
+    """
+    return file.completed < file.size
+
+
+def _batches(torrents: list[Torrent], deadline: Deadline | None, size: int) -> Iterator[list[Torrent]]:
+    """Split torrents into batches, stopping once the deadline is reached.
+
+    Without a deadline, all torrents form a single batch.
+    """
+    if deadline is None:
+        yield torrents
+        return
+    for start in range(0, len(torrents), size):
+        if deadline.reached():
+            print(f"[WARN]   Runtime limit reached, {len(torrents) - start} of {len(torrents)} torrents left unchecked")
+            return
+        yield torrents[start : start + size]
 
 
-def get_torrents_without_hardlinks(torrents: list[Torrent]) -> list[Torrent]:
+def get_torrents_without_hardlinks(
+    torrents: list[Torrent],
+    schedule: str | None = None,
+    deadline: Deadline | None = None,
+) -> list[Torrent]:
     """Find torrents that have no hardlinked files.
 
     Args:
         torrents: List of torrents to check
+        schedule: How files are stat-ed - None: torrent by torrent, stopping at the first hardlink |
+                  "directory": all files up front, grouped by device and directory |
+                  "inode": like "directory", in inode order within each directory (best for spinning disks)
+        deadline: Stop checking once reached; torrents are then checked largest first, so the
+                  ones left unchecked are the smallest
 
     Returns:
-        List of torrents where none of the files have hardlinks
+        List of torrents where at least one file was found on disk and none of the files have
+        hardlinks, sorted by name, or largest first with a deadline. Torrents with nothing
+        to check (no downloaded data yet, or only incomplete files kept elsewhere) are
+        never returned.
     """
+    torrents = largest_first(torrents) if deadline is not None else sorted(torrents, key=lambda t: t.name)
+    if schedule is not None:
+        return _get_torrents_without_hardlinks_scheduled(torrents, schedule == "inode", deadline)
+
+    without_hardlinks: list[Torrent] = []
+
+    with DirStat() as dir_stat:
+        for torrent in itertools.chain.from_iterable(_batches(torrents, deadline, 1)):
+            checked = False
+            # Largest first: imported media is the most likely to be linked, ending the check early
+            for file in sorted(get_downloaded_files(torrent), key=lambda file: file.size, reverse=True):
+                file_path = pathlib.Path(torrent.download_dir) / file.name
+                try:
+                    if is_hardlink(file_path, dir_stat):
+                        break
+                except FileNotFoundError:
+                    if is_missing_expected(file):
+                        continue
+                    print(f"[ERROR]  File not found: {file_path}")
+                    break
+                checked = True
+            else:
+                if checked:
+                    without_hardlinks.append(torrent)
+    return without_hardlinks
+
+
+def _get_torrents_without_hardlinks_scheduled(
+    torrents: list[Torrent],
+    inode_order: bool,
+    deadline: Deadline | None = None,
+) -> list[Torrent]:
+    """Same as get_torrents_without_hardlinks, with files stat-ed up front by stat_paths, a batch at a time."""
     without_hardlinks: list[Torrent] = []
+    for batch in _batches(torrents, deadline, DEADLINE_BATCH_SIZE):
+        paths = (
+            pathlib.Path(torrent.download_dir) / file.name
+            for torrent in batch
+            for file in get_downloaded_files(torrent)
+        )
+        without_hardlinks += get_torrents_without_hardlinks_from_stats(batch, stat_paths(paths, inode_order))
+    return largest_first(without_hardlinks) if deadline is not None else without_hardlinks
+
+
+def get_torrents_without_hardlinks_from_stats(
+    torrents: list[Torrent],
+    stats: Mapping[pathlib.Path, StatResult],
+) -> list[Torrent]:
+    """Find torrents that have no hardlinked files, from already collected stat results.
+
+    Args:
+        torrents: List of torrents to check
+        stats: Stat result (or error) of the downloaded files of the torrents, e.g. from stat_paths;
+               files without a result (e.g. not sampled) are not checked
 
+    Returns:
+        List of torrents where at least one file was found on disk and none of the files have
+        hardlinks
+    """
+    without_hardlinks: list[Torrent] = []
     for torrent in sorted(torrents, key=lambda t: t.name):
-        has_hardlink = False
-        for file in sorted(torrent.get_files()):
+        checked = False
+        for file in get_downloaded_files(torrent):
             file_path = pathlib.Path(torrent.download_dir) / file.name
-            try:
-                if is_hardlink(file_path):
-                    has_hardlink = True
-                    break
-            except FileNotFoundError:
+            result = stats.get(file_path)
+            if result is None:
+                continue
+            if isinstance(result, FileNotFoundError):
+                if is_missing_expected(file):
+                    continue
                 print(f"[ERROR]  File not found: {file_path}")
                 break
+            if isinstance(result, OSError):
+                raise result
+            if result.st_nlink > 1:
+                break
+            checked = True
         else:
-            if not has_hardlink:
+            if checked:
                 without_hardlinks.append(torrent)
     return without_hardlinks
+
+
+def get_sample_size(confidence: float) -> int:
+    """Number of randomly chosen files to check for a given confidence.
+
+    If a fraction f of a torrent's files are hardlinked, a random sample of n files misses
+    all of them with probability (1 - f)^n. The size is chosen so that, for f of
+    SAMPLE_LINKED_FRACTION, this is at most 1 - confidence.
+
+    Args:
+        confidence: Probability of detecting such a torrent, from 0 up to but excluding 1
+
+    Returns:
+        Sample size
+    """
+    return math.ceil(math.log(1 - confidence) / math.log(1 - SAMPLE_LINKED_FRACTION))
+
+
+def sample_files(files: Sequence[File], confidence: float, rng: random.Random) -> list[File]:
+    """Choose the files of a torrent to check: the largest ones plus a random sample of the rest.
+
+    Args:
+        files: Torrent files
+        confidence: Confidence passed to get_sample_size; 1 checks every file
+        rng: Random number generator
+
+    Returns:
+        Files to check, every file if the torrent is small enough
+    """
+    by_size = sorted(files, key=lambda file: file.size, reverse=True)
+    largest, rest = by_size[:SAMPLE_LARGEST], by_size[SAMPLE_LARGEST:]
+    if confidence >= 1 or len(rest) <= get_sample_size(confidence):
+        return by_size
+    return largest + rng.sample(rest, get_sample_size(confidence))
+
+
+def get_torrents_likely_without_hardlinks(
+    torrents: list[Torrent],
+    confidence: float,
+    schedule: str | None = None,
+    rng: random.Random | None = None,
+    deadline: Deadline | None = None,
+) -> list[Torrent]:
+    """Find torrents that probably have no hardlinked files, checking only a sample of their files.
+
+    Selected torrents should be verified with get_torrents_without_hardlinks before anything
+    is deleted.
+
+    Args:
+        torrents: List of torrents to check
+        confidence: Confidence passed to get_sample_size
+        schedule: How the sampled files are stat-ed, as for get_torrents_without_hardlinks
+        rng: Random number generator (default: a new, randomly seeded one)
+        deadline: Stop checking once reached, as for get_torrents_without_hardlinks
+
+    Returns:
+        List of torrents where at least one sampled file was found on disk and none of the
+        sampled files have hardlinks
+    """
+    rng = rng or random.Random()
+    torrents = largest_first(torrents) if deadline is not None else sorted(torrents, key=lambda t: t.name)
+    likely_without_hardlinks: list[Torrent] = []
+    # Sampled torrents are quick to check, so the deadline is only checked between batches
+    for batch in _batches(torrents, deadline, DEADLINE_BATCH_SIZE):
+        likely_without_hardlinks += _check_samples(batch, confidence, schedule, rng)
+    return likely_without_hardlinks
+
+
+def _check_samples(
+    torrents: list[Torrent], confidence: float, schedule: str | None, rng: random.Random
+) -> list[Torrent]:
+    """Check a sample of the files of each torrent, for get_torrents_likely_without_hardlinks."""
+    samples = [
+        (
+            torrent,
+            [
+                (pathlib.Path(torrent.download_dir) / file.name, file)
+                for file in sample_files(get_downloaded_files(torrent), confidence, rng)
+            ],
+        )
+        for torrent in torrents
+    ]
+    stats = None
+    if schedule is not None:
+        stats = stat_paths((path for _, files in samples for path, _ in files), schedule == "inode")
+
+    likely_without_hardlinks: list[Torrent] = []
+    with DirStat() as dir_stat:
+        for torrent, files in samples:
+            checked = False
+            for file_path, file in files:
+                try:
+                    if stats is not None:
+                        result = stats[file_path]
+                        if isinstance(result, OSError):
+                            raise result
+                        linked = result.st_nlink > 1
+                    else:
+                        linked = is_hardlink(file_path, dir_stat)
+                except FileNotFoundError:
+                    if is_missing_expected(file):
+                        continue
+                    print(f"[ERROR]  File not found: {file_path}")
+                    break
+                if linked:
+                    break
+                checked = True
+            else:
+                if checked:
+                    likely_without_hardlinks.append(torrent)
+    return likely_without_hardlinks
@@ -2,8 +2,107 @@
 
 import os
 import pathlib
+import time
+from collections.abc import Container, Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 
-from transmission_rpc import Client
+from transmission_rpc import Torrent
+
+from transmission_cleaner.client import TorrentClient
+from transmission_cleaner.exclusions import ExclusionRules, create_exclusions
+from transmission_cleaner.extsort import ExternalSorter
+from transmission_cleaner.fsstat import DirStat
+from transmission_cleaner.sharding import in_shard
+
+# Torrent fields read by iter_tracked_files
+TRACKED_FILE_FIELDS = ["id", "hashString", "name", "downloadDir", "files", "priorities", "wanted"]
+
+
+def _get_directory_ids(directories: Iterable[pathlib.Path]) -> set[tuple[int, int]]:
+    """(device, inode) of each existing directory."""
+    ids = set()
+    for directory in directories:
+        try:
+            st = os.stat(directory)
+        except OSError:
+            continue
+        ids.add((st.st_dev, st.st_ino))
+    return ids
+
+
+def iter_directory(
+    directory: pathlib.Path,
+    include_hidden: bool = False,
+    exclusions: ExclusionRules | None = None,
+    min_age: float | None = None,
+    skip_dirs: Iterable[pathlib.Path] = (),
+    shard: tuple[int, int] | None = None,
+) -> Iterator[tuple[pathlib.Path, int]]:
+    """Walk a directory and yield every file with its size.
+
+    The size comes from the same lstat that is needed to skip symlinks, so callers never
+    have to stat scanned files again. Excluded directories are pruned without being listed.
+
+    Args:
+        directory: Directory path to scan
+        include_hidden: Whether to include hidden files (files starting with .), when no
+                        exclusions are given
+        exclusions: Rules for the entries to skip (default: create_exclusions(include_hidden))
+        min_age: Skip files modified less than this many seconds ago
+        skip_dirs: Directories to prune wherever they are found (e.g. the daemon's incomplete directory)
+        shard: (shard index, shard count) - only scan the top-level entries assigned to this
+               shard by name, so every entry is scanned by exactly one shard
+
+    Yields:
+        Tuples of (file path, size in bytes)
+    """
+    if exclusions is None:
+        exclusions = create_exclusions(include_hidden)
+    cutoff = time.time() - min_age if min_age else None
+    skip_ids = _get_directory_ids(skip_dirs)
+    skip_inodes = {inode for _, inode in skip_ids}
+
+    # (path, path relative to the root with "/" separators)
+    stack = [(os.fspath(directory), "")]
+    # Directories are listed through open descriptors, so entry.stat() resolves one name
+    # instead of the full path, and subdirectories are opened relative to their parent
+    with DirStat() as dir_stat:
+        while stack:
+            current, relative = stack.pop()
+            try:
+                with dir_stat.scandir(current) as entries:
+                    for entry in entries:
+                        entry_path = os.path.join(current, entry.name)
+                        entry_relative = f"{relative}/{entry.name}" if relative else entry.name
+                        if shard is not None and not relative and not in_shard(entry.name, shard):
+                            continue
+                        # Don't follow symlinked directories to prevent scanning outside the directory
+                        if entry.is_dir(follow_symlinks=False):
+                            if exclusions.excludes(entry_relative, is_dir=True):
+                                continue
+                            # The inode comes with the listing; only candidates are stat-ed for their device
+                            if entry.inode() in skip_inodes:
+                                st = entry.stat(follow_symlinks=False)
+                                if (st.st_dev, st.st_ino) in skip_ids:
+                                    continue
+                            stack.append((entry_path, entry_relative))
+                            continue
+
+                        # Skip symlinks to prevent scanning outside directory
+                        if entry.is_symlink() or exclusions.excludes(entry_relative):
+                            continue
+
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        if cutoff is not None and st.st_mtime > cutoff:
+                            # Possibly still being written or moved into place
+                            continue
+                        yield pathlib.Path(entry_path), st.st_size
+            except OSError:
+                # Unreadable directory, same as os.walk without onerror
+                continue
 
 
 def scan_directory(
@@ -19,39 +118,10 @@ def scan_directory(
     Returns:
         List of file paths found in the directory and subdirectories
     """
-    files: list[pathlib.Path] = []
-
-    # System files to always exclude
-    system_files = {".DS_Store", "Thumbs.db", "desktop.ini", ".directory"}
-
-    # Recursively walk the directory (don't follow symlinks)
-    for root, dirs, filenames in os.walk(directory, followlinks=False):
-        root_path = pathlib.Path(root)
-
-        # Remove symlink directories from dirs to prevent descending into them
-        dirs[:] = [d for d in dirs if not (root_path / d).is_symlink()]
-
-        for filename in filenames:
-            item = root_path / filename
-
-            if (
-                # Skip symlinks to prevent scanning outside directory
-                item.is_symlink()
-                # Skip system files
-                or filename in system_files
-                # Skip torrent files (case-insensitive)
-                or item.suffix.lower() == ".torrent"
-                # Skip hidden files unless explicitly included
-                or (not include_hidden and filename.startswith("."))
-            ):
-                continue
-
-            files.append(item)
+    return [file_path for file_path, _ in iter_directory(directory, include_hidden)]
 
-    return files
 
-
-def get_tracked_files(client: Client) -> set[pathlib.Path]:
+def get_tracked_files(client: TorrentClient) -> set[pathlib.Path]:
     """Get all files tracked by torrents in the Transmission client.
 
     Args:
@@ -60,34 +130,124 @@ def get_tracked_files(client: Client) -> set[pathlib.Path]:
     Returns:
         Set of file paths tracked by at least one torrent
     """
-    tracked: set[pathlib.Path] = set()
+    return get_tracked_files_from_torrents(client.get_torrents())
+
 
-    # Get all torrents
-    torrents = client.get_torrents()
+def iter_tracked_files(torrents: Iterable[Torrent]) -> Iterator[pathlib.Path]:
+    """Yield the resolved path of every file of already fetched torrents.
 
-    # Collect all files from all torrents
+    Deselected files without downloaded data are not tracked, so a leftover file at their
+    path counts as orphaned. Incomplete files are tracked under their .part name as well.
+
+    Args:
+        torrents: Torrents to collect files from
+
+    Yields:
+        File paths, possibly repeated when torrents share files
+    """
     for torrent in torrents:
         for file in torrent.get_files():
+            if not file.selected and file.completed == 0:
+                continue
             file_path = pathlib.Path(torrent.download_dir) / file.name
             # Resolve to absolute path for consistent comparison
             try:
-                tracked.add(file_path.resolve())
+                file_path = file_path.resolve()
             except (OSError, RuntimeError):
                 # Handle broken symlinks or permission issues
-                tracked.add(file_path)
+                pass
+            yield file_path
+            if file.completed < file.size:
+                yield file_path.with_name(file_path.name + ".part")
+
+
+def get_tracked_files_from_torrents(torrents: Iterable[Torrent]) -> set[pathlib.Path]:
+    """Get all files tracked by already fetched torrents.
+
+    Args:
+        torrents: Torrents to collect files from
+
+    Returns:
+        Set of file paths tracked by at least one torrent
+    """
+    return set(iter_tracked_files(torrents))
+
+
+def get_download_roots(torrents: Iterable[Torrent]) -> list[pathlib.Path]:
+    """Derive the directories to scan from the torrents' download directories.
+
+    Nested roots are collapsed into their parent, and roots that are the same physical
+    directory under different paths (bind mounts, symlinks) are only kept once.
+
+    Args:
+        torrents: Torrents to take download directories from
+
+    Returns:
+        Sorted list of roots, none of which contains another
+    """
+    candidates: set[pathlib.Path] = set()
+    for download_dir in {torrent.download_dir for torrent in torrents}:
+        try:
+            candidates.add(pathlib.Path(download_dir).resolve(strict=True))
+        except (OSError, RuntimeError):
+            print(f"[WARN]   Download directory not found: {download_dir}")
+
+    roots: list[pathlib.Path] = []
+    seen: set[tuple[int, int]] = set()
+    # Shortest first, so parents are kept before their children are considered
+    for candidate in sorted(candidates, key=lambda p: (len(p.parts), p)):
+        if any(root in candidate.parents for root in roots):
+            continue
+        st = candidate.stat()
+        if (st.st_dev, st.st_ino) in seen:
+            continue
+        seen.add((st.st_dev, st.st_ino))
+        roots.append(candidate)
+
+    return sorted(roots)
+
+
+def scan_roots(
+    roots: Sequence[pathlib.Path],
+    include_hidden: bool = False,
+    exclusions: ExclusionRules | None = None,
+    min_age: float | None = None,
+    skip_dirs: Sequence[pathlib.Path] = (),
+    shard: tuple[int, int] | None = None,
+) -> dict[pathlib.Path, int]:
+    """Scan several directories in parallel.
+
+    Args:
+        roots: Directories to scan, none containing another
+        include_hidden: Whether to include hidden files (files starting with .), when no exclusions are given
+        exclusions: Rules for the entries to skip, as for iter_directory
+        min_age: Skip files modified less than this many seconds ago
+        skip_dirs: Directories to prune wherever they are found
+        shard: Only scan the top-level entries of this shard, as for iter_directory
 
-    return tracked
+    Returns:
+        Mapping of every scanned file to its size
+    """
+    if exclusions is None:
+        exclusions = create_exclusions(include_hidden)
+
+    def scan(root: pathlib.Path) -> list[tuple[pathlib.Path, int]]:
+        return list(iter_directory(root, exclusions=exclusions, min_age=min_age, skip_dirs=skip_dirs, shard=shard))
+
+    with ThreadPoolExecutor(max_workers=max(len(roots), 1)) as executor:
+        results = executor.map(scan, roots)
+        return {file_path: size for files in results for file_path, size in files}
 
 
 def find_orphaned_files(
     scanned_files: list[pathlib.Path],
-    tracked_files: set[pathlib.Path],
+    tracked_files: Container[pathlib.Path],
 ) -> list[pathlib.Path]:
     """Find files that are not tracked by any torrent.
 
     Args:
         scanned_files: List of files found in directory scan
-        tracked_files: Set of files tracked by torrents
+        tracked_files: Files tracked by torrents, as a set or a PathIndex
 
     Returns:
         List of orphaned files (in scanned but not in tracked)
@@ -106,3 +266,52 @@ def find_orphaned_files(
             orphaned.append(file_path)
 
     return orphaned
+
+
+def find_orphaned_files_external(
+    scanned_files: Iterable[tuple[pathlib.Path, int]],
+    tracked_files: Iterable[pathlib.Path],
+    memory_limit: int,
+    spill_dir: str | None = None,
+) -> Iterator[tuple[pathlib.Path, int]]:
+    """Find untracked files with a sort-merge join through run files on disk.
+
+    Both sides are streamed into external sorters keyed by the resolved path, then merged, so
+    memory stays bounded by memory_limit however many files there are. The tracked side is
+    consumed in a background thread, so a network-bound fetch overlaps the disk-bound scan.
+
+    Args:
+        scanned_files: (path, size) of scanned files, e.g. from iter_directory
+        tracked_files: Resolved paths of tracked files, e.g. from iter_tracked_files
+        memory_limit: Bytes of records buffered in memory, shared by both sides
+        spill_dir: Directory for the run files (default: the system temporary directory)
+
+    Yields:
+        (path, size) of orphaned files, ordered by resolved path
+    """
+    with (
+        ExternalSorter(3, memory_limit // 2, spill_dir) as scanned,
+        ExternalSorter(1, memory_limit // 2, spill_dir) as tracked,
+    ):
+
+        def add_tracked() -> None:
+            for file_path in tracked_files:
+                tracked.add((os.fsencode(file_path),))
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            tracked_future = executor.submit(add_tracked)
+            for file_path, size in scanned_files:
+                try:
+                    resolved_path = file_path.resolve()
+                except (OSError, RuntimeError):
+                    resolved_path = file_path
+                scanned.add((os.fsencode(resolved_path), os.fsencode(file_path), b"%d" % size))
+            tracked_future.result()
+
+        tracked_keys = iter(tracked)
+        current = next(tracked_keys, None)
+        for key, file_path, size in scanned:
+            while current is not None and current[0] < key:
+                current = next(tracked_keys, None)
+            if current is None or current[0] != key:
+                yield pathlib.Path(os.fsdecode(file_path)), int(size)
@@ -0,0 +1,241 @@
+"""Checker plugin interface and a shared pipeline running several checkers in one pass."""
+
+import abc
+import pathlib
+import random
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from importlib.metadata import entry_points
+
+from transmission_rpc import Torrent
+
+from transmission_cleaner.checkers.errors import get_torrents_with_errors
+from transmission_cleaner.checkers.hardlinks import (
+    DEADLINE_BATCH_SIZE,
+    get_downloaded_files,
+    get_torrents_without_hardlinks_from_stats,
+    sample_files,
+)
+from transmission_cleaner.client import TorrentClient
+from transmission_cleaner.deadline import Deadline, largest_first
+from transmission_cleaner.fsstat import StatResult, stat_paths
+
+# Phases in the order they run; each includes the ones before it
+PHASES = ["metadata", "files", "stat"]
+
+# Fields used by the filters and actions, fetched for every checker
+BASE_FIELDS = ["id", "hashString", "name", "status", "downloadDir", "trackers", "secondsSeeding", "totalSize"]
+FILE_FIELDS = ["files", "priorities", "wanted"]
+
+ENTRY_POINT_GROUP = "transmission_cleaner.checkers"
+
+
+class CheckContext:
+    """Facts gathered once by the pipeline and shared by every checker."""
+
+    def __init__(self, all_torrents: Sequence[Torrent], stats: Mapping[pathlib.Path, StatResult]):
+        # Every torrent, before filtering (e.g. for cross-seed lookups)
+        self.all_torrents = all_torrents
+        # Stat result of every downloaded file of the filtered torrents, when a checker needs the
+        # stat phase; only of the sampled files when sampling
+        self.stats = stats
+
+
+class Checker(abc.ABC):
+    """Base class for checkers run by the pipeline.
+
+    Subclasses set a unique name, the torrent fields they read and the latest phase they need:
+    "metadata" (torrent fields only), "files" (file lists) or "stat" (file lists plus a stat of
+    every file, available as context.stats). Checkers run one after another, on the results
+    gathered once for all of them.
+    """
+
+    name: str = ""
+    description: str = ""
+    fields: Sequence[str] = ()
+    phase: str = "metadata"
+
+    @abc.abstractmethod
+    def check(self, torrents: Sequence[Torrent], context: CheckContext) -> list[Torrent]:
+        """Select the torrents this checker flags.
+
+        Args:
+            torrents: Filtered torrents
+            context: Shared facts
+
+        Returns:
+            Flagged torrents
+        """
+
+
+CHECKERS: dict[str, type[Checker]] = {}
+
+
+def register_checker(checker: type[Checker]) -> type[Checker]:
+    """Register a checker class under its name; usable as a class decorator.
+
+    Args:
+        checker: Checker subclass
+
+    Returns:
+        The same class
+
+    Raises:
+        ValueError: If the phase is unknown
+    """
+    if checker.phase not in PHASES:
+        raise ValueError(f"Checker {checker.name!r} has unknown phase {checker.phase!r}")
+    CHECKERS[checker.name] = checker
+    return checker
+
+
+def load_plugins() -> None:
+    """Register checkers installed by other packages under the transmission_cleaner.checkers entry point."""
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            register_checker(entry_point.load())
+        except (ImportError, AttributeError, TypeError, ValueError) as e:
+            print(f"[WARN]   Cannot load checker plugin {entry_point.name}: {e}")
+
+
+@register_checker
+class HardlinksChecker(Checker):
+    """Torrents none of whose files have other hardlinks."""
+
+    name = "hardlinks"
+    description = "torrents without hardlinks"
+    fields = FILE_FIELDS
+    phase = "stat"
+
+    def check(self, torrents: Sequence[Torrent], context: CheckContext) -> list[Torrent]:
+        return get_torrents_without_hardlinks_from_stats(list(torrents), context.stats)
+
+
+@register_checker
+class ErrorsChecker(Checker):
+    """Torrents with an error."""
+
+    name = "errors"
+    description = "torrents with errors"
+    fields = ("error", "errorString")
+    phase = "metadata"
+
+    def check(self, torrents: Sequence[Torrent], context: CheckContext) -> list[Torrent]:
+        return get_torrents_with_errors(list(torrents))
+
+
+def get_required_fields(checkers: Iterable[Checker], extra: Iterable[str] = ()) -> list[str]:
+    """Collect the torrent fields needed by all checkers, without duplicates.
+
+    Args:
+        checkers: Active checkers
+        extra: Further fields needed by the caller
+
+    Returns:
+        Fields for a single torrent-get request
+    """
+    fields = list(BASE_FIELDS)
+    for checker in checkers:
+        fields.extend(checker.fields)
+        if PHASES.index(checker.phase) >= PHASES.index("files"):
+            fields.extend(FILE_FIELDS)
+    fields.extend(extra)
+    return list(dict.fromkeys(fields))
+
+
+def _stat_files(
+    torrents: Sequence[Torrent], sample: float | None = None, rng: random.Random | None = None
+) -> dict[pathlib.Path, StatResult]:
+    """Stat the downloaded files of torrents, or a sample of them, grouped by device and directory."""
+    rng = rng or random.Random()
+    # Files without downloaded data are not on disk, so they are not stat-ed
+    paths = [
+        pathlib.Path(t.download_dir) / file.name
+        for t in torrents
+        for file in (
+            sample_files(get_downloaded_files(t), sample, rng) if sample is not None else get_downloaded_files(t)
+        )
+    ]
+    return stat_paths(paths)
+
+
+def run_checkers(
+    client: TorrentClient,
+    checkers: Sequence[Checker],
+    filter_fn: Callable[[list[Torrent]], list[Torrent]] | None = None,
+    extra_fields: Iterable[str] = (),
+    sample: float | None = None,
+    deadline: Deadline | None = None,
+) -> tuple[list[Torrent], dict[str, list[Torrent]]]:
+    """Run several checkers over one fetch and at most one stat pass.
+
+    The fields of every checker are fetched in a single projected request. If any checker
+    needs the stat phase, all files of the filtered torrents are stat-ed once, ordered by
+    device and directory. The checkers then run one after another on the shared results:
+    they are CPU-bound Python, so threads would not run them in parallel, and the torrents
+    and stats they share would have to be copied to other processes.
+
+    Args:
+        client: Transmission RPC client
+        checkers: Checkers to run
+        filter_fn: Optional filter applied to the torrents before checking
+        extra_fields: Further torrent fields needed by the caller (e.g. for cross-seed checks)
+        sample: Only stat each torrent's largest files and a random sample of the rest, with
+                this confidence (see sample_files); verify the results with verify_checkers
+        deadline: Stop the stat pass once reached; torrents are then stat-ed largest first, and
+                  the ones left unchecked are not passed to any checker
+
+    Returns:
+        Every fetched torrent, and the flagged torrents by checker name
+    """
+    all_torrents = client.get_torrents(arguments=get_required_fields(checkers, extra_fields))
+    print(f"[INFO]   Found {len(all_torrents)} torrents")
+    torrents = filter_fn(all_torrents) if filter_fn else all_torrents
+
+    stats: dict[pathlib.Path, StatResult] = {}
+    if any(checker.phase == "stat" for checker in checkers):
+        if deadline is not None:
+            torrents = largest_first(torrents)
+        print(f"[INFO]   Checking the files of {len(torrents)} torrents{' (sampled)' if sample is not None else ''}")
+        rng = random.Random()
+        batch_size = DEADLINE_BATCH_SIZE if deadline is not None else max(len(torrents), 1)
+        checked: list[Torrent] = []
+        for start in range(0, len(torrents), batch_size):
+            if deadline is not None and deadline.reached():
+                print(
+                    f"[WARN]   Runtime limit reached, {len(torrents) - start} of {len(torrents)} torrents left unchecked"
+                )
+                break
+            batch = torrents[start : start + batch_size]
+            stats.update(_stat_files(batch, sample, rng))
+            checked += batch
+        torrents = checked
+
+    context = CheckContext(all_torrents, stats)
+    return all_torrents, {checker.name: checker.check(torrents, context) for checker in checkers}
+
+
+def verify_checkers(
+    checkers: Sequence[Checker], results: Mapping[str, Sequence[Torrent]], all_torrents: Sequence[Torrent]
+) -> dict[str, list[Torrent]]:
+    """Re-run the stat-phase checkers on every file of the torrents they flagged from a sample.
+
+    Sampling may miss the file that would clear a torrent, so flagged torrents are checked in
+    full before anything is deleted. Other checkers do not read stats and keep their results.
+
+    Args:
+        checkers: Checkers that were run
+        results: Flagged torrents by checker name, from run_checkers with a sample
+        all_torrents: Every fetched torrent, for the context
+
+    Returns:
+        Flagged torrents by checker name, with the stat-phase results verified
+    """
+    verified = {name: list(flagged) for name, flagged in results.items()}
+    for checker in checkers:
+        if checker.phase != "stat" or not results[checker.name]:
+            continue
+        flagged = list(results[checker.name])
+        confirmed = checker.check(flagged, CheckContext(all_torrents, _stat_files(flagged)))
+        print(f"[INFO]   Verified {len(confirmed)} of {len(flagged)} sampled {checker.description or checker.name}")
+        verified[checker.name] = confirmed
+    return verified
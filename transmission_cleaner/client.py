@@ -1,8 +1,59 @@
 """Transmission client configuration and connection management."""
 
 import json
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Protocol
 
-from transmission_rpc import Client
+from transmission_rpc import Client, Session, Torrent, TransmissionError
+
+# Torrent fields read by the filters, checkers and actions. Fetching only these instead of
+# every field keeps torrent-get responses small.
+TORRENT_FIELDS = [
+    "id",
+    "hashString",
+    "name",
+    "status",
+    "downloadDir",
+    "trackers",
+    "secondsSeeding",
+    "totalSize",
+    "addedDate",
+    "uploadRatio",
+    "error",
+    "errorString",
+    "files",
+    "priorities",
+    "wanted",
+]
+
+
+# Torrents per torrent-get when file lists are streamed instead of held in memory
+STREAM_CHUNK_SIZE = 500
+
+# Bounds of the adaptive torrent-get chunking
+MIN_CHUNK_SIZE = 50
+MAX_CHUNK_SIZE = 5000
+CHUNK_SIZE_STEP = 100
+MAX_REQUEST_DELAY = 5.0
+
+
+# Torrents to address, as accepted by transmission_rpc: one ID or hash, a list of them, or None for all
+TorrentIDs = int | str | list[int | str] | None
+
+
+class TorrentClient(Protocol):
+    """The part of transmission_rpc.Client used by the commands, implemented by every wrapper."""
+
+    def get_torrents(
+        self, ids: TorrentIDs = None, arguments: Iterable[str] | None = None, timeout: float | None = None
+    ) -> list[Torrent]: ...
+
+    def remove_torrent(self, ids: TorrentIDs, delete_data: bool = False, timeout: float | None = None) -> None: ...
+
+    def get_session(self, timeout: float | None = None) -> Session: ...
 
 
 def load_settings_from_file(settings_file: str, password: str) -> dict[str, str | int | None]:
@@ -73,3 +124,226 @@ def create_client(**config: str | int | None) -> Client:
         Configured Transmission RPC client
     """
     return Client(**config)
+
+
+def load_instances_file(instances_file: str) -> list[dict[str, str | int | None]]:
+    """Load the configuration of several Transmission instances from a JSON file.
+
+    The file holds a list of objects, each accepting the same keys as get_client_config
+    (settings_file, protocol, host, port, username, password, path).
+
+    Args:
+        instances_file: Path to the JSON file
+
+    Returns:
+        List of client configurations, one per instance
+    """
+    with open(instances_file, "r") as f:
+        instances = json.load(f)
+
+    return [get_client_config(**instance) for instance in instances]
+
+
+def create_clients(configs: Sequence[Mapping[str, str | int | None]]) -> list[Client]:
+    """Create one Transmission RPC client per configuration, connecting concurrently.
+
+    Args:
+        configs: Configuration parameters for each client
+
+    Returns:
+        List of clients, in the same order as configs
+    """
+    with ThreadPoolExecutor(max_workers=max(len(configs), 1)) as executor:
+        return list(executor.map(lambda config: create_client(**config), configs))
+
+
+class MultiClient:
+    """Several Transmission instances presented as a single client.
+
+    Torrents are fetched from all instances concurrently. Their IDs are remapped to
+    ``id * len(clients) + index`` so they are unique across instances and can be routed
+    back to the owning instance.
+    """
+
+    def __init__(self, clients: Sequence[TorrentClient]):
+        self.clients = list(clients)
+
+    def _split_ids(self, ids: TorrentIDs) -> dict[int, list[int | str]]:
+        """Group global torrent IDs by instance index, as local IDs."""
+        count = len(self.clients)
+        grouped: dict[int, list[int | str]] = defaultdict(list)
+        for torrent_id in ids if isinstance(ids, list) else [ids]:
+            if not isinstance(torrent_id, int):
+                raise TypeError(f"Torrents of several instances can only be addressed by ID, not {torrent_id!r}")
+            grouped[torrent_id % count].append(torrent_id // count)
+        return grouped
+
+    def get_torrents(
+        self,
+        ids: TorrentIDs = None,
+        arguments: Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> list[Torrent]:
+        """Get torrents from all instances, with globally unique IDs.
+
+        Args:
+            ids: Optional global torrent IDs to fetch
+            arguments: Optional torrent fields to fetch
+            timeout: Optional RPC timeout
+
+        Returns:
+            Torrents from all instances
+        """
+        count = len(self.clients)
+        arguments = list(arguments) if arguments else None
+        if ids is None:
+            requests: dict[int, list[int | str] | None] = dict.fromkeys(range(count))
+        else:
+            requests = dict(self._split_ids(ids))
+
+        def fetch(index: int) -> list[Torrent]:
+            return self.clients[index].get_torrents(ids=requests[index], arguments=arguments, timeout=timeout)
+
+        with ThreadPoolExecutor(max_workers=max(len(requests), 1)) as executor:
+            results = dict(zip(requests, executor.map(fetch, requests)))
+
+        return [
+            Torrent(fields={**torrent.fields, "id": torrent.id * count + index})
+            for index, torrents in results.items()
+            for torrent in torrents
+        ]
+
+    def remove_torrent(self, ids: TorrentIDs, delete_data: bool = False, timeout: float | None = None) -> None:
+        """Remove torrents from their owning instances.
+
+        Args:
+            ids: Global torrent ID or IDs
+            delete_data: Whether the daemon should delete the local data
+            timeout: Optional RPC timeout
+        """
+        for index, local_ids in self._split_ids(ids).items():
+            self.clients[index].remove_torrent(local_ids, delete_data=delete_data, timeout=timeout)
+
+    def get_session(self, timeout: float | None = None) -> Session:
+        """Refuse to merge the sessions of several daemons.
+
+        Raises:
+            RuntimeError: Always, sessions are read per instance through ``clients``
+        """
+        raise RuntimeError("Cannot read a single session of several Transmission instances")
+
+
+class RateLimitedClient:
+    """Client wrapper that splits torrent-get into ID chunks paced by the daemon's response time.
+
+    Transmission answers RPC on its single event loop, so one request for every torrent stalls
+    peers for as long as it takes to serve. The IDs are fetched first (a cheap request), then the
+    torrents chunk by chunk: the chunk size grows by CHUNK_SIZE_STEP while responses stay under
+    the target latency and halves when one exceeds it, and after a slow response the next request
+    waits at least as long as that response took, giving the daemon idle time to serve peers.
+    Other methods are passed through to the wrapped client.
+    """
+
+    def __init__(self, client: TorrentClient, target_latency: float = 0.5, chunk_size: int = 500):
+        self.client = client
+        self.target_latency = target_latency
+        self.chunk_size = min(max(chunk_size, MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+        self.delay = 0.0
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
+
+    def remove_torrent(self, ids: TorrentIDs, delete_data: bool = False, timeout: float | None = None) -> None:
+        """Remove torrents through the wrapped client."""
+        self.client.remove_torrent(ids, delete_data=delete_data, timeout=timeout)
+
+    def get_session(self, timeout: float | None = None) -> Session:
+        """Get the session of the wrapped client."""
+        return self.client.get_session(timeout=timeout)
+
+    def _adapt(self, latency: float) -> None:
+        """Adjust the chunk size and request spacing to the latency of the last request."""
+        if latency > self.target_latency:
+            self.chunk_size = max(self.chunk_size // 2, MIN_CHUNK_SIZE)
+            self.delay = min(max(latency, self.delay * 2), MAX_REQUEST_DELAY)
+        else:
+            self.chunk_size = min(self.chunk_size + CHUNK_SIZE_STEP, MAX_CHUNK_SIZE)
+            self.delay = self.delay / 2 if self.delay > 0.01 else 0.0
+
+    def get_torrents(
+        self,
+        ids: TorrentIDs = None,
+        arguments: Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> list[Torrent]:
+        """Get torrents in adaptively sized, spaced chunks.
+
+        Args:
+            ids: Optional torrent IDs or hashes to fetch (default: all torrents)
+            arguments: Optional torrent fields to fetch
+            timeout: Optional RPC timeout
+
+        Returns:
+            Torrents, in the order of the IDs
+        """
+        if ids is None:
+            ids = [torrent.id for torrent in self.client.get_torrents(arguments=["id"], timeout=timeout)]
+        elif isinstance(ids, (int, str)):
+            ids = [ids]
+        ids = list(ids)
+        arguments = list(arguments) if arguments else None
+
+        torrents: list[Torrent] = []
+        start = 0
+        while start < len(ids):
+            chunk = ids[start : start + self.chunk_size]
+            began = time.monotonic()
+            torrents.extend(self.client.get_torrents(ids=chunk, arguments=arguments, timeout=timeout))
+            self._adapt(time.monotonic() - began)
+            start += len(chunk)
+            if start < len(ids) and self.delay:
+                time.sleep(self.delay)
+        return torrents
+
+
+def iter_torrents(
+    client: TorrentClient, arguments: Iterable[str] | None = None, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[Torrent]:
+    """Fetch torrents chunk by chunk, so only one chunk is held in memory at a time.
+
+    The IDs are fetched first (a cheap request), then the torrents a chunk of IDs at a time.
+    Torrents removed in between are skipped.
+
+    Args:
+        client: Transmission client, wrapper or MultiClient
+        arguments: Optional torrent fields to fetch
+        chunk_size: Torrents fetched per request
+
+    Yields:
+        Torrents, in the order of their IDs
+    """
+    ids: list[int | str] = [torrent.id for torrent in client.get_torrents(arguments=["id"])]
+    for start in range(0, len(ids), chunk_size):
+        yield from client.get_torrents(ids=ids[start : start + chunk_size], arguments=arguments)
+
+
+def get_incomplete_dirs(client: TorrentClient) -> list[str]:
+    """Get the incomplete-download directories of the daemons behind a client.
+
+    Args:
+        client: Transmission client, wrapper or MultiClient
+
+    Returns:
+        The incomplete directory of every daemon that has one enabled
+    """
+    clients = getattr(client, "clients", None)
+    if isinstance(clients, list):
+        return [directory for c in clients for directory in get_incomplete_dirs(c)]
+    try:
+        fields = client.get_session().fields
+    except TransmissionError as e:
+        print(f"[WARN]   Cannot read the incomplete directory from the session: {e}")
+        return []
+    if fields.get("incomplete-dir-enabled") and fields.get("incomplete-dir"):
+        return [fields["incomplete-dir"]]
+    return []
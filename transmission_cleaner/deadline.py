@@ -0,0 +1,39 @@
+"""Time budgets for runs that must finish within a maintenance window."""
+
+import time
+from collections.abc import Iterable
+
+from transmission_rpc import Torrent
+
+
+class Deadline:
+    """Point in time after which no new work is started.
+
+    Measured on the monotonic clock, so changes to the system time don't move it.
+    """
+
+    def __init__(self, seconds: float):
+        self.expires = time.monotonic() + seconds
+
+    def reached(self) -> bool:
+        """Check whether the deadline has passed."""
+        return time.monotonic() >= self.expires
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, 0 once it has passed."""
+        return max(self.expires - time.monotonic(), 0.0)
+
+
+def largest_first(torrents: Iterable[Torrent]) -> list[Torrent]:
+    """Order torrents by the space deleting them would reclaim, largest first.
+
+    With a deadline, candidates are evaluated in this order, so a run cut short has still
+    checked the torrents worth the most space.
+
+    Args:
+        torrents: Torrents to order
+
+    Returns:
+        Torrents sorted by descending total size, then by name
+    """
+    return sorted(torrents, key=lambda t: (-t.total_size, t.name))
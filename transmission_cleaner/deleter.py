@@ -0,0 +1,115 @@
+"""Throttled, parallel deletion of local files."""
+
+import os
+import pathlib
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+
+class Throttle:
+    """Pace operations to a maximum rate of bytes and/or operations per second.
+
+    Each operation reserves the next free time slot, sized by whichever limit is stricter,
+    so the limits hold across all worker threads sharing the throttle.
+    """
+
+    def __init__(self, bytes_per_sec: int | None = None, ops_per_sec: float | None = None):
+        self.bytes_per_sec = bytes_per_sec
+        self.ops_per_sec = ops_per_sec
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self, nbytes: int = 0) -> None:
+        """Block until an operation of nbytes may run.
+
+        Args:
+            nbytes: Size of the operation in bytes
+        """
+        cost = 0.0
+        if self.bytes_per_sec:
+            cost = max(cost, nbytes / self.bytes_per_sec)
+        if self.ops_per_sec:
+            cost = max(cost, 1 / self.ops_per_sec)
+        if cost == 0:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot)
+            self._next_slot = start + cost
+
+        if start > now:
+            time.sleep(start - now)
+
+
+class DeletionResult(NamedTuple):
+    """Outcome of deleting a single file."""
+
+    path: pathlib.Path
+    size: int
+    error: OSError | None = None
+
+
+class LocalDeleter:
+    """Delete files with a pool of workers, optionally throttled."""
+
+    def __init__(self, workers: int = 4, bytes_per_sec: int | None = None, ops_per_sec: float | None = None):
+        self.workers = max(workers, 1)
+        self.throttle = Throttle(bytes_per_sec, ops_per_sec)
+
+    def _delete_one(self, path: pathlib.Path) -> DeletionResult:
+        try:
+            size = path.lstat().st_size
+            self.throttle.acquire(size)
+            path.unlink()
+        except OSError as e:
+            return DeletionResult(path, 0, e)
+        return DeletionResult(path, size)
+
+    def iter_delete(self, paths: Iterable[pathlib.Path]) -> Iterator[DeletionResult]:
+        """Delete files in parallel, yielding each result as soon as it and those before it are done.
+
+        Args:
+            paths: Files to delete
+
+        Yields:
+            One result per path, in the same order; size is 0 when deletion failed
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            yield from executor.map(self._delete_one, paths)
+
+    def delete(self, paths: Iterable[pathlib.Path]) -> list[DeletionResult]:
+        """Delete files in parallel.
+
+        Args:
+            paths: Files to delete
+
+        Returns:
+            One result per path, in the same order; size is 0 when deletion failed
+        """
+        return list(self.iter_delete(paths))
+
+
+def remove_empty_dirs(paths: Iterable[pathlib.Path], stop_at: pathlib.Path) -> None:
+    """Remove directories left empty after deleting files, up to but excluding stop_at.
+
+    Args:
+        paths: Deleted file paths
+        stop_at: Directory that is never removed (e.g. the torrent's download dir)
+    """
+    dirs: set[pathlib.Path] = set()
+    for path in paths:
+        for parent in path.parents:
+            if parent == stop_at or stop_at not in parent.parents:
+                break
+            dirs.add(parent)
+
+    # Deepest first so parents are empty by the time they are reached
+    for directory in sorted(dirs, key=lambda d: len(d.parts), reverse=True):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
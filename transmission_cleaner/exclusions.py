@@ -0,0 +1,170 @@
+"""Gitignore-style exclusion rules for directory scans."""
+
+import re
+from collections.abc import Iterable, Sequence
+
+# Excluded from every scan; later rules such as "!@eaDir/" re-include them
+DEFAULT_EXCLUDES = [
+    # System files
+    ".DS_Store",
+    "Thumbs.db",
+    "desktop.ini",
+    ".directory",
+    # Torrent files, in any case
+    "*.[tT][oO][rR][rR][eE][nN][tT]",
+    # Partial downloads, Synology thumbnails and Syncthing metadata
+    ".incomplete/",
+    "@eaDir/",
+    ".stfolder/",
+]
+# Hidden files and directories, excluded unless asked for
+HIDDEN_EXCLUDE = ".*"
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob (without ! or trailing /) into a regular expression."""
+    parts: list[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            # Any number of leading directories, including none
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            # Everything inside
+            parts.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            j = i + 1
+            if j < n and pattern[j] == "!":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            end = pattern.find("]", j)
+            if end == -1:
+                parts.append(re.escape("["))
+                i += 1
+                continue
+            content = pattern[i + 1 : end].replace("\\", "\\\\")
+            if content.startswith("!"):
+                content = "^" + content[1:]
+            parts.append(f"[{content}]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(parts)
+
+
+class ExclusionRules:
+    """Gitignore-style rules compiled once into a matcher.
+
+    Paths are matched relative to the scanned root, with "/" separators. As in gitignore,
+    a pattern without a slash matches a name at any depth, a pattern with a slash is
+    anchored to the root, a trailing slash only matches directories, "**" spans
+    directories, and a leading "!" re-includes what earlier rules excluded (the last
+    matching rule wins). Excluded directories are meant to be pruned, not descended into.
+
+    All rules are joined into one regular expression per entry kind, so a path matching no
+    rule, the common case, costs a single match.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._rules: list[tuple[re.Pattern[str], bool, bool]] = []
+        for pattern in patterns:
+            negate = pattern.startswith("!")
+            if negate or pattern.startswith(("\\!", "\\#")):
+                pattern = pattern[1:]
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if not pattern:
+                continue
+            anchored = "/" in pattern
+            regex = _translate(pattern.lstrip("/"))
+            if not anchored:
+                regex = "(?:.*/)?" + regex
+            self._rules.append((re.compile(regex), negate, dir_only))
+
+        self._has_negations = any(negate for _, negate, _ in self._rules)
+        self._file_pattern = self._combine(rule for rule in self._rules if not rule[2])
+        self._dir_pattern = self._combine(self._rules)
+
+    @staticmethod
+    def _combine(rules: Iterable[tuple[re.Pattern[str], bool, bool]]) -> re.Pattern[str] | None:
+        regexes = [f"(?:{pattern.pattern})" for pattern, _, _ in rules]
+        return re.compile("|".join(regexes)) if regexes else None
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def excludes(self, path: str, is_dir: bool = False) -> bool:
+        """Check whether an entry is excluded.
+
+        Args:
+            path: Entry path relative to the scanned root, with "/" separators
+            is_dir: Whether the entry is a directory
+
+        Returns:
+            True if the last rule matching the entry excludes it
+        """
+        combined = self._dir_pattern if is_dir else self._file_pattern
+        if combined is None or not combined.fullmatch(path):
+            return False
+        if not self._has_negations:
+            return True
+        for pattern, negate, dir_only in reversed(self._rules):
+            if (is_dir or not dir_only) and pattern.fullmatch(path):
+                return not negate
+        return False
+
+
+def load_exclusion_file(path: str) -> list[str]:
+    """Read exclusion patterns from a file, one per line.
+
+    Blank lines and lines starting with # are ignored, as in .gitignore.
+
+    Args:
+        path: Pattern file
+
+    Returns:
+        Patterns in file order
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = [line.rstrip("\r\n").rstrip(" ") for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def create_exclusions(
+    include_hidden: bool = False,
+    patterns: Sequence[str] = (),
+    pattern_files: Sequence[str] = (),
+) -> ExclusionRules:
+    """Build the rules for a scan: the defaults, then patterns from files, then patterns given directly.
+
+    Args:
+        include_hidden: Whether hidden files and directories are scanned
+        patterns: Extra patterns, applied last
+        pattern_files: Files of extra patterns
+
+    Returns:
+        Compiled rules
+    """
+    rules = list(DEFAULT_EXCLUDES)
+    if not include_hidden:
+        rules.append(HIDDEN_EXCLUDE)
+    for pattern_file in pattern_files:
+        rules.extend(load_exclusion_file(pattern_file))
+    rules.extend(patterns)
+    return ExclusionRules(rules)
@@ -0,0 +1,106 @@
+"""External sorting of byte-string records through run files on disk."""
+
+import heapq
+import os
+import tempfile
+from collections.abc import Iterable, Iterator
+
+# Approximate memory of a buffered record beyond its bytes (tuple and bytes object headers)
+RECORD_OVERHEAD = 120
+# Run files merged at once; more runs are merged in several passes
+MAX_MERGE_FANIN = 64
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _read_run(path: str, arity: int) -> Iterator[tuple[bytes, ...]]:
+    """Stream the records of a run file.
+
+    Fields are terminated by NUL, which cannot occur in paths.
+    """
+    fields: list[bytes] = []
+    tail = b""
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_CHUNK_SIZE):
+            parts = (tail + chunk).split(b"\0")
+            tail = parts.pop()
+            for part in parts:
+                fields.append(part)
+                if len(fields) == arity:
+                    yield tuple(fields)
+                    fields = []
+
+
+def _write_run(path: str, records: Iterable[tuple[bytes, ...]]) -> None:
+    with open(path, "wb") as f:
+        f.writelines(b"\0".join(record) + b"\0" for record in records)
+
+
+class ExternalSorter:
+    """Sort records of byte strings with bounded memory.
+
+    Records are buffered until the memory limit is reached, then sorted and written to a run
+    file in a temporary directory; iterating merges the runs. Use as a context manager so the
+    run files are removed.
+    """
+
+    def __init__(self, arity: int, memory_limit: int, spill_dir: str | None = None):
+        self.arity = arity
+        self.memory_limit = memory_limit
+        self._tmp = tempfile.TemporaryDirectory(prefix="transmission-cleaner-", dir=spill_dir)
+        self._buffer: list[tuple[bytes, ...]] = []
+        self._buffered = 0
+        self._runs: list[str] = []
+        self._run_count = 0
+
+    def __enter__(self) -> "ExternalSorter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Remove the run files."""
+        self._buffer.clear()
+        self._tmp.cleanup()
+
+    def _new_run_path(self) -> str:
+        self._run_count += 1
+        return os.path.join(self._tmp.name, f"run{self._run_count}")
+
+    def _spill(self) -> None:
+        self._buffer.sort()
+        path = self._new_run_path()
+        _write_run(path, self._buffer)
+        self._runs.append(path)
+        self._buffer.clear()
+        self._buffered = 0
+
+    def add(self, record: tuple[bytes, ...]) -> None:
+        """Add a record.
+
+        Args:
+            record: Tuple of `arity` byte strings, none containing NUL
+        """
+        self._buffer.append(record)
+        self._buffered += sum(len(field) for field in record) + RECORD_OVERHEAD
+        if self._buffered >= self.memory_limit:
+            self._spill()
+
+    def __iter__(self) -> Iterator[tuple[bytes, ...]]:
+        """Yield every record in sorted order."""
+        if not self._runs:
+            self._buffer.sort()
+            yield from self._buffer
+            return
+
+        if self._buffer:
+            self._spill()
+        # Merge in passes so open files and read buffers stay bounded
+        while len(self._runs) > MAX_MERGE_FANIN:
+            group, self._runs = self._runs[:MAX_MERGE_FANIN], self._runs[MAX_MERGE_FANIN:]
+            path = self._new_run_path()
+            _write_run(path, heapq.merge(*(_read_run(run, self.arity) for run in group)))
+            for run in group:
+                os.remove(run)
+            self._runs.append(path)
+        yield from heapq.merge(*(_read_run(run, self.arity) for run in self._runs))
@@ -0,0 +1,185 @@
+"""Persistent cache of torrent file lists keyed by infohash."""
+
+import json
+import sqlite3
+import threading
+import zlib
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from transmission_rpc import Session, Torrent
+
+from transmission_cleaner.client import TORRENT_FIELDS, TorrentClient, TorrentIDs
+
+# Hashes per SQL query, below SQLite's bound parameter limit
+QUERY_BATCH_SIZE = 500
+
+
+class FileListCache:
+    """SQLite table of infohash -> (torrent name, edit date, compressed file list).
+
+    File names change when a torrent or any file or folder inside it is renamed; the daemon
+    then updates the torrent's edit date, which the stored one is checked against. Entries
+    are only decompressed when used.
+    """
+
+    def __init__(self, path: str):
+        # Torrents may be fetched in a background thread (e.g. alongside the orphans scan), so
+        # the connection is shared between threads, one query at a time
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(files)")]
+        if columns and "edited" not in columns:
+            # Cache written by an older version without edit dates, refilled on the next fetch
+            self.connection.execute("DROP TABLE files")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS files (hash TEXT PRIMARY KEY, name TEXT, edited INTEGER, data BLOB)"
+        )
+
+    def close(self) -> None:
+        """Close the database."""
+        with self.lock:
+            self.connection.close()
+
+    def get(self, hashes: Iterable[str]) -> dict[str, tuple[str, int | None, bytes]]:
+        """Look up cached entries.
+
+        Args:
+            hashes: Infohashes to look up
+
+        Returns:
+            Mapping of infohash to (torrent name, edit date, compressed file list) for cached torrents
+        """
+        hashes = list(hashes)
+        found: dict[str, tuple[str, int | None, bytes]] = {}
+        with self.lock:
+            for start in range(0, len(hashes), QUERY_BATCH_SIZE):
+                batch = hashes[start : start + QUERY_BATCH_SIZE]
+                rows = self.connection.execute(
+                    f"SELECT hash, name, edited, data FROM files WHERE hash IN ({','.join('?' * len(batch))})", batch
+                )
+                found.update((h, (name, edited, data)) for h, name, edited, data in rows)
+        return found
+
+    def put(self, torrents: Iterable[Torrent]) -> None:
+        """Store the file lists of torrents fetched with their files.
+
+        Args:
+            torrents: Torrents with the "files" and "editDate" fields
+        """
+        rows = [(t.hash_string, t.name, t.fields.get("editDate"), encode_files(t.fields["files"])) for t in torrents]
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", rows)
+
+    def retain(self, hashes: Iterable[str]) -> None:
+        """Drop entries of torrents that no longer exist.
+
+        Args:
+            hashes: Infohashes of every current torrent
+        """
+        with self.lock, self.connection:
+            self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS current (hash TEXT PRIMARY KEY)")
+            self.connection.execute("DELETE FROM current")
+            self.connection.executemany("INSERT OR IGNORE INTO current VALUES (?)", ((h,) for h in hashes))
+            self.connection.execute("DELETE FROM files WHERE hash NOT IN (SELECT hash FROM current)")
+
+
+def encode_files(files: Sequence[dict[str, Any]]) -> bytes:
+    """Compress a torrent-get file list, keeping names, lengths and completed bytes."""
+    rows = [[file["name"], file["length"], file["bytesCompleted"]] for file in files]
+    return zlib.compress(json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode())
+
+
+def decode_files(data: bytes) -> list[dict[str, Any]]:
+    """Decompress a file list stored by encode_files."""
+    return [
+        {"name": name, "length": length, "bytesCompleted": completed}
+        for name, length, completed in json.loads(zlib.decompress(data))
+    ]
+
+
+class CachedFilesClient:
+    """Client wrapper that serves torrent file lists from a FileListCache.
+
+    Torrents are fetched without "files"; only torrents missing from the cache, edited (e.g.
+    renamed) since they were cached or not fully downloaded (whose completed bytes still
+    change) are fetched again with their files. Daemons too old to report edit dates get
+    every file list fetched. Wanted files of complete torrents are reported as complete.
+    Other methods are passed through to the wrapped client.
+    """
+
+    def __init__(self, client: TorrentClient, cache: FileListCache):
+        self.client = client
+        self.cache = cache
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
+
+    def remove_torrent(self, ids: TorrentIDs, delete_data: bool = False, timeout: float | None = None) -> None:
+        """Remove torrents through the wrapped client."""
+        self.client.remove_torrent(ids, delete_data=delete_data, timeout=timeout)
+
+    def get_session(self, timeout: float | None = None) -> Session:
+        """Get the session of the wrapped client."""
+        return self.client.get_session(timeout=timeout)
+
+    def get_torrents(
+        self,
+        ids: TorrentIDs = None,
+        arguments: Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> list[Torrent]:
+        """Get torrents, with file lists from the cache where possible.
+
+        Args:
+            ids: Optional torrent IDs or hashes to fetch
+            arguments: Optional torrent fields to fetch (default: TORRENT_FIELDS)
+            timeout: Optional RPC timeout
+
+        Returns:
+            Torrents
+        """
+        arguments = list(arguments) if arguments else list(TORRENT_FIELDS)
+        if "files" not in arguments:
+            return self.client.get_torrents(ids=ids, arguments=arguments, timeout=timeout)
+
+        # Per-file wanted flags and priorities are small and change, so they are always fetched
+        scalar_arguments = [field for field in arguments if field != "files"]
+        scalar_arguments += [
+            field for field in ("name", "editDate", "percentDone", "priorities", "wanted") if field not in arguments
+        ]
+        torrents = self.client.get_torrents(ids=ids, arguments=scalar_arguments, timeout=timeout)
+
+        cached = self.cache.get(t.hash_string for t in torrents)
+        fields_by_id: dict[int, dict[str, Any]] = {}
+        missing: list[int | str] = []
+        for torrent in torrents:
+            fields = dict(torrent.fields)
+            fields_by_id[torrent.id] = fields
+            entry = cached.get(torrent.hash_string)
+            edited = fields.get("editDate")
+            if entry is None or entry[:2] != (torrent.name, edited) or edited is None or fields["percentDone"] < 1:
+                missing.append(torrent.id)
+                continue
+            files = decode_files(entry[2])
+            if len(files) != len(fields["wanted"]):
+                missing.append(torrent.id)
+                continue
+            for file, wanted in zip(files, fields["wanted"]):
+                if wanted:
+                    file["bytesCompleted"] = file["length"]
+            fields["files"] = files
+
+        if missing:
+            print(f"[INFO]   Fetching file lists of {len(missing)} torrents not in the file cache")
+            fetched = self.client.get_torrents(
+                ids=missing, arguments=["id", "hashString", "name", "editDate", "files"], timeout=timeout
+            )
+            self.cache.put(fetched)
+            for torrent in fetched:
+                fields_by_id[torrent.id]["files"] = torrent.fields["files"]
+
+        if ids is None:
+            self.cache.retain(t.hash_string for t in torrents)
+
+        return [Torrent(fields=fields_by_id[t.id]) for t in torrents if "files" in fields_by_id[t.id]]
@@ -0,0 +1,183 @@
+"""Append-only journal of planned and completed deletions, for resuming interrupted runs."""
+
+import json
+import os
+import pathlib
+import time
+from collections.abc import Iterable
+from typing import Any, TextIO
+
+from transmission_rpc import Torrent
+
+# Step after which a planned item is complete
+REMOVED = "removed"
+DELETED = "deleted"
+# Final step of an item no longer eligible when the run was resumed
+SKIPPED = "skipped"
+
+
+def torrent_key(torrent: Torrent) -> str:
+    """Journal key of a torrent, stable across daemon restarts (IDs are not)."""
+    return f"torrent:{torrent.hash_string}"
+
+
+def file_key(path: pathlib.Path) -> str:
+    """Journal key of a file."""
+    return f"file:{path}"
+
+
+class Journal:
+    """Append-only NDJSON journal.
+
+    Planned actions are written (and fsynced) before they run, and each completed step is
+    appended as it finishes, so a run killed halfway can be resumed from the remaining items.
+    A torrent whose data is deleted locally is complete after both its "removed" and "deleted"
+    steps; other torrents after "removed"; files after "deleted". Any item is complete after
+    "skipped".
+    """
+
+    def __init__(self, path: str, stream: TextIO, command: str | None = None):
+        self.path = path
+        self.command = command
+        self._stream = stream
+
+    @classmethod
+    def create(cls, path: str, command: str) -> "Journal":
+        """Start a new journal, replacing any finished one at the path.
+
+        Args:
+            path: Journal file path
+            command: Subcommand being run, checked again when the run is resumed
+
+        Returns:
+            Journal open for appending
+
+        Raises:
+            FileExistsError: If the journal at the path still has unfinished items, which are
+                             the only record of an interrupted run
+        """
+        if os.path.exists(path):
+            unfinished = read_pending(path)
+            if unfinished:
+                raise FileExistsError(f"{path} has {len(unfinished)} unfinished items from an interrupted run")
+        journal = cls(path, open(path, "w", encoding="utf-8"), command)
+        journal._append({"type": "start", "command": command, "time": int(time.time())})
+        return journal
+
+    @classmethod
+    def open(cls, path: str) -> "Journal":
+        """Open an existing journal to continue appending to it.
+
+        Args:
+            path: Journal file path
+
+        Returns:
+            Journal open for appending, with the command of the run that started it
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            first_line = f.readline()
+        try:
+            start = json.loads(first_line)
+        except json.JSONDecodeError:
+            start = {}
+        command = start.get("command") if start.get("type") == "start" else None
+        return cls(path, open(path, "a", encoding="utf-8"), command)
+
+    def _append(self, record: dict[str, Any]) -> None:
+        self._stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._stream.flush()
+
+    def sync(self) -> None:
+        """Make everything written so far durable."""
+        self._stream.flush()
+        os.fsync(self._stream.fileno())
+
+    def close(self) -> None:
+        """Close the journal."""
+        self._stream.close()
+
+    def plan_torrent(self, torrent: Torrent, delete_data: bool, local: bool = False) -> None:
+        """Record that a torrent is about to be removed.
+
+        Args:
+            torrent: Torrent to remove
+            delete_data: Whether the daemon deletes the data
+            local: Whether the data is deleted locally after removal
+        """
+        record: dict[str, Any] = {
+            "type": "plan",
+            "kind": "torrent",
+            "key": torrent_key(torrent),
+            "hash": torrent.hash_string,
+            "name": torrent.name,
+            "size": torrent.total_size,
+            "delete_data": delete_data,
+            "local": local,
+        }
+        if local:
+            # The torrent is gone from the daemon after removal, so keep what is needed to delete its data
+            record["download_dir"] = torrent.download_dir
+            record["files"] = [file.name for file in torrent.get_files()]
+        self._append(record)
+
+    def plan_file(self, path: pathlib.Path) -> None:
+        """Record that a file is about to be deleted.
+
+        Args:
+            path: File to delete
+        """
+        self._append({"type": "plan", "kind": "file", "key": file_key(path), "path": str(path)})
+
+    def mark_done(self, keys: Iterable[str], step: str) -> None:
+        """Record that a step completed for some items.
+
+        Args:
+            keys: Journal keys of the items
+            step: REMOVED or DELETED
+        """
+        for key in keys:
+            self._append({"type": "done", "key": key, "step": step})
+
+    def pending(self) -> list[dict[str, Any]]:
+        """Read the journal and return the planned items that are not complete.
+
+        Returns:
+            Plan records, each with a "steps" set of the steps already done
+        """
+        return read_pending(self.path)
+
+
+def read_pending(path: str) -> list[dict[str, Any]]:
+    """Read a journal and return the planned items that are not complete.
+
+    A truncated last line (from a kill mid-write) is ignored.
+
+    Args:
+        path: Journal file path
+
+    Returns:
+        Plan records, each with a "steps" set of the steps already done
+    """
+    plans: dict[str, dict[str, Any]] = {}
+    steps: dict[str, set[str]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record["type"] == "plan":
+                plans[record["key"]] = record
+            elif record["type"] == "done":
+                steps.setdefault(record["key"], set()).add(record["step"])
+
+    pending = []
+    for key, record in plans.items():
+        done = steps.get(key, set())
+        if record["kind"] == "file" or record["local"]:
+            final = DELETED
+        else:
+            final = REMOVED
+        if final not in done and SKIPPED not in done:
+            pending.append({**record, "steps": done})
+    return pending
@@ -1,10 +1,11 @@
 import argparse
+import contextlib
 import signal
 import sys
 
-from transmission_cleaner.actions import process_torrents
-from transmission_cleaner.client import create_client, get_client_config
-from transmission_cleaner.filters import filter_torrents
+# Only lightweight imports at module level: transmission_rpc and the checkers are imported
+# by the handlers, so --help and argument errors never load the HTTP stack.
+from transmission_cleaner.units import parse_duration, parse_percent, parse_shard, parse_size
 
 
 def signal_handler(signal, frame):
@@ -24,12 +25,58 @@ def add_common_auth_args(parser):
         "--protocol", choices=["http", "https"], default="http", help="Protocol to use (default: http)"
     )
     auth_group.add_argument("--username", type=str, help="Transmission username")
-    auth_group.add_argument("--password", required=True, type=str, help="Transmission password")
+    auth_group.add_argument("--password", type=str, help="Transmission password (required unless --instances)")
     auth_group.add_argument("--host", type=str, default="127.0.0.1", help="Transmission host (default: 127.0.0.1)")
     auth_group.add_argument("--port", type=int, default=9091, help="Transmission port (default: 9091)")
     auth_group.add_argument(
         "--rpc-path", type=str, default="/transmission/rpc", help="Transmission RPC path (default: /transmission/rpc)"
     )
+    auth_group.add_argument(
+        "--instances",
+        type=str,
+        metavar="FILE",
+        help="JSON file listing several Transmission instances to treat as one (replaces the options above)",
+    )
+
+
+def add_common_rpc_args(parser):
+    """Add RPC pacing arguments to a parser."""
+    rpc_group = parser.add_argument_group("rpc pacing")
+    rpc_group.add_argument(
+        "--rpc-target-latency",
+        type=float,
+        metavar="SECONDS",
+        help=(
+            "Fetch torrents in chunks sized and spaced so each request takes about this long, "
+            "keeping the daemon responsive to peers (e.g. 0.5)"
+        ),
+    )
+    rpc_group.add_argument(
+        "--rpc-chunk-size",
+        type=int,
+        default=500,
+        metavar="N",
+        help="Initial number of torrents per request with --rpc-target-latency (default: 500)",
+    )
+    rpc_group.add_argument(
+        "--file-cache",
+        type=str,
+        metavar="FILE",
+        help="SQLite file caching torrent file lists by infohash, so only new torrents' files are fetched",
+    )
+
+
+def add_offline_args(parser):
+    """Add offline backend arguments to a parser."""
+    parser.add_argument(
+        "--config-dir",
+        type=str,
+        metavar="DIR",
+        help=(
+            "Read torrents from this Transmission config directory (torrents/ and resume/) "
+            "instead of RPC; works with the daemon stopped (replaces the authentication options)"
+        ),
+    )
 
 
 def add_common_filter_args(parser):
@@ -56,10 +103,115 @@ def add_common_filter_args(parser):
     )
 
 
+def add_shard_args(parser, unit="torrents"):
+    """Add the shard argument to a parser."""
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help=(
+            f"Only process shard I of N (counting from 0), splitting the {unit} between N runs "
+            "whose ndjson output can be combined with 'merge'"
+        ),
+    )
+
+
+def add_max_runtime_args(parser):
+    """Add the runtime limit argument to a parser."""
+    parser.add_argument(
+        "--max-runtime",
+        type=parse_duration,
+        metavar="DURATION",
+        help=(
+            "Stop checking after this long (e.g. 20m) and act on what was found; "
+            "torrents are checked largest first, so the space found is the most that fits"
+        ),
+    )
+
+
+def add_common_plan_args(parser):
+    """Add free-space target arguments to a parser."""
+    plan_group = parser.add_argument_group("free-space target")
+    plan_group.add_argument(
+        "--free-until",
+        type=parse_percent,
+        metavar="PERCENT",
+        help="Only delete until each filesystem is at most this full (e.g. 85%%)",
+    )
+    plan_group.add_argument(
+        "--free",
+        type=parse_size,
+        metavar="SIZE",
+        help="Only delete until each filesystem has at least this much free space (e.g. 500G)",
+    )
+    plan_group.add_argument(
+        "--score",
+        choices=["age", "ratio", "size", "seeding"],
+        default="age",
+        help="Which torrents to delete first when a target is set (default: age)",
+    )
+
+
+def add_common_delete_args(parser, local_delete=True):
+    """Add local deletion arguments to a parser."""
+    delete_group = parser.add_argument_group("local deletion")
+    if local_delete:
+        delete_group.add_argument(
+            "--local-delete",
+            action="store_true",
+            help="Remove torrents without data and delete the data locally instead of in the daemon",
+        )
+    delete_group.add_argument(
+        "--delete-workers",
+        type=int,
+        default=4,
+        help="Number of parallel deletion workers (default: 4)",
+    )
+    delete_group.add_argument(
+        "--delete-rate",
+        type=parse_size,
+        metavar="SIZE",
+        help="Maximum bytes deleted per second (e.g. 500M)",
+    )
+    delete_group.add_argument(
+        "--delete-iops",
+        type=float,
+        metavar="N",
+        help="Maximum files deleted per second",
+    )
+    delete_group.add_argument(
+        "--journal",
+        type=str,
+        metavar="FILE",
+        help="Record planned deletions and their progress in this file, so an interrupted run can be resumed",
+    )
+    delete_group.add_argument(
+        "--resume",
+        action="store_true",
+        help="Carry on from where the run recorded in --journal stopped, skipping the scan and fetch",
+    )
+
+
+def add_common_output_args(parser):
+    """Add output format and review plan arguments to a parser."""
+    parser.add_argument(
+        "--plan-file",
+        type=str,
+        metavar="FILE",
+        help="With --action review, keep the plan at this path instead of a temporary file",
+    )
+    parser.add_argument(
+        "--output",
+        choices=["text", "ndjson", "csv"],
+        default="text",
+        help="Format of the list action's output (default: text). Log messages go to stderr for ndjson and csv.",
+    )
+
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Transmission maintenance tool for hardlinks, errors, and orphaned files",
-        epilog="Note: All commands require authentication (--password). Use 'transmission-cleaner <command> --help' for command-specific options.",
+        epilog="Note: All commands except merge require authentication (--password, or --instances; hardlinks, check and orphans also accept --config-dir). Use 'transmission-cleaner <command> --help' for command-specific options.",
     )
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
 
@@ -68,76 +220,279 @@ def parse_args():
         "hardlinks", help="Find and manage torrents without hardlinks to other files"
     )
     add_common_filter_args(hardlinks_parser)
+    hardlinks_parser.add_argument(
+        "--stat-schedule",
+        choices=["directory", "inode"],
+        help=(
+            "Stat all files up front, grouped by device and directory with one worker per device, "
+            "instead of torrent by torrent | "
+            "directory: in listing order | "
+            "inode: in inode order within each directory (best for spinning disks)"
+        ),
+    )
+    hardlinks_parser.add_argument(
+        "--sample",
+        type=parse_percent,
+        metavar="CONFIDENCE",
+        help=(
+            "Only check each torrent's largest files and a random sample of the rest, sized to catch "
+            "a torrent with 10%% of its files hardlinked at this confidence (e.g. 99%%); torrents "
+            "chosen for an action other than list are fully verified first"
+        ),
+    )
     hardlinks_parser.add_argument(
         "--action",
-        choices=["list", "l", "interactive", "i", "delete", "d", "remove", "r"],
+        choices=["list", "l", "interactive", "i", "review", "v", "delete", "d", "remove", "r"],
         default="list",
         help=(
             "Action to perform (default: list) | "
             "list/l: show torrents only | "
             "interactive/i: prompt for each torrent | "
+            "review/v: edit a plan of all torrents, then run it in one batch | "
             "delete/d: remove torrent with data | "
             "remove/r: remove torrent from client only"
         ),
     )
+    add_shard_args(hardlinks_parser)
+    add_max_runtime_args(hardlinks_parser)
+    add_common_plan_args(hardlinks_parser)
+    add_common_delete_args(hardlinks_parser)
+    add_common_output_args(hardlinks_parser)
+    add_offline_args(hardlinks_parser)
+    add_common_rpc_args(hardlinks_parser)
     add_common_auth_args(hardlinks_parser)
 
     # Errors subcommand
     errors_parser = subparsers.add_parser("errors", help="Find and manage torrents with error status")
     add_common_filter_args(errors_parser)
-    errors_parser.add_argument(
+    pattern_group = errors_parser.add_mutually_exclusive_group()
+    pattern_group.add_argument(
         "--error-pattern",
         type=str,
         help="Filter by error message pattern (e.g., 'Unregistered')",
     )
+    pattern_group.add_argument(
+        "--classify",
+        action="store_true",
+        help="Sort errors into the built-in categories (unregistered, tracker down, I/O error, data missing)",
+    )
+    pattern_group.add_argument(
+        "--error-rules",
+        type=str,
+        metavar="FILE",
+        help="JSON file of error categories, their patterns and an optional action per category",
+    )
+    errors_parser.add_argument(
+        "--rule-actions",
+        action="store_true",
+        help="With --error-rules, run each category's own action instead of --action (categories without one use --action)",
+    )
+    errors_parser.add_argument(
+        "--tracker-stats",
+        action="store_true",
+        help="Judge errors by every tracker's last announce instead of the torrent-level error",
+    )
+    errors_parser.add_argument(
+        "--min-failures",
+        type=int,
+        default=1,
+        help="With --tracker-stats, consecutive failed announces required on every tracker (default: 1; above 1 needs --tracker-state)",
+    )
+    errors_parser.add_argument(
+        "--tracker-state",
+        type=str,
+        metavar="FILE",
+        help="With --tracker-stats, JSON file keeping consecutive failure counts between runs",
+    )
     errors_parser.add_argument(
         "--skip-cross-seed",
         action="store_true",
         help="Skip cross-seed detection (allow data deletion even if cross-seeded)",
     )
+    errors_parser.add_argument(
+        "--cross-seed-match",
+        choices=["path", "signature", "inode"],
+        default="signature",
+        help=(
+            "How cross-seeds are detected (default: signature) | "
+            "path: same file path | "
+            "signature: also same size and name below the top-level folder, in any download dir | "
+            "inode: also same inode (stats every file)"
+        ),
+    )
     errors_parser.add_argument(
         "--action",
-        choices=["list", "l", "interactive", "i", "delete", "d", "remove", "r"],
+        choices=["list", "l", "interactive", "i", "review", "v", "delete", "d", "remove", "r"],
         default="list",
         help=(
             "Action to perform (default: list) | "
             "list/l: show torrents only | "
             "interactive/i: prompt for each torrent | "
+            "review/v: edit a plan of all torrents, then run it in one batch | "
             "delete/d: remove torrent with data (respects cross-seed check) | "
             "remove/r: remove torrent from client only"
         ),
     )
+    add_shard_args(errors_parser)
+    add_max_runtime_args(errors_parser)
+    add_common_plan_args(errors_parser)
+    add_common_delete_args(errors_parser)
+    add_common_output_args(errors_parser)
+    add_common_rpc_args(errors_parser)
     add_common_auth_args(errors_parser)
 
+    # Check subcommand
+    check_parser = subparsers.add_parser("check", help="Run several checkers over one torrent fetch and one stat pass")
+    add_common_filter_args(check_parser)
+    check_parser.add_argument(
+        "--checker",
+        dest="checkers",
+        action="append",
+        required=True,
+        metavar="NAME",
+        help=(
+            "Checker to run, repeatable (built in: hardlinks, errors; "
+            "plugins register more under the transmission_cleaner.checkers entry point)"
+        ),
+    )
+    check_parser.add_argument(
+        "--skip-cross-seed",
+        action="store_true",
+        help="Skip cross-seed detection (allow data deletion even if cross-seeded)",
+    )
+    check_parser.add_argument(
+        "--action",
+        choices=["list", "l", "interactive", "i", "review", "v", "delete", "d", "remove", "r"],
+        default="list",
+        help=(
+            "Action to perform on the torrents flagged by any checker (default: list) | "
+            "list/l: show torrents only | "
+            "interactive/i: prompt for each torrent | "
+            "review/v: edit a plan of all torrents, then run it in one batch | "
+            "delete/d: remove torrent with data (respects cross-seed check) | "
+            "remove/r: remove torrent from client only"
+        ),
+    )
+    check_parser.add_argument(
+        "--sample",
+        type=parse_percent,
+        metavar="CONFIDENCE",
+        help=(
+            "Only stat each torrent's largest files and a random sample of the rest, as for hardlinks; "
+            "torrents flagged for an action other than list are fully verified first"
+        ),
+    )
+    add_shard_args(check_parser)
+    add_max_runtime_args(check_parser)
+    add_common_plan_args(check_parser)
+    add_common_delete_args(check_parser)
+    add_common_output_args(check_parser)
+    add_offline_args(check_parser)
+    add_common_rpc_args(check_parser)
+    add_common_auth_args(check_parser)
+
     # Orphans subcommand
     orphans_parser = subparsers.add_parser("orphans", help="Find and manage files not tracked by any torrent")
-    orphans_parser.add_argument(
+    roots_group = orphans_parser.add_mutually_exclusive_group(required=True)
+    roots_group.add_argument(
         "-d",
         "--dir",
         "--directory",
         dest="directory",
         type=str,
-        required=True,
         help="Directory to scan for orphaned files",
     )
+    roots_group.add_argument(
+        "--auto-roots",
+        action="store_true",
+        help="Scan every torrent download directory (nested and duplicate directories are scanned once)",
+    )
     orphans_parser.add_argument(
         "--include-hidden",
         action="store_true",
-        help="Include hidden files (files starting with .)",
+        help="Include hidden files and directories (starting with .)",
+    )
+    orphans_parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help=(
+            "Gitignore-style pattern of files to skip, relative to the scanned directory; "
+            "a trailing / prunes matching directories and a leading ! re-includes (repeatable)"
+        ),
+    )
+    orphans_parser.add_argument(
+        "--exclude-from",
+        action="append",
+        default=[],
+        metavar="FILE",
+        help="Read --exclude patterns from FILE, one per line (repeatable)",
+    )
+    orphans_parser.add_argument(
+        "--min-age",
+        type=parse_duration,
+        metavar="DURATION",
+        help="Skip files modified more recently than this (e.g. 30m, 12h, 7d)",
+    )
+    orphans_parser.add_argument(
+        "--compact-index",
+        action="store_true",
+        help="Keep tracked paths in a compact hash index instead of a set (for millions of files)",
+    )
+    orphans_parser.add_argument(
+        "--index-file",
+        type=str,
+        metavar="FILE",
+        help="Write the compact index to this file and memory-map it (implies --compact-index)",
+    )
+    orphans_parser.add_argument(
+        "--spill-dir",
+        type=str,
+        metavar="DIR",
+        help="Find orphans with an on-disk sort-merge join, keeping sorted run files in DIR (for more files than fit in RAM)",
+    )
+    orphans_parser.add_argument(
+        "--memory-limit",
+        type=parse_size,
+        default=parse_size("256M"),
+        metavar="SIZE",
+        help="With --spill-dir, memory used for buffering before spilling to disk (default: 256M)",
     )
     orphans_parser.add_argument(
         "--action",
-        choices=["list", "l", "interactive", "i", "delete", "d"],
+        choices=["list", "l", "interactive", "i", "review", "v", "delete", "d"],
         default="list",
         help=(
             "Action to perform (default: list) | "
             "list/l: show files only | "
             "interactive/i: prompt for each file | "
+            "review/v: edit a plan of all files, then run it in one batch | "
             "delete/d: remove orphaned files"
         ),
     )
+    add_shard_args(orphans_parser, unit="top-level entries of each scanned directory")
+    add_common_delete_args(orphans_parser, local_delete=False)
+    add_common_output_args(orphans_parser)
+    add_offline_args(orphans_parser)
+    add_common_rpc_args(orphans_parser)
     add_common_auth_args(orphans_parser)
 
+    # Merge subcommand
+    merge_parser = subparsers.add_parser("merge", help="Combine the ndjson output of sharded runs into one report")
+    merge_parser.add_argument(
+        "files",
+        nargs="+",
+        metavar="FILE",
+        help="ndjson output of a run, '-' for stdin",
+    )
+    merge_parser.add_argument(
+        "--output",
+        choices=["text", "ndjson", "csv"],
+        default="ndjson",
+        help="Format of the merged report (default: ndjson). Log messages go to stderr for ndjson and csv.",
+    )
+
     args = parser.parse_args()
 
     # If no subcommand provided, show help
@@ -145,125 +500,611 @@ def parse_args():
         parser.print_help()
         sys.exit(1)
 
+    if args.command == "merge":
+        # Works on result files only, without a daemon
+        return args
+
+    config_dir = getattr(args, "config_dir", None)
+    if args.password is None and args.instances is None and config_dir is None:
+        parser.error("--password is required unless --instances or --config-dir is given")
+
+    if config_dir is not None and args.command in ["hardlinks", "check"] and args.action not in ["list", "l"]:
+        parser.error(f"--config-dir cannot remove torrents, only --action list is supported for {args.command}")
+    if config_dir is not None and args.command == "orphans" and args.action not in ["list", "l"]:
+        # A torrent whose files cannot be read from the config directory is not tracked, so its
+        # live data would be reported, and deleted, as orphaned
+        parser.error("--config-dir only supports --action list for orphans")
+
+    if getattr(args, "spill_dir", None) and (args.compact_index or args.index_file):
+        parser.error("--spill-dir cannot be combined with --compact-index or --index-file")
+    if getattr(args, "spill_dir", None) and args.action in ["review", "v"]:
+        # The review plan holds every orphaned file, which --spill-dir is meant to avoid
+        parser.error("--spill-dir cannot be combined with --action review")
+
+    if args.command == "errors" and args.min_failures < 1:
+        parser.error("--min-failures must be at least 1")
+
+    if args.command == "errors" and args.min_failures > 1 and not args.tracker_state:
+        # Without saved counts, a run only sees the latest announce of each tracker
+        parser.error("--min-failures above 1 requires --tracker-state")
+
+    if getattr(args, "rule_actions", False) and not args.error_rules:
+        parser.error("--rule-actions requires --error-rules")
+
+    if args.resume and not args.journal:
+        parser.error("--resume requires --journal")
+
     return args
 
 
-def handle_hardlinks(client, args):
-    """Handle the hardlinks subcommand."""
+def normalize_action(action):
+    """Map the interactive action names to None, as expected by the action processors."""
+    return action if action not in ["interactive", "i"] else None
 
-    from transmission_cleaner.checkers.hardlinks import get_torrents_without_hardlinks
 
-    torrents = client.get_torrents()
-    print(f"[INFO]   Found {len(torrents)} torrents")
+def create_deleter(args):
+    """Create a local deleter from the local deletion arguments."""
+    from transmission_cleaner.deleter import LocalDeleter
+
+    return LocalDeleter(args.delete_workers, args.delete_rate, args.delete_iops)
+
+
+def select_torrents(torrents, args):
+    """Apply the filter and shard arguments to the fetched torrents."""
+    from transmission_cleaner.filters import filter_torrents
+    from transmission_cleaner.sharding import shard_torrents
 
     torrents = filter_torrents(torrents, args.directory, args.tracker, args.min_days)
-    without_hardlinks = get_torrents_without_hardlinks(torrents)
+    if args.shard is not None:
+        # Only the candidates are split: cross-seeds are still looked up among all torrents
+        torrents = shard_torrents(torrents, args.shard)
+        print(f"[INFO]   Shard {args.shard[0]}/{args.shard[1]}: checking {len(torrents)} torrents")
+    return torrents
 
-    print(f"[INFO]   Found {len(without_hardlinks)} torrents without hardlinks")
 
-    # Normalize action for interactive mode
-    action = args.action if args.action not in ["interactive", "i"] else None
-    bytes_freed = process_torrents(client, without_hardlinks, action)
+def find_cross_seeds(all_torrents, candidates, match="signature", deadline=None):
+    """Look up the cross-seeds of the candidates among all torrents.
 
-    # Print summary if any space was freed
+    Returns the candidates looked up before the deadline, and their cross-seeds by torrent ID.
+    """
+    from transmission_cleaner.checkers.errors import CrossSeedIndex
+
+    print("[INFO]   Checking for cross-seeded torrents...")
+    # Index every torrent (not only the candidates) once, across all instances
+    cross_seed_index = CrossSeedIndex(all_torrents, match)
+    cross_seed_map = {}
+    for checked, torrent in enumerate(candidates):
+        if deadline is not None and deadline.reached():
+            # Torrents not looked up can't be acted on safely, so they are left for the next run
+            print(
+                f"[WARN]   Runtime limit reached, {len(candidates) - checked} of "
+                f"{len(candidates)} torrents left unchecked"
+            )
+            candidates = candidates[:checked]
+            break
+        cross_seeders = cross_seed_index.find(torrent)
+        if cross_seeders:
+            cross_seed_map[torrent.id] = cross_seeders
+            print(f"[CROSS-SEED] {torrent.name}")
+            print(f"             Shared with: {', '.join(t.name for t in cross_seeders)}")
+    return candidates, cross_seed_map
+
+
+def plan_free_space(torrents, args, protected_ids=()):
+    """Keep only the torrents needed to reach the free-space target, if one is set."""
+    if args.free_until is None and args.free is None:
+        return torrents
+
+    from transmission_cleaner.planner import plan_deletions
+
+    torrents = plan_deletions(torrents, args.free_until, args.free, args.score, protected_ids=protected_ids)
+    print(f"[INFO]   Planned {len(torrents)} torrents to reach the free-space target")
+    return torrents
+
+
+def print_space_freed(bytes_freed):
+    """Print the summary of freed space, if any space was freed."""
     if bytes_freed > 0:
         space_freed_gb = bytes_freed / (1024**3)
         print(f"\n[INFO]   Total disk space freed: {space_freed_gb:.2f} GB")
 
 
-def handle_errors(client, args):
-    """Handle the errors subcommand."""
-    from transmission_cleaner.checkers.errors import check_cross_seeding, get_torrents_with_errors
+def handle_hardlinks(client, args, reporter=None, journal=None):
+    """Handle the hardlinks subcommand."""
+    from transmission_cleaner.actions import process_torrents
+    from transmission_cleaner.checkers.hardlinks import (
+        get_torrents_likely_without_hardlinks,
+        get_torrents_without_hardlinks,
+    )
+    from transmission_cleaner.deadline import Deadline
 
+    # The budget covers the fetch as well as the checks
+    deadline = Deadline(args.max_runtime) if args.max_runtime is not None else None
     torrents = client.get_torrents()
     print(f"[INFO]   Found {len(torrents)} torrents")
 
-    torrents = filter_torrents(torrents, args.directory, args.tracker, args.min_days)
-    errored_torrents = get_torrents_with_errors(torrents, args.error_pattern)
+    torrents = select_torrents(torrents, args)
+    if args.sample is not None:
+        without_hardlinks = get_torrents_likely_without_hardlinks(
+            torrents, args.sample, args.stat_schedule, deadline=deadline
+        )
+        print(f"[INFO]   Found {len(without_hardlinks)} torrents likely without hardlinks (sampled)")
+    else:
+        without_hardlinks = get_torrents_without_hardlinks(torrents, args.stat_schedule, deadline)
+        print(f"[INFO]   Found {len(without_hardlinks)} torrents without hardlinks")
+
+    # Normalize action for interactive mode
+    action = normalize_action(args.action)
+
+    if args.sample is not None and action not in ["list", "l"]:
+        # Sampling may miss a hardlink: check every file of the planned torrents before acting,
+        # even past the deadline, since nothing unverified may be deleted. Torrents that fail are
+        # dropped and the rest planned again, until the plan is fully verified.
+        candidates = without_hardlinks
+        verified_ids: set[int] = set()
+        while True:
+            without_hardlinks = plan_free_space(candidates, args)
+            unverified = [t for t in without_hardlinks if t.id not in verified_ids]
+            if not unverified:
+                break
+            passed = {t.id for t in get_torrents_without_hardlinks(unverified, args.stat_schedule)}
+            print(f"[INFO]   Verified {len(passed)} of {len(unverified)} sampled torrents")
+            verified_ids |= passed
+            failed = {t.id for t in unverified} - passed
+            candidates = [t for t in candidates if t.id not in failed]
+    else:
+        without_hardlinks = plan_free_space(without_hardlinks, args)
+
+    deleter = create_deleter(args) if args.local_delete else None
+    bytes_freed = process_torrents(
+        client,
+        without_hardlinks,
+        action,
+        deleter=deleter,
+        reporter=reporter,
+        plan_file=args.plan_file,
+        journal=journal,
+    )
+
+    print_space_freed(bytes_freed)
+
+
+def handle_errors(client, args, reporter=None, journal=None):
+    """Handle the errors subcommand."""
+    from transmission_cleaner.actions import process_torrents
+    from transmission_cleaner.checkers.errors import (
+        DEFAULT_ERROR_CATEGORIES,
+        ErrorClassifier,
+        classify_torrents,
+        get_torrents_with_errors,
+        get_tracker_errors,
+        load_error_rules,
+        load_tracker_state,
+        save_tracker_state,
+    )
+    from transmission_cleaner.client import TORRENT_FIELDS
+    from transmission_cleaner.deadline import Deadline, largest_first
+
+    if args.error_pattern:
+        # An invalid pattern stops the run before anything is fetched
+        try:
+            ErrorClassifier({"--error-pattern": [args.error_pattern]})
+        except ValueError as e:
+            print(f"[ERROR]  {e}")
+            sys.exit(1)
+
+    # The budget covers the fetch as well as the checks
+    deadline = Deadline(args.max_runtime) if args.max_runtime is not None else None
+    if args.tracker_stats:
+        # One projected fetch with per-tracker stats instead of every torrent field
+        all_torrents = client.get_torrents(arguments=[*TORRENT_FIELDS, "trackerStats"])
+    else:
+        all_torrents = client.get_torrents()
+    print(f"[INFO]   Found {len(all_torrents)} torrents")
+
+    torrents = select_torrents(all_torrents, args)
+
+    # Error messages by torrent ID, only when judging by tracker stats
+    error_strings: dict[int, str] | None = None
+    if args.tracker_stats:
+        state = load_tracker_state(args.tracker_state) if args.tracker_state else None
+        error_strings = get_tracker_errors(torrents, args.min_failures, state)
+        if state is not None:
+            save_tracker_state(args.tracker_state, state)
+
+    # Map of torrent ID to error category, only when classifying
+    categories: dict[int, str] | None = None
+    category_actions: dict[str, str] = {}
+    if args.error_rules or args.classify:
+        try:
+            if args.error_rules:
+                patterns, category_actions = load_error_rules(args.error_rules)
+            else:
+                patterns = DEFAULT_ERROR_CATEGORIES
+            classifier = ErrorClassifier(patterns)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR]  Cannot load error rules: {e}")
+            sys.exit(1)
+        if category_actions and not args.rule_actions:
+            # Rule actions may delete data, so they only run when asked for
+            print("[INFO]   Ignoring the actions in the error rules, add --rule-actions to run them")
+            category_actions = {}
+        classified = classify_torrents(torrents, classifier, error_strings)
+        categories = {torrent.id: category for torrent, category in classified}
+        errored_torrents = [torrent for torrent, _ in classified]
+    else:
+        errored_torrents = get_torrents_with_errors(torrents, args.error_pattern, error_strings)
 
     print(f"[INFO]   Found {len(errored_torrents)} torrents with errors")
+    if deadline is not None:
+        # Error status is cheap to check; the cross-seed lookups after it are not
+        errored_torrents = largest_first(errored_torrents)
+    if categories is not None:
+        for category in dict.fromkeys(categories.values()):
+            count = sum(1 for c in categories.values() if c == category)
+            print(f"[INFO]   {count} torrents in category '{category}'")
 
     # Process with cross-seed awareness
-    check_cross_seed = not args.skip_cross_seed
-    action = args.action if args.action not in ["interactive", "i"] else None
-
-    # Build cross-seed map
+    action = normalize_action(args.action)
     cross_seed_map = {}
-    if check_cross_seed:
-        print("[INFO]   Checking for cross-seeded torrents...")
-        for torrent in errored_torrents:
-            cross_seeders = check_cross_seeding(client, torrent)
-            if cross_seeders:
-                cross_seed_map[torrent.id] = cross_seeders
-                print(f"[CROSS-SEED] {torrent.name}")
-                print(f"             Shared with: {', '.join(t.name for t in cross_seeders)}")
+    if not args.skip_cross_seed:
+        errored_torrents, cross_seed_map = find_cross_seeds(
+            all_torrents, errored_torrents, args.cross_seed_match, deadline
+        )
     else:
         print("[INFO]   Skipping cross-seed checks")
 
+    errored_torrents = plan_free_space(errored_torrents, args, protected_ids=cross_seed_map.keys())
+
     # Process torrents with cross-seed protection using shared action processor
-    bytes_freed = process_torrents(client, errored_torrents, action, cross_seed_map=cross_seed_map)
+    deleter = create_deleter(args) if args.local_delete else None
+    if categories is None:
+        bytes_freed = process_torrents(
+            client,
+            errored_torrents,
+            action,
+            cross_seed_map=cross_seed_map,
+            deleter=deleter,
+            reporter=reporter,
+            plan_file=args.plan_file,
+            journal=journal,
+        )
+    else:
+        # Each category may map to its own action
+        bytes_freed = 0
+        for category in dict.fromkeys(categories[t.id] for t in errored_torrents):
+            group = [t for t in errored_torrents if categories[t.id] == category]
+            category_action = normalize_action(category_actions[category]) if category in category_actions else action
+            print(f"[INFO]   Processing category '{category}' ({len(group)} torrents)")
+            bytes_freed += process_torrents(
+                client,
+                group,
+                category_action,
+                cross_seed_map=cross_seed_map,
+                deleter=deleter,
+                reporter=reporter,
+                plan_file=args.plan_file,
+                journal=journal,
+            )
 
-    # Print summary if any space was freed
-    if bytes_freed > 0:
-        space_freed_gb = bytes_freed / (1024**3)
-        print(f"\n[INFO]   Total disk space freed: {space_freed_gb:.2f} GB")
+    print_space_freed(bytes_freed)
 
 
-def handle_orphans(client, args):
+def handle_check(client, args, reporter=None, journal=None):
+    """Handle the check subcommand."""
+    from transmission_cleaner.actions import process_torrents
+    from transmission_cleaner.checkers.registry import (
+        CHECKERS,
+        FILE_FIELDS,
+        load_plugins,
+        run_checkers,
+        verify_checkers,
+    )
+    from transmission_cleaner.deadline import Deadline, largest_first
+    from transmission_cleaner.planner import PLAN_FIELDS
+
+    load_plugins()
+    unknown = [name for name in args.checkers if name not in CHECKERS]
+    if unknown:
+        print(f"[ERROR]  Unknown checker: {', '.join(unknown)} (available: {', '.join(sorted(CHECKERS))})")
+        sys.exit(1)
+    checkers = [CHECKERS[name]() for name in dict.fromkeys(args.checkers)]
+
+    # The budget covers the fetch as well as the checks
+    deadline = Deadline(args.max_runtime) if args.max_runtime is not None else None
+    action = normalize_action(args.action)
+    check_cross_seed = not args.skip_cross_seed and action not in ["list", "l"]
+    plan_target = args.free_until is not None or args.free is not None
+    # Cross-seed signatures need every torrent's file list, and so do local deletion and the
+    # journal, to find the data once the torrent is removed
+    need_files = check_cross_seed or args.journal or (args.local_delete and action not in ["list", "l"])
+    all_torrents, results = run_checkers(
+        client,
+        checkers,
+        lambda torrents: select_torrents(torrents, args),
+        extra_fields=[*(FILE_FIELDS if need_files else ()), *(PLAN_FIELDS if plan_target else ())],
+        sample=args.sample,
+        deadline=deadline,
+    )
+    if args.sample is not None and action not in ["list", "l"]:
+        # Sampling may miss a hardlink: check every file of the flagged torrents before acting,
+        # even past the deadline, since nothing unverified may be deleted
+        results = verify_checkers(checkers, results, all_torrents)
+
+    # A torrent flagged by several checkers is only processed by the first of them
+    flagged_by: dict[int, str] = {}
+    for checker in checkers:
+        flagged = [t for t in results[checker.name] if t.id not in flagged_by]
+        flagged_by.update((t.id, checker.name) for t in flagged)
+        print(f"[INFO]   Found {len(flagged)} {checker.description or checker.name}")
+    candidates = [t for checker in checkers for t in results[checker.name] if flagged_by[t.id] == checker.name]
+    if deadline is not None:
+        candidates = largest_first(candidates)
+
+    cross_seed_map = {}
+    if check_cross_seed:
+        candidates, cross_seed_map = find_cross_seeds(all_torrents, candidates, deadline=deadline)
+
+    candidates = plan_free_space(candidates, args, protected_ids=cross_seed_map.keys())
+
+    deleter = create_deleter(args) if args.local_delete else None
+    bytes_freed = 0
+    for checker in checkers:
+        group = [t for t in candidates if flagged_by[t.id] == checker.name]
+        if not group:
+            continue
+        print(f"[INFO]   Processing checker '{checker.name}' ({len(group)} torrents)")
+        bytes_freed += process_torrents(
+            client,
+            group,
+            action,
+            cross_seed_map=cross_seed_map,
+            deleter=deleter,
+            reporter=reporter,
+            plan_file=args.plan_file,
+            journal=journal,
+        )
+
+    print_space_freed(bytes_freed)
+
+
+def handle_orphans(client, args, reporter=None, journal=None):
     """Handle the orphans subcommand."""
+    import itertools
     import pathlib
+    from concurrent.futures import ThreadPoolExecutor
 
-    from transmission_cleaner.actions import process_orphaned_files
-    from transmission_cleaner.checkers.orphans import find_orphaned_files, get_tracked_files, scan_directory
+    from transmission_cleaner.actions import process_orphaned_file_stream, process_orphaned_files
+    from transmission_cleaner.checkers.orphans import (
+        TRACKED_FILE_FIELDS,
+        find_orphaned_files,
+        find_orphaned_files_external,
+        get_download_roots,
+        get_tracked_files_from_torrents,
+        iter_directory,
+        iter_tracked_files,
+        scan_roots,
+    )
+    from transmission_cleaner.client import get_incomplete_dirs, iter_torrents
+    from transmission_cleaner.exclusions import create_exclusions
 
-    directory = pathlib.Path(args.directory)
-    if not directory.exists():
-        print(f"[ERROR]  Directory not found: {directory}")
+    if args.auto_roots:
+        # Roots only need each torrent's download directory, a small request answered before
+        # the file lists, so the scan can start while they are still being fetched. This costs
+        # a second torrent-get, deliberately: it is cheap next to the file lists it overlaps
+        print("[INFO]   Getting download directories from Transmission...")
+        roots = get_download_roots(client.get_torrents(arguments=["id", "downloadDir"]))
+        print(f"[INFO]   Scanning {len(roots)} download directories: {', '.join(str(r) for r in roots)}")
+    else:
+        directory = pathlib.Path(args.directory)
+        if not directory.exists():
+            print(f"[ERROR]  Directory not found: {directory}")
+            sys.exit(1)
+
+        roots = [directory]
+        print(f"[INFO]   Scanning directory: {directory}")
+    if args.shard is not None:
+        # Every torrent is still fetched, so files of another shard's torrents stay tracked
+        print(f"[INFO]   Shard {args.shard[0]}/{args.shard[1]}: scanning its top-level entries")
+
+    # Rules are compiled once and shared by every root
+    try:
+        exclusions = create_exclusions(args.include_hidden, args.exclude, args.exclude_from)
+    except OSError as e:
+        print(f"[ERROR]  Cannot read exclusion file: {e}")
         sys.exit(1)
+    # Torrents still downloading live in the daemon's incomplete directory
+    skip_dirs = [pathlib.Path(directory) for directory in get_incomplete_dirs(client)]
+    if skip_dirs:
+        print(f"[INFO]   Skipping incomplete directories: {', '.join(str(d) for d in skip_dirs)}")
 
-    print(f"[INFO]   Scanning directory: {directory}")
-    scanned_files = scan_directory(directory, args.include_hidden)
-    print(f"[INFO]   Found {len(scanned_files)} files")
+    def build_tracked_files():
+        print("[INFO]   Getting tracked files from Transmission...")
+        torrents = client.get_torrents()
+        if args.compact_index or args.index_file:
+            from transmission_cleaner.pathindex import PathIndex
 
-    print("[INFO]   Getting tracked files from Transmission...")
-    tracked_files = get_tracked_files(client)
-    print(f"[INFO]   {len(tracked_files)} files tracked by torrents")
+            if args.index_file:
+                # Serve lookups from the page cache instead of the heap
+                return PathIndex.build(iter_tracked_files(torrents), args.index_file)
+            return PathIndex.from_paths(iter_tracked_files(torrents))
+        return get_tracked_files_from_torrents(torrents)
 
-    orphaned = find_orphaned_files(scanned_files, tracked_files)
-    print(f"[INFO]   Found {len(orphaned)} orphaned files")
+    action = normalize_action(args.action)
+    if args.spill_dir:
+        print("[INFO]   Getting tracked files from Transmission...")
+        # Neither side is held in memory: torrents are fetched a chunk at a time, both sides
+        # stream through sorted run files, and orphans are acted on as the merge finds them
+        tracked = iter_tracked_files(iter_torrents(client, TRACKED_FILE_FIELDS))
+        scanned = itertools.chain.from_iterable(
+            iter_directory(root, exclusions=exclusions, min_age=args.min_age, skip_dirs=skip_dirs, shard=args.shard)
+            for root in roots
+        )
+        orphaned_count, bytes_freed = process_orphaned_file_stream(
+            find_orphaned_files_external(scanned, tracked, args.memory_limit, args.spill_dir),
+            action,
+            deleter=create_deleter(args),
+            reporter=reporter,
+            journal=journal,
+        )
+        print(f"[INFO]   Found {orphaned_count} orphaned files")
+    else:
+        # The fetch is network-bound and the scan disk-bound: the file lists are fetched, and the
+        # tracked set built, in the background while the directories are walked
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            tracked_future = executor.submit(build_tracked_files)
 
-    # Process orphaned files
-    action = args.action if args.action not in ["interactive", "i"] else None
-    bytes_freed = process_orphaned_files(orphaned, action)
+            # Sizes from the scan are reused for reporting instead of stat-ing orphans again
+            sizes = scan_roots(
+                roots, exclusions=exclusions, min_age=args.min_age, skip_dirs=skip_dirs, shard=args.shard
+            )
+            print(f"[INFO]   Found {len(sizes)} files")
 
-    # Print summary if any space was freed
-    if bytes_freed > 0:
-        space_freed_gb = bytes_freed / (1024**3)
-        print(f"\n[INFO]   Total disk space freed: {space_freed_gb:.2f} GB")
+            tracked_files = tracked_future.result()
+            print(f"[INFO]   {len(tracked_files)} files tracked by torrents")
+
+        # A memory-mapped index is released once the orphans are found
+        with tracked_files if not isinstance(tracked_files, set) else contextlib.nullcontext():
+            orphaned = find_orphaned_files(list(sizes), tracked_files)
+        print(f"[INFO]   Found {len(orphaned)} orphaned files")
+
+        # Process orphaned files
+        bytes_freed = process_orphaned_files(
+            orphaned,
+            action,
+            deleter=create_deleter(args),
+            reporter=reporter,
+            sizes=sizes,
+            plan_file=args.plan_file,
+            journal=journal,
+        )
+
+    print_space_freed(bytes_freed)
+
+
+def handle_resume(client, args, journal):
+    """Carry on with the unfinished items of the run recorded in the journal."""
+    from transmission_cleaner.actions import resume_journal
+
+    bytes_freed = resume_journal(client, journal, create_deleter(args))
+
+    print_space_freed(bytes_freed)
+
+
+def handle_merge(args, reporter):
+    """Handle the merge subcommand."""
+    from transmission_cleaner.merge import merge_records, read_records
+
+    try:
+        records = merge_records(read_records(args.files))
+    except OSError as e:
+        print(f"[ERROR]  Cannot read results: {e}")
+        sys.exit(1)
+
+    for record in records:
+        reporter.record(record)
+    reporter.flush()
+    torrents = sum(1 for record in records if record["type"] == "torrent")
+    print(f"[INFO]   Merged {torrents} torrents and {len(records) - torrents} files from {len(args.files)} results")
 
 
 def main():
     args = parse_args()
 
+    from transmission_cleaner.reporters import create_reporter
+
+    # Machine-readable output owns stdout; log messages move to stderr
+    reporter = create_reporter(args.output, sys.stdout)
+    with contextlib.redirect_stdout(sys.stderr) if args.output != "text" else contextlib.nullcontext():
+        if args.command == "merge":
+            handle_merge(args, reporter)
+        else:
+            run_command(args, reporter)
+
+
+def run_command(args, reporter):
+    """Create the Transmission client and run the selected subcommand."""
+    from transmission_cleaner.client import (
+        MultiClient,
+        RateLimitedClient,
+        create_client,
+        create_clients,
+        get_client_config,
+        load_instances_file,
+    )
+
+    def pace(client):
+        if args.rpc_target_latency is None:
+            return client
+        return RateLimitedClient(client, args.rpc_target_latency, args.rpc_chunk_size)
+
     # Create Transmission client (shared by all commands)
-    client_config = get_client_config(
-        settings_file=args.settings_file,
-        protocol=args.protocol,
-        host=args.host,
-        port=args.port,
-        username=args.username,
-        password=args.password,
-        path=args.rpc_path,
-    )
-    client = create_client(**client_config)
-
-    # Dispatch to appropriate handler
-    if args.command == "hardlinks":
-        handle_hardlinks(client, args)
-    elif args.command == "errors":
-        handle_errors(client, args)
-    elif args.command == "orphans":
-        handle_orphans(client, args)
+    if getattr(args, "config_dir", None):
+        from transmission_cleaner.offline import OfflineClient
+
+        print(f"[INFO]   Reading torrents from {args.config_dir} (offline)")
+        client = OfflineClient(args.config_dir)
+    elif args.instances:
+        clients = create_clients(load_instances_file(args.instances))
+        print(f"[INFO]   Connected to {len(clients)} Transmission instances")
+        # Each daemon is paced on its own latency
+        client = MultiClient([pace(c) for c in clients])
+    else:
+        client_config = get_client_config(
+            settings_file=args.settings_file,
+            protocol=args.protocol,
+            host=args.host,
+            port=args.port,
+            username=args.username,
+            password=args.password,
+            path=args.rpc_path,
+        )
+        client = pace(create_client(**client_config))
+
+    file_cache = None
+    if args.file_cache and not getattr(args, "config_dir", None):
+        from transmission_cleaner.filecache import CachedFilesClient, FileListCache
+
+        file_cache = FileListCache(args.file_cache)
+        client = CachedFilesClient(client, file_cache)
+
+    journal = None
+    if args.journal:
+        from transmission_cleaner.journal import Journal
+
+        try:
+            if args.resume:
+                journal = Journal.open(args.journal)
+            elif args.action not in ["list", "l"] or getattr(args, "rule_actions", False):
+                # Listing changes nothing, so it leaves the journal of an interrupted run alone;
+                # rule actions may change state whatever --action is
+                journal = Journal.create(args.journal, args.command)
+        except (OSError, UnicodeDecodeError) as e:
+            if isinstance(e, FileExistsError):
+                print(f"[ERROR]  {e}; add --resume to carry on, or remove it")
+            else:
+                print(f"[ERROR]  Cannot open journal {args.journal}: {e}")
+            if file_cache is not None:
+                file_cache.close()
+            sys.exit(1)
+
+    try:
+        # Dispatch to appropriate handler
+        if args.resume:
+            handle_resume(client, args, journal)
+        elif args.command == "hardlinks":
+            handle_hardlinks(client, args, reporter, journal)
+        elif args.command == "errors":
+            handle_errors(client, args, reporter, journal)
+        elif args.command == "check":
+            handle_check(client, args, reporter, journal)
+        elif args.command == "orphans":
+            handle_orphans(client, args, reporter, journal)
+    finally:
+        if journal is not None:
+            journal.close()
+        if file_cache is not None:
+            file_cache.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+"""Merging of the NDJSON output of sharded runs."""
+
+import contextlib
+import json
+import sys
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any
+
+
+def read_records(paths: Sequence[str]) -> Iterator[dict[str, Any]]:
+    """Read the records of NDJSON result files.
+
+    Blank lines are skipped, and lines that are not torrent or file records are skipped with
+    a warning, so a truncated file still contributes its complete records.
+
+    Args:
+        paths: NDJSON files, "-" for stdin
+
+    Yields:
+        Records in file order
+    """
+    for path in paths:
+        with open(path, encoding="utf-8") if path != "-" else contextlib.nullcontext(sys.stdin) as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+                if not isinstance(record, dict) or record.get("type") not in ["torrent", "file"]:
+                    print(f"[WARN]   Skipping invalid record at {path}:{line_number}")
+                    continue
+                yield record
+
+
+def merge_records(records: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Combine the records of several runs into one report.
+
+    A torrent is identified by its hash and download directory, a file by its path. A record
+    reported by several runs is kept once; a torrent reported as cross-seeded by any of them
+    stays cross-seeded.
+
+    Args:
+        records: Torrent and file records, e.g. from read_records
+
+    Returns:
+        Torrents sorted by name, then files sorted by path
+    """
+    torrents: dict[tuple[str, str], dict[str, Any]] = {}
+    files: dict[str, dict[str, Any]] = {}
+    for record in records:
+        if record["type"] == "torrent":
+            key = (record["hash"], record["download_dir"])
+            if key in torrents:
+                torrents[key]["cross_seeded"] = torrents[key]["cross_seeded"] or record["cross_seeded"]
+            else:
+                torrents[key] = dict(record)
+        else:
+            files.setdefault(record["path"], record)
+
+    return [
+        *sorted(torrents.values(), key=lambda r: (r["name"], r["hash"])),
+        *sorted(files.values(), key=lambda r: r["path"]),
+    ]
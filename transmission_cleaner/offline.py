@@ -0,0 +1,327 @@
+"""Offline backend reading torrents from Transmission's config directory instead of RPC."""
+
+import hashlib
+import json
+import pathlib
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from transmission_rpc import Session, Torrent
+
+from transmission_cleaner.client import TorrentIDs
+
+# Transmission tracks download progress in blocks of this size
+BLOCK_SIZE = 16 * 1024
+# Below this many torrents, parsing in-process is faster than starting a process pool
+POOL_THRESHOLD = 200
+
+# RPC status values
+STATUS_STOPPED = 0
+STATUS_DOWNLOADING = 4
+STATUS_SEEDING = 6
+
+
+def _decode(data: bytes, pos: int) -> tuple[Any, int]:
+    """Decode the bencoded value starting at pos.
+
+    Returns:
+        The value (dict keys and strings stay bytes) and the position after it
+    """
+    marker = data[pos]
+    if marker == 0x64:  # d
+        result = {}
+        pos += 1
+        while data[pos] != 0x65:  # e
+            key, pos = _decode(data, pos)
+            result[key], pos = _decode(data, pos)
+        return result, pos + 1
+    if marker == 0x6C:  # l
+        items = []
+        pos += 1
+        while data[pos] != 0x65:
+            item, pos = _decode(data, pos)
+            items.append(item)
+        return items, pos + 1
+    if marker == 0x69:  # i
+        end = data.index(b"e", pos)
+        return int(data[pos + 1 : end]), end + 1
+    colon = data.index(b":", pos)
+    start = colon + 1
+    end = start + int(data[pos:colon])
+    if end > len(data):
+        raise ValueError("Truncated string")
+    return data[start:end], end
+
+
+def bdecode(data: bytes) -> Any:
+    """Decode a bencoded document.
+
+    Args:
+        data: Bencoded bytes
+
+    Returns:
+        Decoded value; dict keys and strings are bytes
+
+    Raises:
+        ValueError: If the data is not valid bencode
+    """
+    try:
+        value, end = _decode(data, 0)
+    except (IndexError, ValueError) as e:
+        raise ValueError(f"Invalid bencode: {e}") from e
+    if end != len(data):
+        raise ValueError("Invalid bencode: trailing data")
+    return value
+
+
+def get_info_hash(data: bytes) -> str:
+    """Compute the infohash of a torrent file from the raw bytes of its info dict.
+
+    Args:
+        data: Bencoded torrent file
+
+    Returns:
+        Lowercase hex SHA-1 of the info dict
+
+    Raises:
+        ValueError: If the file has no info dict
+    """
+    if data[:1] != b"d":
+        raise ValueError("Torrent file is not a dict")
+    pos = 1
+    while data[pos] != 0x65:
+        key, pos = _decode(data, pos)
+        start = pos
+        _, pos = _decode(data, pos)
+        if key == b"info":
+            return hashlib.sha1(data[start:pos]).hexdigest()
+    raise ValueError("Torrent file has no info dict")
+
+
+def _text(value: bytes) -> str:
+    # Undecodable bytes round-trip to the same file name, as with os.fsdecode
+    return value.decode("utf-8", "surrogateescape")
+
+
+def _get_completed(lengths: list[int], progress: dict[bytes, Any]) -> list[int]:
+    """Estimate each file's completed bytes from the resume progress bitfield."""
+    blocks = progress.get(b"blocks")
+    # Older resume files only have a piece bitfield, which is used when it is complete
+    if blocks == b"all" or (blocks is None and progress.get(b"have") == b"all"):
+        return list(lengths)
+    if not isinstance(blocks, bytes) or blocks == b"none":
+        return [0] * len(lengths)
+
+    bits = int.from_bytes(blocks, "big")
+    nbits = len(blocks) * 8
+    completed = []
+    offset = 0
+    for length in lengths:
+        first = offset // BLOCK_SIZE
+        last = min((offset + length + BLOCK_SIZE - 1) // BLOCK_SIZE, nbits)
+        have = 0
+        if last > first:
+            # Bit i of the bitfield (most significant first) is block i
+            have = ((bits >> (nbits - last)) & ((1 << (last - first)) - 1)).bit_count()
+        completed.append(min(have * BLOCK_SIZE, length))
+        offset += length
+    return completed
+
+
+def parse_torrent(torrent_data: bytes, resume_data: bytes | None) -> dict[str, Any]:
+    """Build RPC-style torrent fields from a .torrent file and its .resume file.
+
+    Args:
+        torrent_data: Bencoded .torrent file
+        resume_data: Bencoded .resume file, if any
+
+    Returns:
+        Torrent fields as returned by torrent-get, without "id"
+
+    Raises:
+        ValueError: If a file cannot be parsed
+    """
+    metainfo = bdecode(torrent_data)
+    resume = bdecode(resume_data) if resume_data else {}
+    info = metainfo[b"info"]
+
+    name = _text(resume.get(b"name") or info.get(b"name.utf-8") or info[b"name"])
+    if b"files" in info:
+        names = []
+        lengths = []
+        for file in info[b"files"]:
+            parts = file.get(b"path.utf-8") or file[b"path"]
+            names.append("/".join([name, *(_text(part) for part in parts)]))
+            lengths.append(file[b"length"])
+    else:
+        names = [name]
+        lengths = [info[b"length"]]
+    renamed = resume.get(b"files")
+    if (
+        isinstance(renamed, list)
+        and len(renamed) == len(names)
+        and all(isinstance(file_name, bytes) and file_name for file_name in renamed)
+    ):
+        names = [_text(file_name) for file_name in renamed]
+
+    count = len(names)
+    dnd = resume.get(b"dnd") or [0] * count
+    priorities = resume.get(b"priority") or [0] * count
+    completed = _get_completed(lengths, resume.get(b"progress") or {})
+    total_size = sum(lengths)
+
+    announce_list = metainfo.get(b"announce-list") or ([[metainfo[b"announce"]]] if b"announce" in metainfo else [])
+    trackers = [
+        {"id": index, "announce": _text(url), "scrape": "", "tier": tier}
+        for index, (tier, url) in enumerate((tier, url) for tier, urls in enumerate(announce_list) for url in urls)
+    ]
+
+    uploaded = resume.get(b"uploaded", 0)
+    downloaded = resume.get(b"downloaded", 0)
+    if resume.get(b"paused"):
+        status = STATUS_STOPPED
+    elif all(done == length for done, length, skip in zip(completed, lengths, dnd) if not skip):
+        status = STATUS_SEEDING
+    else:
+        status = STATUS_DOWNLOADING
+
+    return {
+        "hashString": get_info_hash(torrent_data),
+        "name": name,
+        "status": status,
+        "downloadDir": _text(resume.get(b"destination", b"")),
+        "trackers": trackers,
+        "secondsSeeding": resume.get(b"seeding-time-seconds", 0),
+        "totalSize": total_size,
+        "addedDate": resume.get(b"added-date", 0),
+        # Same as Transmission: uploaded over downloaded, or over the size when nothing was downloaded
+        "uploadRatio": uploaded / (downloaded or total_size or 1),
+        "error": 0,
+        "errorString": "",
+        "files": [
+            {"name": file_name, "length": length, "bytesCompleted": done}
+            for file_name, length, done in zip(names, lengths, completed)
+        ],
+        "priorities": list(priorities),
+        "wanted": [0 if skip else 1 for skip in dnd],
+    }
+
+
+def _load_torrent(paths: tuple[str, str]) -> dict[str, Any] | str:
+    """Read and parse one torrent; returns its fields, or an error message."""
+    torrent_path, resume_path = paths
+    try:
+        with open(torrent_path, "rb") as f:
+            torrent_data = f.read()
+        try:
+            with open(resume_path, "rb") as f:
+                resume_data = f.read()
+        except FileNotFoundError:
+            resume_data = None
+        return parse_torrent(torrent_data, resume_data)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        return f"{torrent_path}: {e}"
+
+
+def load_config_dir(config_dir: str, workers: int | None = None) -> list[Torrent]:
+    """Load every torrent from a Transmission config directory.
+
+    Each torrents/<stem>.torrent is paired with resume/<stem>.resume (both the 4.x
+    "<hash>" and the older "<name>.<hash16>" naming). Files are parsed in a process pool
+    when there are many of them.
+
+    Args:
+        config_dir: Transmission config directory (containing torrents/ and resume/)
+        workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        Torrents with IDs numbered by date added, as the daemon does at startup
+    """
+    config_path = pathlib.Path(config_dir)
+    resume_dir = config_path / "resume"
+    jobs = [
+        (str(torrent_path), str(resume_dir / (torrent_path.stem + ".resume")))
+        for torrent_path in sorted((config_path / "torrents").glob("*.torrent"))
+    ]
+
+    results: Iterable[dict[str, Any] | str]
+    if len(jobs) < POOL_THRESHOLD or workers == 1:
+        results = map(_load_torrent, jobs)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_load_torrent, jobs, chunksize=64))
+
+    loaded = []
+    for result in results:
+        if isinstance(result, str):
+            print(f"[WARN]   Cannot read torrent {result}")
+        else:
+            loaded.append(result)
+
+    missing_dirs = sum(1 for fields in loaded if not fields["downloadDir"])
+    if missing_dirs:
+        print(f"[WARN]   {missing_dirs} torrents have no download directory (missing or unreadable resume file)")
+
+    loaded.sort(key=lambda fields: fields["addedDate"])
+    return [Torrent(fields={**fields, "id": index}) for index, fields in enumerate(loaded, start=1)]
+
+
+class OfflineClient:
+    """Read-only client serving torrents parsed from the config directory.
+
+    Torrents are loaded once, on first use. Removing torrents needs the daemon, so it raises.
+    """
+
+    def __init__(self, config_dir: str, workers: int | None = None):
+        self.config_dir = config_dir
+        self.workers = workers
+        self._torrents: list[Torrent] | None = None
+
+    def get_torrents(
+        self,
+        ids: TorrentIDs = None,
+        arguments: Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> list[Torrent]:
+        """Get torrents from the config directory.
+
+        Args:
+            ids: Optional torrent IDs or hashes to return
+            arguments: Ignored, every field is always available
+            timeout: Ignored
+
+        Returns:
+            Torrents
+        """
+        if self._torrents is None:
+            self._torrents = load_config_dir(self.config_dir, self.workers)
+        if ids is None:
+            return list(self._torrents)
+        wanted = set(ids) if isinstance(ids, list) else {ids}
+        return [torrent for torrent in self._torrents if torrent.id in wanted or torrent.hash_string in wanted]
+
+    def get_session(self, timeout: float | None = None) -> Session:
+        """Get the daemon settings from settings.json in the config directory.
+
+        Args:
+            timeout: Ignored
+
+        Returns:
+            Session with the settings as fields, empty if the file cannot be read
+        """
+        try:
+            with open(pathlib.Path(self.config_dir) / "settings.json", encoding="utf-8") as f:
+                settings = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARN]   Cannot read settings.json: {e}")
+            settings = {}
+        return Session(fields=settings)
+
+    def remove_torrent(self, ids: TorrentIDs, delete_data: bool = False, timeout: float | None = None) -> None:
+        """Refuse to remove torrents.
+
+        Raises:
+            RuntimeError: Always, torrents can only be removed through the daemon
+        """
+        raise RuntimeError(f"Cannot remove torrents in offline mode (config dir {self.config_dir})")
@@ -0,0 +1,238 @@
+"""Compact, optionally memory-mapped index of tracked file paths."""
+
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+# File layout: magic, count, digest of the hashes and offsets, then count sorted hashes,
+# count + 1 offsets and the path blob. Native byte order, since the file is a local cache;
+# the magic records which one.
+MAGIC = b"TCPIDX2" + (b"L" if sys.byteorder == "little" else b"B")
+HEADER = struct.Struct("=8sQ16s")
+
+
+def _encode(path: str | os.PathLike[str]) -> bytes:
+    return os.fsencode(path)
+
+
+def _hash(encoded: bytes) -> int:
+    # Stable across processes (unlike hash()), so a saved index can be shared
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "little")
+
+
+def _digest(hashes: "memoryview | array[int]", offsets: "memoryview | array[int]") -> bytes:
+    # Identifies the indexed paths, so an unchanged index file is not written again
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(hashes)
+    digest.update(offsets)
+    return digest.digest()
+
+
+def _pack(paths: Iterable[str | os.PathLike[str]]) -> "tuple[array[int], array[int], Iterator[memoryview]]":
+    """Pack paths into a blob as they arrive, then order them by hash without duplicates.
+
+    Only the packed bytes and 64-bit hashes are kept per path, never a set of path objects.
+
+    Returns:
+        Sorted hashes, offsets of the entries in sorted order, and the sorted entries
+    """
+    arrival_hashes = array("Q")
+    arrival_offsets = array("Q", [0])
+    blob = bytearray()
+    for path in paths:
+        encoded = _encode(path)
+        arrival_hashes.append(_hash(encoded))
+        blob += encoded
+        arrival_offsets.append(len(blob))
+    view = memoryview(blob)
+
+    def entry(i: int) -> memoryview:
+        return view[arrival_offsets[i] : arrival_offsets[i + 1]]
+
+    order = sorted(range(len(arrival_hashes)), key=arrival_hashes.__getitem__)
+    # Duplicates have the same hash, so they are among the kept entries of the current hash
+    kept = 0
+    run_start = 0
+    for i in order:
+        if kept and arrival_hashes[order[kept - 1]] == arrival_hashes[i]:
+            if any(entry(j) == entry(i) for j in order[run_start:kept]):
+                continue
+        else:
+            run_start = kept
+        order[kept] = i
+        kept += 1
+    del order[kept:]
+
+    hashes = array("Q", (arrival_hashes[i] for i in order))
+    offsets = array("Q", [0])
+    for i in order:
+        offsets.append(offsets[-1] + arrival_offsets[i + 1] - arrival_offsets[i])
+    return hashes, offsets, (entry(i) for i in order)
+
+
+def _read_header(index_file: str) -> tuple[int, bytes] | None:
+    """Read the count and digest of an index file, or None if it is missing or not an index."""
+    try:
+        with open(index_file, "rb") as f:
+            magic, count, digest = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return None
+    return (count, digest) if magic == MAGIC else None
+
+
+def _write(
+    index_file: str,
+    hashes: "memoryview | array[int]",
+    offsets: "memoryview | array[int]",
+    entries: Iterable[memoryview],
+) -> None:
+    """Write an index file, replacing any previous one atomically.
+
+    Processes still mapping the previous file keep reading it instead of a truncated one.
+    """
+    partial = f"{index_file}.{os.getpid()}.tmp"
+    try:
+        with open(partial, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(hashes), _digest(hashes, offsets)))
+            f.write(hashes)
+            f.write(offsets)
+            f.writelines(entries)
+        os.replace(partial, index_file)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+
+class PathIndex:
+    """Set of paths stored as sorted 64-bit hashes plus the path bytes for confirmation.
+
+    Membership is a binary search on the hashes; the stored path is only compared on a hash
+    hit. An index takes about 16 bytes plus the path length per entry, instead of several
+    hundred for a set of pathlib.Path, and a saved index can be memory-mapped so parallel
+    scans and processes share the same pages without copying. Use as a context manager so
+    a mapped file is released.
+    """
+
+    def __init__(
+        self,
+        hashes: memoryview,
+        offsets: memoryview,
+        blob: memoryview,
+        mapped: tuple[mmap.mmap, memoryview] | None = None,
+    ):
+        self._hashes = hashes
+        self._offsets = offsets
+        self._blob = blob
+        # Mapped file and the view the other views were sliced from, released on close
+        self._mapped = mapped
+
+    def __enter__(self) -> "Self":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[str | os.PathLike[str]]) -> "PathIndex":
+        """Build an index in memory.
+
+        Args:
+            paths: Paths to index, already normalized (e.g. resolved); duplicates are dropped
+
+        Returns:
+            In-memory index
+        """
+        hashes, offsets, entries = _pack(paths)
+        blob = bytearray()
+        for encoded in entries:
+            blob += encoded
+        return cls(memoryview(hashes), memoryview(offsets), memoryview(bytes(blob)))
+
+    @classmethod
+    def build(cls, paths: Iterable[str | os.PathLike[str]], index_file: str) -> "PathIndex":
+        """Index paths into a file and memory-map it.
+
+        The sorted paths are written straight to the file instead of being copied in memory
+        first. A file already holding the same paths is left as it is.
+
+        Args:
+            paths: Paths to index, already normalized (e.g. resolved); duplicates are dropped
+            index_file: Index file path
+
+        Returns:
+            Index backed by the mapped file
+        """
+        hashes, offsets, entries = _pack(paths)
+        if _read_header(index_file) != (len(hashes), _digest(hashes, offsets)):
+            _write(index_file, hashes, offsets, entries)
+        return cls.load(index_file)
+
+    @classmethod
+    def load(cls, index_file: str) -> "PathIndex":
+        """Memory-map a saved index.
+
+        Args:
+            index_file: File written by save() or build()
+
+        Returns:
+            Index backed by the mapped file
+
+        Raises:
+            ValueError: If the file is not an index written on this platform
+        """
+        with open(index_file, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        magic, count, _ = HEADER.unpack_from(view) if len(view) >= HEADER.size else (None, 0, None)
+        if magic != MAGIC:
+            view.release()
+            mapped.close()
+            raise ValueError(f"Not a path index for this platform: {index_file}")
+        start = HEADER.size
+        hashes = view[start : start + 8 * count].cast("Q")
+        start += 8 * count
+        offsets = view[start : start + 8 * (count + 1)].cast("Q")
+        start += 8 * (count + 1)
+        return cls(hashes, offsets, view[start:], (mapped, view))
+
+    def save(self, index_file: str) -> None:
+        """Write the index to a file that load() can memory-map.
+
+        Args:
+            index_file: Destination path
+        """
+        _write(index_file, self._hashes, self._offsets, [self._blob[: self._offsets[-1]]])
+
+    def close(self) -> None:
+        """Release the mapped file, if any."""
+        if self._mapped is not None:
+            mapped, view = self._mapped
+            for buffer in (self._hashes, self._offsets, self._blob, view):
+                buffer.release()
+            mapped.close()
+            self._mapped = None
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, path: object) -> bool:
+        if not isinstance(path, (str, os.PathLike)):
+            return False
+        encoded = os.fsencode(path)
+        h = _hash(encoded)
+        i = bisect.bisect_left(self._hashes, h)
+        while i < len(self._hashes) and self._hashes[i] == h:
+            if self._blob[self._offsets[i] : self._offsets[i + 1]] == encoded:
+                return True
+            i += 1
+        return False
@@ -0,0 +1,190 @@
+"""Free-space target planning for torrent deletion."""
+
+import heapq
+import os
+import pathlib
+import shutil
+import time
+from collections.abc import Callable, Collection, MutableSet, Sequence
+from typing import NamedTuple
+
+from transmission_rpc import Torrent
+
+# Each score returns a value where higher means "delete first"
+SCORES: dict[str, Callable[[Torrent], float]] = {
+    "age": lambda t: time.time() - t.added_date.timestamp(),
+    "ratio": lambda t: t.ratio,
+    "size": lambda t: t.total_size,
+    "seeding": lambda t: t.seconds_seeding,
+}
+
+# Torrent fields read by the scores and by get_reclaimable_bytes, for projected fetches
+PLAN_FIELDS = [
+    "downloadDir",
+    "totalSize",
+    "addedDate",
+    "uploadRatio",
+    "secondsSeeding",
+    "files",
+    "priorities",
+    "wanted",
+]
+
+
+class FilesystemUsage(NamedTuple):
+    """Space usage of a single filesystem, in bytes."""
+
+    total: int
+    used: int
+    free: int
+
+
+def get_filesystem_usage(path: pathlib.Path) -> FilesystemUsage:
+    """Get the space usage of the filesystem containing a path.
+
+    Uses statvfs where available and falls back to shutil.disk_usage elsewhere (Windows).
+
+    Args:
+        path: Any path on the filesystem
+
+    Returns:
+        Total, used and free (available to unprivileged users) bytes
+    """
+    if hasattr(os, "statvfs"):
+        st = os.statvfs(path)
+        used = (st.f_blocks - st.f_bfree) * st.f_frsize
+        free = st.f_bavail * st.f_frsize
+        # Same as df: reserved blocks count as neither used nor free
+        return FilesystemUsage(total=used + free, used=used, free=free)
+
+    usage = shutil.disk_usage(path)
+    return FilesystemUsage(total=usage.total, used=usage.used, free=usage.free)
+
+
+def get_bytes_to_free(
+    usage: FilesystemUsage,
+    max_usage: float | None = None,
+    min_free: int | None = None,
+) -> int:
+    """Calculate how many bytes must be freed to reach the targets.
+
+    Args:
+        usage: Current filesystem usage
+        max_usage: Maximum used fraction of the filesystem (e.g. 0.85)
+        min_free: Minimum free bytes on the filesystem
+
+    Returns:
+        Bytes to free, or 0 if the targets are already met
+    """
+    needed = 0
+    if max_usage is not None:
+        needed = max(needed, int(usage.used - max_usage * usage.total))
+    if min_free is not None:
+        needed = max(needed, min_free - usage.free)
+    return max(needed, 0)
+
+
+def get_reclaimable_bytes(torrent: Torrent, counted: MutableSet[tuple[int, int]] | None = None) -> int:
+    """Calculate the bytes actually freed by deleting a torrent's data.
+
+    Files with other hardlinks keep their data on disk, so they do not count. Symlinks are
+    not followed: deleting one frees nothing of its target.
+
+    Args:
+        torrent: Torrent to check
+        counted: (device, inode) of files already counted for other torrents; files found
+                 in it are skipped, and the files counted here are added to it
+
+    Returns:
+        Total size of the torrent's files that have a single link
+    """
+    reclaimable = 0
+    for file in torrent.get_files():
+        file_path = pathlib.Path(torrent.download_dir) / file.name
+        try:
+            st = file_path.lstat()
+        except OSError:
+            continue
+        if st.st_nlink != 1:
+            continue
+        if counted is not None:
+            # The same file shared by several candidates is only freed once
+            if (st.st_dev, st.st_ino) in counted:
+                continue
+            counted.add((st.st_dev, st.st_ino))
+        reclaimable += st.st_size
+    return reclaimable
+
+
+def plan_deletions(
+    torrents: Sequence[Torrent],
+    max_usage: float | None = None,
+    min_free: int | None = None,
+    score: str = "age",
+    protected_ids: Collection[int] = (),
+) -> list[Torrent]:
+    """Select the fewest candidates needed to reach a free-space target on each filesystem.
+
+    Candidates are grouped by the device of their download directory, then taken from a heap
+    ordered by score until enough bytes are reclaimed on that device.
+
+    Args:
+        torrents: Candidate torrents
+        max_usage: Maximum used fraction of each filesystem (e.g. 0.85)
+        min_free: Minimum free bytes on each filesystem
+        score: Ranking to use, one of SCORES
+        protected_ids: IDs of torrents whose data will be kept (e.g. cross-seeded). They reclaim
+                       nothing, but are always planned so they are still removed without their data
+
+    Returns:
+        Torrents to process, in deletion order
+    """
+    score_fn = SCORES[score]
+
+    # Group candidates by filesystem
+    devices: dict[int, list[tuple[float, int, Torrent]]] = {}
+    device_paths: dict[int, pathlib.Path] = {}
+    for index, torrent in enumerate(torrents):
+        download_dir = pathlib.Path(torrent.download_dir)
+        try:
+            device = download_dir.stat().st_dev
+        except OSError as e:
+            print(f"[ERROR]  Cannot stat download directory {download_dir}: {e}")
+            continue
+        device_paths.setdefault(device, download_dir)
+        # heapq is a min-heap, so negate the score; the index breaks ties without comparing torrents
+        devices.setdefault(device, []).append((-score_fn(torrent), index, torrent))
+
+    planned: list[Torrent] = []
+    counted: set[tuple[int, int]] = set()
+    for device, heap in devices.items():
+        usage = get_filesystem_usage(device_paths[device])
+        needed = get_bytes_to_free(usage, max_usage, min_free)
+        used_pct = usage.used / usage.total * 100 if usage.total else 0
+        print(
+            f"[PLAN]   {device_paths[device]}: {used_pct:.1f}% used, "
+            f"{needed / (1024**3):.2f} GB to free from {len(heap)} candidates"
+        )
+
+        heapq.heapify(heap)
+        reclaimed = 0
+        while heap and reclaimed < needed:
+            _, _, torrent = heapq.heappop(heap)
+            if torrent.id in protected_ids:
+                # Removed without its data, reclaiming 0 bytes towards the target
+                planned.append(torrent)
+                continue
+            reclaimable = get_reclaimable_bytes(torrent, counted)
+            if reclaimable == 0:
+                continue
+            planned.append(torrent)
+            reclaimed += reclaimable
+        # Protected candidates not reached before the target are still removed, without their data
+        planned.extend(torrent for _, _, torrent in sorted(heap) if torrent.id in protected_ids)
+
+        if reclaimed < needed:
+            print(
+                f"[WARN]   {device_paths[device]}: Only {reclaimed / (1024**3):.2f} GB reclaimable, target not reached"
+            )
+
+    return planned
@@ -0,0 +1,138 @@
+"""Reporters writing list output as text, NDJSON or CSV."""
+
+import abc
+import csv
+import io
+import json
+import pathlib
+import sys
+from typing import Any, TextIO
+
+from transmission_rpc import Torrent
+
+# Records buffered before each write to the stream
+BUFFER_RECORDS = 1000
+
+TORRENT_COLUMNS = ["type", "id", "hash", "name", "download_dir", "size", "cross_seeded"]
+FILE_COLUMNS = ["type", "path", "size", "error"]
+
+
+class Reporter(abc.ABC):
+    """Base reporter: buffers formatted records and writes them to a stream in batches."""
+
+    def __init__(self, stream: TextIO | None = None):
+        self.stream = stream or sys.stdout
+        self._buffer: list[str] = []
+
+    def _write(self, record: str) -> None:
+        self._buffer.append(record)
+        if len(self._buffer) >= BUFFER_RECORDS:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered records to the stream."""
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+        self.stream.flush()
+
+    def torrent(self, torrent: Torrent, cross_seeded: bool = False) -> None:
+        """Report a torrent.
+
+        Args:
+            torrent: Torrent to report
+            cross_seeded: Whether the torrent shares data with other torrents
+        """
+        self.record(
+            {
+                "type": "torrent",
+                "id": torrent.id,
+                "hash": torrent.hash_string,
+                "name": torrent.name,
+                "download_dir": torrent.download_dir,
+                "size": torrent.total_size,
+                "cross_seeded": cross_seeded,
+            }
+        )
+
+    def file(self, path: pathlib.Path, size: int | None, error: str | None = None) -> None:
+        """Report a file.
+
+        Args:
+            path: File path
+            size: File size in bytes, or None if unknown
+            error: Error met while inspecting the file, if any
+        """
+        self.record({"type": "file", "path": str(path), "size": size, "error": error})
+
+    @abc.abstractmethod
+    def record(self, record: dict[str, Any]) -> None:
+        """Report a torrent or file record, with the keys of TORRENT_COLUMNS or FILE_COLUMNS.
+
+        Args:
+            record: Record to report, e.g. read back from NDJSON output
+        """
+
+
+class TextReporter(Reporter):
+    """Human-readable lines, as printed by the list actions."""
+
+    def record(self, record: dict[str, Any]) -> None:
+        if record["type"] == "torrent":
+            cross_status = " [CROSS-SEEDED]" if record["cross_seeded"] else ""
+            size_gb = record["size"] / (1024**3)
+            self._write(f"  - {record['name']}{cross_status} ({size_gb:.2f} GB)\n")
+        elif record["error"] is not None:
+            self._write(f"  - {record['path']} [ERROR: {record['error']}]\n")
+        else:
+            size_mb = (record["size"] or 0) / (1024 * 1024)
+            self._write(f"  - {record['path']} ({size_mb:.2f} MB)\n")
+
+
+class NdjsonReporter(Reporter):
+    """One JSON object per line, for jq and other line-oriented tools."""
+
+    def record(self, record: dict[str, Any]) -> None:
+        self._write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class CsvReporter(Reporter):
+    """CSV rows with a header, for spreadsheets and database loaders.
+
+    Torrent and file records have different columns, so a new header is written whenever the
+    record type changes, e.g. between the torrents and the files of a merged report.
+    """
+
+    def __init__(self, stream: TextIO | None = None):
+        super().__init__(stream)
+        self._columns: list[str] | None = None
+
+    def record(self, record: dict[str, Any]) -> None:
+        columns = TORRENT_COLUMNS if record["type"] == "torrent" else FILE_COLUMNS
+        line = io.StringIO()
+        writer = csv.writer(line, lineterminator="\n")
+        if columns is not self._columns:
+            writer.writerow(columns)
+            self._columns = columns
+        writer.writerow("" if record[column] is None else record[column] for column in columns)
+        self._write(line.getvalue())
+
+
+REPORTERS: dict[str, type[Reporter]] = {
+    "text": TextReporter,
+    "ndjson": NdjsonReporter,
+    "csv": CsvReporter,
+}
+
+
+def create_reporter(output_format: str = "text", stream: TextIO | None = None) -> Reporter:
+    """Create a reporter for an output format.
+
+    Args:
+        output_format: One of REPORTERS ("text", "ndjson", "csv")
+        stream: Stream to write to (default: stdout)
+
+    Returns:
+        Reporter instance
+    """
+    return REPORTERS[output_format](stream)
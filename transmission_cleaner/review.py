@@ -0,0 +1,155 @@
+"""Batch review through an editable plan file."""
+
+import os
+import pathlib
+import shlex
+import subprocess
+import tempfile
+from collections.abc import Collection, Iterable, Mapping, Sequence
+
+from transmission_rpc import Torrent
+
+DECISIONS = {"k": "keep", "keep": "keep", "r": "remove", "remove": "remove", "d": "delete", "delete": "delete"}
+
+TORRENT_PLAN_HEADER = """\
+# transmission-cleaner review plan
+# Change the first word of a line to choose what happens to the torrent:
+#   keep   (k) - do nothing
+#   remove (r) - remove torrent from client, keep data
+#   delete (d) - remove torrent with data (cross-seeded torrents keep their data)
+# Lines starting with # are ignored. Save and quit the editor to run the plan;
+# an unchanged plan keeps everything.
+#
+# decision\tid\tsize\tcross-seed\tname
+"""
+
+FILE_PLAN_HEADER = """\
+# transmission-cleaner review plan
+# Change the first word of a line to choose what happens to the file:
+#   keep   (k) - do nothing
+#   delete (d) - delete the file
+# Lines starting with # are ignored. Save and quit the editor to run the plan;
+# an unchanged plan keeps everything.
+#
+# decision\tsize\tpath
+"""
+
+
+class PlanError(Exception):
+    """The plan could not be edited, so nothing in it may be acted on."""
+
+
+def format_torrent_plan(torrents: Sequence[Torrent], cross_seeded_ids: Collection[int] = ()) -> str:
+    """Format torrents as a plan, every line defaulting to keep.
+
+    Args:
+        torrents: Torrents to review
+        cross_seeded_ids: IDs of cross-seeded torrents
+
+    Returns:
+        Plan text
+    """
+    lines = [TORRENT_PLAN_HEADER]
+    for torrent in torrents:
+        size_gb = torrent.total_size / (1024**3)
+        cross_status = "CROSS-SEEDED" if torrent.id in cross_seeded_ids else "-"
+        lines.append(f"keep\t{torrent.id}\t{size_gb:.2f} GB\t{cross_status}\t{torrent.name}\n")
+    return "".join(lines)
+
+
+def format_file_plan(files: Sequence[pathlib.Path], sizes: Mapping[pathlib.Path, int]) -> str:
+    """Format files as a plan, every line defaulting to keep.
+
+    Args:
+        files: Files to review
+        sizes: Known file sizes; files missing from it are listed with an unknown size
+
+    Returns:
+        Plan text
+    """
+    lines = [FILE_PLAN_HEADER]
+    for file_path in files:
+        size = sizes.get(file_path)
+        size_text = f"{size / (1024 * 1024):.2f} MB" if size is not None else "?"
+        lines.append(f"keep\t{size_text}\t{file_path}\n")
+    return "".join(lines)
+
+
+def _parse_lines(text: str, fields: int) -> Iterable[tuple[str, list[str]]]:
+    """Yield (decision, fields) for each plan line, skipping comments and blank lines."""
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip() or line.startswith("#"):
+            continue
+        parts = line.split("\t", fields)
+        decision = DECISIONS.get(parts[0].strip().lower())
+        if decision is None or len(parts) <= fields:
+            raise ValueError(f"Invalid plan line {number}: {line!r}")
+        yield decision, parts[1:]
+
+
+def parse_torrent_plan(text: str) -> dict[int, str]:
+    """Parse an edited torrent plan.
+
+    Args:
+        text: Plan text
+
+    Returns:
+        Mapping of torrent ID to decision ("keep", "remove" or "delete")
+
+    Raises:
+        ValueError: If a line cannot be parsed
+    """
+    return {int(fields[0]): decision for decision, fields in _parse_lines(text, 4)}
+
+
+def parse_file_plan(text: str) -> dict[pathlib.Path, str]:
+    """Parse an edited file plan.
+
+    Args:
+        text: Plan text
+
+    Returns:
+        Mapping of file path to decision ("keep" or "delete")
+
+    Raises:
+        ValueError: If a line cannot be parsed or a file is marked remove
+    """
+    decisions: dict[pathlib.Path, str] = {}
+    for decision, fields in _parse_lines(text, 2):
+        if decision == "remove":
+            raise ValueError(f"Files can only be kept or deleted: {fields[1]}")
+        decisions[pathlib.Path(fields[1])] = decision
+    return decisions
+
+
+def get_editor() -> list[str]:
+    """Get the user's editor command from $VISUAL or $EDITOR."""
+    editor = os.environ.get("VISUAL") or os.environ.get("EDITOR") or ("notepad" if os.name == "nt" else "vi")
+    return shlex.split(editor)
+
+
+def edit_plan(text: str, plan_file: str | None = None) -> str:
+    """Let the user edit a plan in their editor.
+
+    Args:
+        text: Initial plan text
+        plan_file: Optional path to keep the plan at; a temporary file is used otherwise
+
+    Returns:
+        Edited plan text
+
+    Raises:
+        PlanError: If the editor cannot be started or exits with an error (e.g. :cq in vim),
+                   or the plan file cannot be written or read back
+    """
+    editor = get_editor()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(plan_file) if plan_file else pathlib.Path(tmp) / "transmission-cleaner-plan.txt"
+        try:
+            path.write_text(text, encoding="utf-8")
+            result = subprocess.run([*editor, str(path)], check=False)
+            if result.returncode != 0:
+                raise PlanError(f"Editor {editor[0]} exited with status {result.returncode}")
+            return path.read_text(encoding="utf-8")
+        except OSError as e:
+            raise PlanError(f"Cannot edit the plan with {editor[0]}: {e}") from None
@@ -0,0 +1,50 @@
+"""Deterministic assignment of torrents and scan subtrees to shards."""
+
+import hashlib
+from collections.abc import Iterable
+
+from transmission_rpc import Torrent
+
+
+def shard_of(key: str, count: int) -> int:
+    """Get the shard of a key.
+
+    Unlike hash(), the result is the same in every process and on every host, so separate
+    runs agree on the assignment.
+
+    Args:
+        key: Key to assign, e.g. an infohash or a directory name
+        count: Number of shards
+
+    Returns:
+        Shard index between 0 and count - 1
+    """
+    digest = hashlib.blake2b(key.encode("utf-8", "surrogateescape"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+def in_shard(key: str, shard: tuple[int, int]) -> bool:
+    """Check whether a key belongs to a shard.
+
+    Args:
+        key: Key to check
+        shard: (shard index, shard count)
+
+    Returns:
+        True if the key is assigned to the shard
+    """
+    index, count = shard
+    return shard_of(key, count) == index
+
+
+def shard_torrents(torrents: Iterable[Torrent], shard: tuple[int, int]) -> list[Torrent]:
+    """Keep the torrents of a shard, assigned by infohash.
+
+    Args:
+        torrents: Torrents to split
+        shard: (shard index, shard count)
+
+    Returns:
+        Torrents of the shard
+    """
+    return [torrent for torrent in torrents if in_shard(torrent.hash_string.lower(), shard)]
@@ -0,0 +1,119 @@
+"""Parsing helpers for human-readable sizes, percentages, durations and shard specs."""
+
+import re
+
+SIZE_UNITS = {
+    "": 1,
+    "B": 1,
+    "K": 1024,
+    "M": 1024**2,
+    "G": 1024**3,
+    "T": 1024**4,
+    "P": 1024**5,
+}
+
+_SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGTP]?)(?:I?B)?\s*$", re.IGNORECASE)
+
+DURATION_UNITS = {
+    "": 1,
+    "S": 1,
+    "M": 60,
+    "H": 3600,
+    "D": 86400,
+    "W": 604800,
+}
+
+_DURATION_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([SMHDW]?)\s*$", re.IGNORECASE)
+
+
+def parse_size(value: str) -> int:
+    """Parse a human-readable size into bytes.
+
+    Units are binary (1K = 1024 bytes). "500G", "500GB", "500GiB" and "1.5T" are all accepted.
+
+    Args:
+        value: Size string to parse
+
+    Returns:
+        Size in bytes
+
+    Raises:
+        ValueError: If the value is not a valid size
+    """
+    match = _SIZE_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+
+    number, unit = match.groups()
+    return int(float(number) * SIZE_UNITS[unit.upper()])
+
+
+def parse_percent(value: str) -> float:
+    """Parse a percentage into a fraction between 0 and 1.
+
+    Both "85%" and "85" are read as 85 percent.
+
+    Args:
+        value: Percentage string to parse
+
+    Returns:
+        Fraction between 0 and 1
+
+    Raises:
+        ValueError: If the value is not a percentage between 0 and 100
+    """
+    try:
+        percent = float(value.strip().rstrip("%"))
+    except ValueError:
+        raise ValueError(f"Invalid percentage: {value!r}") from None
+
+    if not 0 <= percent <= 100:
+        raise ValueError(f"Percentage out of range: {value!r}")
+
+    return percent / 100
+
+
+def parse_duration(value: str) -> float:
+    """Parse a human-readable duration into seconds.
+
+    "90", "90s", "30m", "12h", "7d" and "2w" are accepted; a bare number is in seconds.
+
+    Args:
+        value: Duration string to parse
+
+    Returns:
+        Duration in seconds
+
+    Raises:
+        ValueError: If the value is not a valid duration
+    """
+    match = _DURATION_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"Invalid duration: {value!r}")
+
+    number, unit = match.groups()
+    return float(number) * DURATION_UNITS[unit.upper()]
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse a shard spec "i/n": shard i of n, counting from 0.
+
+    Args:
+        value: Shard spec to parse, e.g. "0/4"
+
+    Returns:
+        (shard index, shard count)
+
+    Raises:
+        ValueError: If the value is not a valid shard spec
+    """
+    index, _, count = value.partition("/")
+    try:
+        shard = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Invalid shard: {value!r}") from None
+
+    if not 0 <= shard[0] < shard[1]:
+        raise ValueError(f"Shard out of range: {value!r}")
+
+    return shard